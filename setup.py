@@ -26,7 +26,7 @@ setup(
     ],
     entry_points={
         'console_scripts': [
-            'python_tools=src.menu:main',
+            'python_tools=src.cli:main',
         ],
     },
     classifiers=[
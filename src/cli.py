@@ -0,0 +1,236 @@
+"""
+Python Tools Command-Line Interface
+----------------------------------
+Non-interactive entry point for the tools in the menu.
+Features:
+- One subcommand per tool in TOOL_CATEGORIES; remaining arguments are passed
+  through to the tool
+- Each run is measured like a menu run, optionally under a profiler
+- Pipeline mode running several tools as concurrent worker processes, ordered
+  by their dependencies (e.g. clean before dedupe)
+- One filesystem walk shared by the workers of each pipeline stage
+- Combined exit status: non-zero if any step failed or was skipped
+- Without a subcommand, starts the interactive menu
+"""
+
+import os
+import re
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import click
+
+from src.core.tool_registry import TOOL_CATEGORIES
+from src.core.shared_scan import SCAN_ENV_VAR, write_scan
+from src.utils.instrumentation import PROFILERS, ToolRun
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Directories never included in a shared pipeline scan
+DEFAULT_SCAN_EXCLUDES = ('.git', '__pycache__', 'node_modules')
+
+def command_name(tool_name: str) -> str:
+    """Return the subcommand for a menu tool name, e.g. 'VS Code Backup' -> 'vs-code-backup'."""
+    return re.sub(r'[^a-z0-9]+', '-', tool_name.lower()).strip('-')
+
+def tool_module(tool_path: str) -> str:
+    """Return the importable module of a menu tool path, e.g. 'tools/x.py' -> 'src.tools.x'."""
+    return 'src.' + os.path.splitext(tool_path)[0].replace('/', '.')
+
+# Subcommand -> module for every tool in the menu
+TOOLS: Dict[str, str] = {
+    command_name(name): tool_module(path)
+    for tools in TOOL_CATEGORIES.values() for name, path in tools.items()
+}
+
+@dataclass(frozen=True)
+class PipelineStep:
+    """A tool that can run unattended as part of a pipeline."""
+    command: str
+    # Tool arguments; '{directory}' is replaced with the pipeline directory
+    args: Tuple[str, ...]
+    # Steps that must finish first when they are part of the same pipeline
+    after: Tuple[str, ...] = ()
+    # True when the step changes the tree, so later stages need a fresh scan
+    mutates: bool = False
+    # Argument that turns the step into a dry run, if it has one
+    dry_run_arg: Optional[str] = None
+
+PIPELINE_STEPS: Dict[str, PipelineStep] = {step.command: step for step in (
+    PipelineStep('project-cleaner', ('{directory}',), mutates=True, dry_run_arg='--dry-run'),
+    PipelineStep('remove-duplicates', ('{directory}', '--batch', '--format', 'text'),
+                 after=('project-cleaner',)),
+    PipelineStep('import-graph', ('{directory}',), after=('project-cleaner',)),
+    # Writes requirements.txt into the tree, so it runs after the steps reading it
+    PipelineStep('add-requirements', ('{directory}', '{directory}/requirements.txt'),
+                 after=('project-cleaner', 'remove-duplicates', 'import-graph'),
+                 mutates=True, dry_run_arg='--dry-run'),
+)}
+
+@dataclass
+class StepResult:
+    """Outcome of one pipeline step."""
+    command: str
+    returncode: Optional[int]
+    elapsed: float = 0.0
+    output: str = ''
+
+    @property
+    def status(self) -> str:
+        if self.returncode is None:
+            return 'skipped'
+        return 'ok' if self.returncode == 0 else f'failed ({self.returncode})'
+
+def plan_stages(commands: Sequence[str]) -> List[List[str]]:
+    """Order pipeline steps into stages; steps in a stage do not depend on each other.
+
+    Raises:
+        click.UsageError: If the dependencies among the steps form a cycle.
+    """
+    remaining = list(dict.fromkeys(commands))
+    done: set = set()
+    stages = []
+    while remaining:
+        ready = [command for command in remaining
+                 if all(dep in done or dep not in remaining
+                        for dep in PIPELINE_STEPS[command].after)]
+        if not ready:
+            raise click.UsageError(f"Circular step dependencies among: {', '.join(remaining)}")
+        stages.append(ready)
+        done.update(ready)
+        remaining = [command for command in remaining if command not in ready]
+    return stages
+
+def _worker_env(scan_path: Optional[str]) -> Dict[str, str]:
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get('PYTHONPATH')]))
+    if scan_path:
+        env[SCAN_ENV_VAR] = scan_path
+    else:
+        env.pop(SCAN_ENV_VAR, None)
+    return env
+
+def _run_step(command: str, args: List[str], env: Dict[str, str]) -> StepResult:
+    """Run one step in a worker process, capturing its output."""
+    started = time.monotonic()
+    result = subprocess.run([sys.executable, '-m', TOOLS[command], *args], env=env,
+                            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, text=True)
+    return StepResult(command, result.returncode, time.monotonic() - started, result.stdout)
+
+@click.group(invoke_without_command=True)
+@click.pass_context
+def cli(ctx):
+    """Python Tools. Run without a command for the interactive menu."""
+    if ctx.invoked_subcommand is None:
+        # The menu installs requirements and sets up sys.path when imported
+        from src.menu import main as menu_main
+        menu_main()
+
+def _make_tool_command(command: str, module: str) -> click.Command:
+    @click.command(command, context_settings={'ignore_unknown_options': True,
+                                              'allow_extra_args': True,
+                                              'help_option_names': []},
+                   help=f"Run {module}. Other arguments, --help included, go to the tool.")
+    @click.option('--profile', type=click.Choice(PROFILERS), help="Profile the run.")
+    @click.argument('tool_args', nargs=-1, type=click.UNPROCESSED)
+    def run(profile, tool_args):
+        sys.argv = [module, *tool_args]
+        code = 0
+        tool_run = ToolRun(command.replace('-', '_'), profile)
+        try:
+            with tool_run:
+                runpy.run_module(module, run_name='__main__', alter_sys=True)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        finally:
+            click.echo(f"📊 {tool_run.stats.summary()}", err=True)
+        sys.exit(code)
+    return run
+
+for _command, _module in TOOLS.items():
+    cli.add_command(_make_tool_command(_command, _module))
+
+@cli.command()
+@click.argument('steps', nargs=-1, required=True, type=click.Choice(sorted(PIPELINE_STEPS)))
+@click.option('-d', '--directory', default='.', type=click.Path(exists=True, file_okay=False),
+              show_default=True, help="Tree the steps work on.")
+@click.option('-j', '--jobs', default=os.cpu_count() or 1, show_default=True,
+              help="Steps run concurrently within a stage.")
+@click.option('--exclude', multiple=True, help="Directory names left out of the shared scan.")
+@click.option('--dry-run', is_flag=True, help="Pass dry-run to steps that support it.")
+@click.option('--no-shared-scan', is_flag=True, help="Let every step walk the tree itself.")
+def pipeline(steps, directory, jobs, exclude, dry_run, no_shared_scan):
+    """Run several tools on one tree, concurrently where their order allows.
+
+    Steps in the same stage run as parallel worker processes and read one
+    shared scan of the tree; a stage after a step that changes the tree gets a
+    fresh scan. A step is skipped if a step it depends on failed.
+    """
+    stages = plan_stages(steps)
+    excluded = list(exclude) or list(DEFAULT_SCAN_EXCLUDES)
+    results: Dict[str, StepResult] = {}
+    scan_path = None
+    with tempfile.TemporaryDirectory(prefix='python_tools_') as work_dir:
+        stale = True
+        for number, stage in enumerate(stages, 1):
+            click.echo(f"▶ Stage {number}: {', '.join(stage)}")
+            runnable = []
+            for command in stage:
+                failed = [dep for dep in PIPELINE_STEPS[command].after
+                          if dep in results and results[dep].returncode != 0]
+                if failed:
+                    results[command] = StepResult(command, None,
+                                                  output=f"skipped: {', '.join(failed)} failed\n")
+                else:
+                    runnable.append(command)
+            if runnable and not no_shared_scan and stale:
+                scan_path = os.path.join(work_dir, f'scan-{number}.jsonl')
+                started = time.monotonic()
+                count = write_scan([directory], scan_path, excluded)
+                click.echo(f"  Scanned {count} files in {time.monotonic() - started:.2f}s")
+                stale = False
+
+            env = _worker_env(scan_path)
+            jobs_args = []
+            for command in runnable:
+                step = PIPELINE_STEPS[command]
+                args = [arg.replace('{directory}', directory) for arg in step.args]
+                if dry_run and step.dry_run_arg:
+                    args.append(step.dry_run_arg)
+                jobs_args.append((command, args))
+            with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+                futures = [executor.submit(_run_step, command, args, env)
+                           for command, args in jobs_args]
+                for future in futures:
+                    result = future.result()
+                    results[result.command] = result
+            for command in stage:
+                result = results[command]
+                click.echo(f"\n── {command}: {result.status} in {result.elapsed:.2f}s")
+                click.echo(result.output.rstrip())
+                if result.returncode is not None and PIPELINE_STEPS[command].mutates \
+                        and not (dry_run and PIPELINE_STEPS[command].dry_run_arg):
+                    stale = True
+
+    click.echo("\nPipeline summary:")
+    for command in steps:
+        result = results[command]
+        click.echo(f"  {command:20} {result.status:12} {result.elapsed:6.2f}s")
+    # Worst step status; skipped steps and signal deaths count as 1
+    exit_code = max((result.returncode if result.returncode and result.returncode > 0
+                     else int(result.returncode != 0) for result in results.values()), default=0)
+    sys.exit(exit_code)
+
+def main():
+    cli()
+
+if __name__ == "__main__":
+    main()
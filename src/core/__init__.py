@@ -10,8 +10,5 @@ core_path = Path(__file__).parent
 if str(core_path) not in sys.path:
     sys.path.append(str(core_path))
 
-# Import core modules
-try:
-    from . import install_requirements
-except ImportError:
-    pass  # Optional import, will be handled by error handlers
+# Core modules are imported on demand (e.g. ``from src.core import install_requirements``)
+# so importing the package stays cheap and ``python -m src.core.<module>`` works
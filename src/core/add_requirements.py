@@ -1,38 +1,120 @@
-
 # src/add_requirements.py
 
+import argparse
 import os
 import sys
-import subprocess
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from importlib import metadata
+
+from src.core.import_scanner import (
+    DEFAULT_IMPORT_CACHE_PATH, ImportCache, iter_python_files, scan_imports, stdlib_modules
+)
+
+# Directories never scanned for imports
+DEFAULT_EXCLUDED_DIRS = ['.git', '__pycache__', 'venv', '.venv', 'env', 'node_modules', 'build', 'dist']
+
+def packages_distributions() -> Dict[str, List[str]]:
+    """Map top-level importable names to the installed distributions providing them."""
+    if hasattr(metadata, 'packages_distributions'):
+        return metadata.packages_distributions()
+    # Python < 3.10: read each distribution's top_level.txt or file list
+    mapping: Dict[str, List[str]] = defaultdict(list)
+    for dist in metadata.distributions():
+        name = dist.metadata['Name']
+        top_level = dist.read_text('top_level.txt')
+        if top_level:
+            modules = set(top_level.split())
+        else:
+            modules = {path.parts[0].split('.')[0] for path in dist.files or ()
+                       if not path.parts[0].endswith(('.dist-info', '.egg-info'))}
+        for module in modules:
+            mapping[module].append(name)
+    return dict(mapping)
 
-def process_directory(directory):
+def local_modules(directory: str, files: Iterable[str]) -> Set[str]:
+    """Names importable from inside the project: every module and package in the tree.
+
+    Tools in this repository put their own folders on ``sys.path``, so a module
+    may be imported by its bare name from anywhere in the tree.
+    """
+    names = set()
+    for path in files:
+        relative = os.path.relpath(path, directory)
+        parts = relative.split(os.sep)
+        names.update(parts[:-1])
+        names.add(os.path.splitext(parts[-1])[0])
+    return names
+
+def third_party_modules(directory: str, cache: Optional[ImportCache] = None,
+                        workers: Optional[int] = None,
+                        excluded_dirs: Iterable[str] = DEFAULT_EXCLUDED_DIRS) -> Set[str]:
+    """Return the top-level modules imported by a project that are neither stdlib nor local."""
+    files = iter_python_files(directory, excluded_dirs)
+    imports = scan_imports(files, cache=cache, workers=workers)
+    excluded = stdlib_modules() | local_modules(directory, files) | {'__future__'}
+    return {record.top_level
+            for records in imports.values() for record in records
+            # Relative imports always refer to the project itself
+            if record.level == 0 and record.top_level not in excluded}
+
+def process_directory(directory, cache: Optional[ImportCache] = None,
+                      workers: Optional[int] = None):
+    """Return pinned requirement lines for the third-party imports of a directory.
+
+    Modules are mapped to distributions through the installed environment and
+    pinned to the installed version. Modules with no installed distribution are
+    returned by name, unpinned.
+    """
+    distributions = packages_distributions()
     requirements = set()
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith('.py'):
-                with open(os.path.join(root, file), 'r') as f:
-                    for line in f:
-                        if line.startswith('import ') or line.startswith('from '):
-                            requirements.add(line.strip())
+    for module in third_party_modules(directory, cache, workers):
+        names = distributions.get(module)
+        if not names:
+            print(f"Warning: no installed distribution provides '{module}'; listing it unpinned")
+            requirements.add(module)
+            continue
+        for name in names:
+            try:
+                requirements.add(f"{name}=={metadata.version(name)}")
+            except metadata.PackageNotFoundError:
+                requirements.add(name)
     return requirements
 
 def write_requirements(requirements, output_file):
     with open(output_file, 'w') as f:
-        for requirement in sorted(requirements):
+        for requirement in sorted(requirements, key=str.lower):
             f.write(requirement + '\n')
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python add_requirements.py <directory> <output_file>")
-        sys.exit(1)
-
-    directory = sys.argv[1]
-    output_file = sys.argv[2]
+    parser = argparse.ArgumentParser(
+        description="Write the third-party requirements of a project, pinned to installed versions."
+    )
+    parser.add_argument('directory', help="Project directory to scan")
+    parser.add_argument('output_file', help="Requirements file to write")
+    parser.add_argument('--workers', type=int, help="Parser processes (default: CPU count)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f"Do not use the per-file import cache ({DEFAULT_IMPORT_CACHE_PATH})")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Print the requirements instead of writing the file")
+    args = parser.parse_args()
 
-    requirements = process_directory(directory)
-    write_requirements(requirements, output_file)
+    cache = None if args.no_cache else ImportCache()
+    try:
+        requirements = process_directory(args.directory, cache, args.workers)
+    finally:
+        if cache:
+            print(cache.report())
+            cache.close()
+    if args.dry_run:
+        print(f"Would write {len(requirements)} requirements to {args.output_file}:")
+        for requirement in sorted(requirements, key=str.lower):
+            print(f"  {requirement}")
+        return
+    write_requirements(requirements, args.output_file)
 
-    print(f"Requirements written to {output_file}")
+    print(f"Requirements written to {args.output_file}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
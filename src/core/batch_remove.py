@@ -0,0 +1,157 @@
+"""
+Batched File Removal
+-------------------
+Deletes large numbers of files quickly, including on network filesystems.
+Features:
+- Files are grouped by parent directory and unlinked relative to an open
+  directory descriptor, so each directory path is resolved once
+- Directories are processed concurrently in a bounded thread pool
+- Reports files removed, bytes reclaimed and throughput
+- Dry-run mode stats the same files and reports the same numbers without
+  deleting anything
+"""
+
+import errno
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# Directories processed concurrently; unlink latency dominates on network mounts
+DEFAULT_REMOVAL_WORKERS = 8
+
+# Relative unlink needs dir_fd support (not available on Windows)
+_DIR_FD_SUPPORTED = os.unlink in os.supports_dir_fd and os.stat in os.supports_dir_fd
+
+@dataclass
+class RemovalReport:
+    """Outcome of a batched removal."""
+    dry_run: bool = False
+    files_removed: int = 0
+    bytes_reclaimed: int = 0
+    missing: int = 0
+    errors: int = 0
+    directories: int = 0
+    elapsed: float = 0.0
+
+    def merge(self, other: "RemovalReport") -> None:
+        """Add the counters of a per-directory report to this one."""
+        self.files_removed += other.files_removed
+        self.bytes_reclaimed += other.bytes_reclaimed
+        self.missing += other.missing
+        self.errors += other.errors
+        self.directories += other.directories
+
+    def summary(self) -> str:
+        """Return a one-line summary including throughput."""
+        elapsed = max(self.elapsed, 1e-9)
+        verb = "Would remove" if self.dry_run else "Removed"
+        return (f"{verb} {self.files_removed} files in {self.directories} directories, "
+                f"reclaiming {self.bytes_reclaimed / 1024**2:.1f} MB in {self.elapsed:.2f}s "
+                f"({self.files_removed / elapsed:.0f} files/s, "
+                f"{self.bytes_reclaimed / 1024**2 / elapsed:.1f} MB/s); "
+                f"{self.missing} already gone, {self.errors} errors")
+
+class BatchRemover:
+    """Removes files in per-directory batches using a bounded thread pool."""
+
+    def __init__(self, workers: int = DEFAULT_REMOVAL_WORKERS, dry_run: bool = False,
+                 logger: Optional[logging.Logger] = None):
+        """Initialize the remover.
+
+        Args:
+            workers (int): Directories processed concurrently. Defaults to 8.
+            dry_run (bool): Only stat the files and report what would be removed.
+                          Defaults to False.
+            logger (Optional[logging.Logger]): Logger for per-file (debug) and
+                                             error lines. Defaults to this module's.
+        """
+        self.workers = max(1, workers)
+        self.dry_run = dry_run
+        self.logger = logger or logging.getLogger(__name__)
+        # Names removed so far per multiply-linked inode, shared by the workers
+        self._links_removed: Dict[Tuple[int, int], int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def remove(self, paths: Iterable[Union[str, Path]]) -> RemovalReport:
+        """Remove files, batching them by parent directory.
+
+        Bytes count as reclaimed only once every link of a file is removed, so
+        removing one name of a hardlinked file reclaims nothing.
+
+        Args:
+            paths (Iterable[Union[str, Path]]): Files to remove.
+
+        Returns:
+            RemovalReport: Counters and elapsed time for the whole batch.
+        """
+        batches: Dict[str, List[str]] = defaultdict(list)
+        for path in paths:
+            directory, name = os.path.split(os.fspath(path))
+            batches[directory or os.curdir].append(name)
+
+        report = RemovalReport(dry_run=self.dry_run)
+        self._links_removed.clear()
+        started = time.monotonic()
+        if self.workers > 1 and len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for result in executor.map(self._remove_batch, batches.keys(), batches.values()):
+                    report.merge(result)
+        else:
+            for directory, names in batches.items():
+                report.merge(self._remove_batch(directory, names))
+        report.elapsed = time.monotonic() - started
+        return report
+
+    def _remove_batch(self, directory: str, names: List[str]) -> RemovalReport:
+        """Remove the named files from one directory."""
+        report = RemovalReport(dry_run=self.dry_run, directories=1)
+        dir_fd = None
+        if _DIR_FD_SUPPORTED:
+            try:
+                dir_fd = os.open(directory, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+            except FileNotFoundError:
+                report.missing += len(names)
+                return report
+            except OSError as e:
+                self.logger.error(f"Cannot open directory {directory}: {e}")
+                report.errors += len(names)
+                return report
+        try:
+            for name in names:
+                target = name if dir_fd is not None else os.path.join(directory, name)
+                try:
+                    st = os.stat(target, dir_fd=dir_fd, follow_symlinks=False)
+                    if not self.dry_run:
+                        os.unlink(target, dir_fd=dir_fd)
+                except OSError as e:
+                    if e.errno == errno.ENOENT:
+                        report.missing += 1
+                        self.logger.warning(f"File no longer exists: {os.path.join(directory, name)}")
+                    else:
+                        report.errors += 1
+                        self.logger.error(f"Error removing {os.path.join(directory, name)}: {e}")
+                    continue
+                report.files_removed += 1
+                if self._is_last_link(st):
+                    report.bytes_reclaimed += st.st_size
+                self.logger.debug(f"{'Would remove' if self.dry_run else 'Removed'}: "
+                                  f"{os.path.join(directory, name)}")
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
+        return report
+
+    def _is_last_link(self, st: os.stat_result) -> bool:
+        """Return True once the names removed for this inode cover all of its links."""
+        if st.st_nlink <= 1:
+            return True
+        with self._lock:
+            key = (st.st_dev, st.st_ino)
+            self._links_removed[key] += 1
+            return self._links_removed[key] >= st.st_nlink
@@ -0,0 +1,125 @@
+"""
+Scan Checkpoints
+---------------
+SQLite-backed record of a long directory scan so it can be resumed after a
+crash or interruption.
+Features:
+- Stores the walker's pending directory stack and every file already walked
+- Each save is a single transaction, so a checkpoint is never half-written
+- Refuses to resume a checkpoint taken with different scan parameters
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+# (path, size, dev, ino, nlink) as recorded for each walked file
+FileRecord = Tuple[str, int, int, int, int]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS pending_dirs (position INTEGER PRIMARY KEY, path TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS walked_files (
+    path TEXT NOT NULL, size INTEGER NOT NULL,
+    dev INTEGER NOT NULL, ino INTEGER NOT NULL, nlink INTEGER NOT NULL
+);
+"""
+
+class ScanCheckpoint:
+    """Persistent walk state for a resumable scan."""
+
+    def __init__(self, path: Union[str, Path]):
+        """Open (creating if necessary) a checkpoint database.
+
+        Args:
+            path (Union[str, Path]): Location of the checkpoint file.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.executescript(_SCHEMA)
+
+    def _meta(self) -> Dict[str, Any]:
+        """Return the stored metadata."""
+        return {key: json.loads(value) for key, value in
+                self._conn.execute("SELECT key, value FROM meta")}
+
+    def start(self, params: Dict[str, Any], root: str) -> None:
+        """Discard any previous state and begin a new scan.
+
+        Args:
+            params (Dict[str, Any]): Scan parameters a resume must match.
+            root (str): Directory the walk starts from.
+        """
+        with self._conn:
+            self._conn.execute("DELETE FROM meta")
+            self._conn.execute("DELETE FROM pending_dirs")
+            self._conn.execute("DELETE FROM walked_files")
+            self._conn.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                [('params', json.dumps(params)), ('walk_complete', 'false')]
+            )
+            self._conn.execute("INSERT INTO pending_dirs (position, path) VALUES (0, ?)", (root,))
+
+    def resume(self, params: Dict[str, Any]) -> Tuple[bool, List[str]]:
+        """Load the state of an interrupted scan.
+
+        Args:
+            params (Dict[str, Any]): Parameters of the scan being resumed.
+
+        Returns:
+            Tuple[bool, List[str]]: Whether the walk had finished, and the stack
+                                    of directories still to be walked.
+
+        Raises:
+            ValueError: If there is no checkpoint or it was taken with other parameters.
+        """
+        meta = self._meta()
+        if 'params' not in meta:
+            raise ValueError(f"No scan checkpoint found at {self.path}")
+        if meta['params'] != params:
+            raise ValueError(f"Checkpoint at {self.path} was taken with different "
+                             f"scan parameters: {meta['params']}")
+        pending = [path for path, in self._conn.execute(
+            "SELECT path FROM pending_dirs ORDER BY position")]
+        return meta['walk_complete'], pending
+
+    def save_walk(self, pending: List[str], files: Iterable[FileRecord]) -> None:
+        """Record newly walked files together with the directories left to walk.
+
+        Args:
+            pending (List[str]): Current walker stack.
+            files (Iterable[FileRecord]): Files walked since the previous save.
+        """
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO walked_files (path, size, dev, ino, nlink) VALUES (?, ?, ?, ?, ?)",
+                files
+            )
+            self._conn.execute("DELETE FROM pending_dirs")
+            self._conn.executemany(
+                "INSERT INTO pending_dirs (position, path) VALUES (?, ?)",
+                enumerate(pending)
+            )
+
+    def finish_walk(self) -> None:
+        """Mark the walk as complete so a resume goes straight to hashing."""
+        with self._conn:
+            self._conn.execute("DELETE FROM pending_dirs")
+            self._conn.execute("UPDATE meta SET value = 'true' WHERE key = 'walk_complete'")
+
+    def walked_files(self) -> Iterator[FileRecord]:
+        """Yield every file recorded so far, in walk order."""
+        yield from self._conn.execute(
+            "SELECT path, size, dev, ino, nlink FROM walked_files ORDER BY rowid")
+
+    def close(self, remove: bool = False) -> None:
+        """Close the checkpoint, optionally deleting it once a scan has completed.
+
+        Args:
+            remove (bool): Delete the checkpoint file. Defaults to False.
+        """
+        self._conn.close()
+        if remove:
+            self.path.unlink(missing_ok=True)
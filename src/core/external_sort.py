@@ -0,0 +1,145 @@
+"""
+External-Memory Record Sorting
+-----------------------------
+Disk-backed building blocks for grouping more files than fit in memory.
+Features:
+- ``PathTable`` stores each path once on disk and hands out integer offsets
+- ``ExternalSorter`` sorts fixed-width (size, digest, offset) records in
+  bounded memory by spilling sorted runs and merging them lazily
+- Digests are kept as raw bytes rather than hex strings
+"""
+
+import heapq
+import os
+import struct
+import tempfile
+from typing import Iterator, List, Optional, Tuple
+
+# Approximate in-memory cost of one buffered record tuple, excluding the digest
+RECORD_OVERHEAD = 160
+
+# Runs merged at once; more than this are first merged into intermediate runs
+MAX_MERGE_FANIN = 256
+
+# Bytes read from each run at a time while merging
+READ_CHUNK = 64 * 1024
+
+_LENGTH = struct.Struct('>I')
+
+Record = Tuple[int, bytes, int]
+
+class PathTable:
+    """Append-only on-disk table of paths addressed by byte offset."""
+
+    def __init__(self, path: str):
+        """Create an empty table.
+
+        Args:
+            path (str): File the table is written to. It is truncated.
+        """
+        self.path = path
+        self._file = open(path, 'w+b')
+        self._end = 0
+
+    def add(self, path: str) -> int:
+        """Store a path and return the offset that identifies it."""
+        data = os.fsencode(path)
+        offset = self._end
+        self._file.seek(offset)
+        self._file.write(_LENGTH.pack(len(data)) + data)
+        self._end += _LENGTH.size + len(data)
+        return offset
+
+    def get(self, offset: int) -> str:
+        """Return the path stored at ``offset``."""
+        self._file.seek(offset)
+        length, = _LENGTH.unpack(self._file.read(_LENGTH.size))
+        return os.fsdecode(self._file.read(length))
+
+    def close(self) -> None:
+        """Close the table file."""
+        self._file.close()
+
+class ExternalSorter:
+    """Sorts (size, digest, offset) records within a memory budget."""
+
+    def __init__(self, digest_size: int, memory_limit: int, temp_dir: Optional[str] = None):
+        """Create an empty sorter.
+
+        Args:
+            digest_size (int): Length in bytes of every record's digest field.
+            memory_limit (int): Approximate bytes of records kept in memory
+                              before a sorted run is spilled to disk.
+            temp_dir (Optional[str]): Directory for run files. Defaults to the
+                                    system temporary directory.
+        """
+        self._record = struct.Struct(f'>Q{digest_size}sQ')
+        self._capacity = max(1, memory_limit // (RECORD_OVERHEAD + digest_size))
+        self._temp_dir = temp_dir
+        self._buffer: List[Record] = []
+        self._runs: List[str] = []
+        self.records = 0
+
+    @property
+    def spilled_runs(self) -> int:
+        """Number of sorted runs written to disk so far."""
+        return len(self._runs)
+
+    def add(self, size: int, digest: bytes, offset: int) -> None:
+        """Add one record, spilling a sorted run if the buffer is full."""
+        self._buffer.append((size, digest, offset))
+        self.records += 1
+        if len(self._buffer) >= self._capacity:
+            self._spill()
+
+    def sorted(self) -> Iterator[Record]:
+        """Yield every record added so far in (size, digest, offset) order.
+
+        Run files are deleted once the iterator is exhausted or closed.
+        """
+        if not self._runs:
+            self._buffer.sort()
+            records, self._buffer = self._buffer, []
+            yield from records
+            return
+        if self._buffer:
+            self._spill()
+        try:
+            while len(self._runs) > MAX_MERGE_FANIN:
+                batch, self._runs = self._runs[:MAX_MERGE_FANIN], self._runs[MAX_MERGE_FANIN:]
+                self._runs.append(self._write_run(heapq.merge(*map(self._read_run, batch))))
+                for run in batch:
+                    os.unlink(run)
+            yield from heapq.merge(*map(self._read_run, self._runs))
+        finally:
+            for run in self._runs:
+                try:
+                    os.unlink(run)
+                except FileNotFoundError:
+                    pass
+            self._runs = []
+
+    def _spill(self) -> None:
+        """Sort the in-memory buffer and write it out as a run."""
+        self._buffer.sort()
+        self._runs.append(self._write_run(self._buffer))
+        self._buffer = []
+
+    def _write_run(self, records) -> str:
+        """Write records to a new run file and return its path."""
+        fd, path = tempfile.mkstemp(prefix='run-', dir=self._temp_dir)
+        with os.fdopen(fd, 'wb', buffering=READ_CHUNK) as f:
+            pack = self._record.pack
+            for record in records:
+                f.write(pack(*record))
+        return path
+
+    def _read_run(self, path: str) -> Iterator[Record]:
+        """Stream the records of one run file."""
+        chunk_size = self._record.size * max(1, READ_CHUNK // self._record.size)
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield from self._record.iter_unpack(chunk)
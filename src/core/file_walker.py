@@ -0,0 +1,137 @@
+"""
+Pruning Directory Walker
+-----------------------
+Shared ``os.scandir`` based tree walker used by the file tools.
+Features:
+- Excluded directories are pruned by name before they are descended into
+- Reuses the stat information cached on each ``DirEntry``
+- Optional size ceiling taken from the ``max_file_size`` setting
+- Yields lightweight entries lazily, so memory does not grow with the tree
+- Exposes its pending-directory stack so an interrupted walk can be resumed
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+class WalkEntry(NamedTuple):
+    """A file or directory found by ``walk``."""
+    path: str
+    name: str
+    is_dir: bool
+    stat: Optional[os.stat_result]
+
+    @property
+    def size(self) -> int:
+        """Size in bytes (0 for directories)."""
+        return self.stat.st_size if self.stat else 0
+
+def load_walk_settings() -> Dict[str, Any]:
+    """Read walker options from the project settings.
+
+    Returns:
+        Dict[str, Any]: ``excluded_dirs`` (list of names) and ``max_file_size``
+        (bytes), falling back to the built-in defaults when the settings file
+        is missing or cannot be loaded. A missing file is not created.
+    """
+    try:
+        from src.config import settings
+    except ImportError:
+        # PyYAML is unavailable, so settings cannot be read; walk without limits
+        return {'excluded_dirs': [], 'max_file_size': None}
+    # Settings() writes a default file when there is none, so only load an existing one
+    config_path = Path(settings.__file__).parent / 'config.yaml'
+    try:
+        config = settings.Settings(str(config_path)).config if config_path.exists() else None
+    except (ValueError, IOError):
+        config = None
+    config = config or settings.Settings.default_config()
+    max_file_size = config.get('max_file_size')
+    return {
+        'excluded_dirs': list(config.get('excluded_dirs', [])),
+        # Settings store the limit in MB
+        'max_file_size': int(max_file_size * 1024 * 1024) if max_file_size else None,
+    }
+
+def walk(
+    root: Union[str, os.PathLike],
+    excluded_dirs: Optional[Iterable[str]] = None,
+    max_file_size: Optional[int] = None,
+    include_dirs: bool = False,
+    should_descend: Optional[Callable[[WalkEntry], bool]] = None,
+    onerror: Optional[Callable[[OSError], None]] = None,
+    pending: Optional[List[str]] = None,
+    on_directory_done: Optional[Callable[[List[str]], None]] = None,
+    on_skipped: Optional[Callable[[str], None]] = None,
+) -> Iterator[WalkEntry]:
+    """Walk a directory tree depth-first, yielding entries as they are found.
+
+    Args:
+        root (Union[str, os.PathLike]): Directory to walk.
+        excluded_dirs (Optional[Iterable[str]]): Directory names that are never
+            entered. Matched against whole path components, not substrings.
+        max_file_size (Optional[int]): Skip files larger than this many bytes.
+            Defaults to None (no limit).
+        include_dirs (bool): Also yield directory entries, before their contents.
+            Defaults to False.
+        should_descend (Optional[Callable[[WalkEntry], bool]]): Called for each
+            directory after it is yielded; returning False prunes it.
+        onerror (Optional[Callable[[OSError], None]]): Called with errors from
+            ``scandir``/``stat``. Errors are ignored when not given, as in ``os.walk``.
+        pending (Optional[List[str]]): Directories still to be walked, used (and
+            updated in place) instead of starting from ``root``. Pass a stack
+            saved from ``on_directory_done`` to resume a walk.
+        on_directory_done (Optional[Callable[[List[str]], None]]): Called with the
+            pending stack once every entry of a directory has been yielded. At
+            that point the stack plus the entries seen so far describe the walk
+            exactly, so it is a safe place to checkpoint.
+        on_skipped (Optional[Callable[[str], None]]): Called with the path of each
+            symbolic link or special file (socket, FIFO, device) that is skipped.
+
+    Yields:
+        WalkEntry: Regular files (and directories if requested). Symbolic links
+        are never followed or yielded.
+    """
+    excluded = frozenset(excluded_dirs or ())
+    stack = pending if pending is not None else [os.fspath(root)]
+    while stack:
+        directory = stack.pop()
+        try:
+            scanner = os.scandir(directory)
+        except OSError as e:
+            if onerror:
+                onerror(e)
+            continue
+        subdirs = []
+        with scanner:
+            for entry in scanner:
+                try:
+                    if entry.is_symlink():
+                        if on_skipped:
+                            on_skipped(entry.path)
+                        continue
+                    if entry.is_dir():
+                        if entry.name not in excluded:
+                            subdirs.append(entry)
+                        continue
+                    if not entry.is_file():
+                        if on_skipped:
+                            on_skipped(entry.path)
+                        continue
+                    st = entry.stat()
+                except OSError as e:
+                    if onerror:
+                        onerror(e)
+                    continue
+                if max_file_size is not None and st.st_size > max_file_size:
+                    continue
+                yield WalkEntry(entry.path, entry.name, False, st)
+        # Reverse so directories are visited in the order scandir returned them
+        for entry in reversed(subdirs):
+            dir_entry = WalkEntry(entry.path, entry.name, True, None)
+            if include_dirs:
+                yield dir_entry
+            if should_descend is None or should_descend(dir_entry):
+                stack.append(entry.path)
+        if on_directory_done:
+            on_directory_done(stack)
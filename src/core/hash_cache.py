@@ -0,0 +1,230 @@
+"""
+Persistent File Hash Cache
+-------------------------
+SQLite-backed store of file digests keyed on device and inode numbers.
+Features:
+- Entries are only trusted while size and mtime_ns are unchanged
+- Caches both full digests and head/tail sample digests
+- Prunes entries for files that have vanished or been replaced
+- Tracks hits and misses for a cache-hit-rate report
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+# Files modified this recently may still change within the same mtime tick,
+# so their digests are not stored (the same rule git uses for racy entries).
+RACY_WINDOW_NS = 2 * 1_000_000_000
+
+# Number of writes buffered before the transaction is committed
+COMMIT_INTERVAL = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_hashes (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    algorithm TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    digest TEXT,
+    sample_size INTEGER,
+    sample_digest TEXT,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (dev, ino, algorithm)
+)
+"""
+
+class HashCache:
+    """On-disk cache of file digests used to make rescans incremental."""
+
+    def __init__(self, db_path: Union[str, Path]):
+        """Open (creating if necessary) the cache database.
+
+        Args:
+            db_path (Union[str, Path]): Location of the SQLite database file.
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(_SCHEMA)
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self.run_started = time.time()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, st: os.stat_result, algorithm: str, column: str,
+                sample_size: Optional[int] = None) -> Optional[str]:
+        """Return a cached value if the entry still matches the file metadata."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT size, mtime_ns, {column}, sample_size FROM file_hashes "
+                "WHERE dev = ? AND ino = ? AND algorithm = ?",
+                (st.st_dev, st.st_ino, algorithm)
+            ).fetchone()
+            valid = (
+                row is not None
+                and row[0] == st.st_size
+                and row[1] == st.st_mtime_ns
+                and row[2] is not None
+                and (sample_size is None or row[3] == sample_size)
+            )
+            if valid:
+                self.hits += 1
+                self._conn.execute(
+                    "UPDATE file_hashes SET last_seen = ? "
+                    "WHERE dev = ? AND ino = ? AND algorithm = ?",
+                    (self.run_started, st.st_dev, st.st_ino, algorithm)
+                )
+                self._note_write()
+                return row[2]
+            self.misses += 1
+            return None
+
+    def _store(self, path: Path, st: os.stat_result, algorithm: str, **values) -> None:
+        """Insert or update the entry for a file, discarding stale columns."""
+        if time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS:
+            return
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns FROM file_hashes "
+                "WHERE dev = ? AND ino = ? AND algorithm = ?",
+                (st.st_dev, st.st_ino, algorithm)
+            ).fetchone()
+            if row is None or row != (st.st_size, st.st_mtime_ns):
+                # New file or metadata changed: every cached digest is invalid
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO file_hashes "
+                    "(dev, ino, algorithm, size, mtime_ns, path, last_seen) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (st.st_dev, st.st_ino, algorithm, st.st_size, st.st_mtime_ns,
+                     str(path), self.run_started)
+                )
+            assignments = ", ".join(f"{name} = ?" for name in values)
+            self._conn.execute(
+                f"UPDATE file_hashes SET {assignments}, path = ?, last_seen = ? "
+                "WHERE dev = ? AND ino = ? AND algorithm = ?",
+                (*values.values(), str(path), self.run_started,
+                 st.st_dev, st.st_ino, algorithm)
+            )
+            self._note_write()
+
+    def _note_write(self) -> None:
+        """Commit once enough writes have accumulated. Caller holds the lock."""
+        self._pending_writes += 1
+        if self._pending_writes >= COMMIT_INTERVAL:
+            self._conn.commit()
+            self._pending_writes = 0
+
+    def get_digest(self, st: os.stat_result, algorithm: str) -> Optional[str]:
+        """Look up the full digest of a file.
+
+        Args:
+            st (os.stat_result): Current metadata of the file.
+            algorithm (str): Name of the hash algorithm.
+
+        Returns:
+            Optional[str]: Cached hex digest, or None on a miss.
+        """
+        return self._lookup(st, algorithm, "digest")
+
+    def put_digest(self, path: Path, st: os.stat_result, algorithm: str, digest: str) -> None:
+        """Record the full digest of a file.
+
+        Args:
+            path (Path): Path the file was read from.
+            st (os.stat_result): Metadata of the file taken before it was read.
+            algorithm (str): Name of the hash algorithm.
+            digest (str): Hex digest of the file contents.
+        """
+        self._store(path, st, algorithm, digest=digest)
+
+    def get_sample(self, st: os.stat_result, algorithm: str, sample_size: int) -> Optional[str]:
+        """Look up the head/tail sample digest of a file.
+
+        Args:
+            st (os.stat_result): Current metadata of the file.
+            algorithm (str): Name of the hash algorithm.
+            sample_size (int): Sample size the digest must have been taken with.
+
+        Returns:
+            Optional[str]: Cached hex digest, or None on a miss.
+        """
+        return self._lookup(st, algorithm, "sample_digest", sample_size)
+
+    def put_sample(self, path: Path, st: os.stat_result, algorithm: str,
+                   sample_size: int, digest: str) -> None:
+        """Record the head/tail sample digest of a file.
+
+        Args:
+            path (Path): Path the file was read from.
+            st (os.stat_result): Metadata of the file taken before it was read.
+            algorithm (str): Name of the hash algorithm.
+            sample_size (int): Bytes sampled from each end of the file.
+            digest (str): Hex digest of the sample.
+        """
+        self._store(path, st, algorithm, sample_size=sample_size, sample_digest=digest)
+
+    def prune(self) -> int:
+        """Remove entries for files that no longer exist or were replaced.
+
+        Only entries not touched during the current run are checked, so the
+        cost is one ``stat`` per file that this scan did not look at.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT dev, ino, path FROM file_hashes WHERE last_seen < ?",
+                (self.run_started,)
+            ).fetchall()
+            stale = []
+            for dev, ino, path in rows:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    stale.append((dev, ino))
+                    continue
+                if (st.st_dev, st.st_ino) != (dev, ino):
+                    stale.append((dev, ino))
+            self._conn.executemany(
+                "DELETE FROM file_hashes WHERE dev = ? AND ino = ?", stale
+            )
+            self._conn.commit()
+            self._pending_writes = 0
+            return len(stale)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self) -> str:
+        """Return a one-line summary of cache effectiveness for this run."""
+        return (f"Hash cache: {self.hits} hits, {self.misses} misses "
+                f"({self.hit_rate:.1%} hit rate)")
+
+    def flush(self) -> None:
+        """Commit buffered writes so they survive a crash."""
+        with self._lock:
+            self._conn.commit()
+            self._pending_writes = 0
+
+    def close(self) -> None:
+        """Flush pending writes and close the database."""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    def __enter__(self) -> "HashCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,406 @@
+"""
+Project Import Graph
+-------------------
+Builds the graph of which project modules import which others, using the AST
+import scanner, to find what slows startup and what blocks lazy loading.
+Features:
+- Resolves absolute, relative and ``sys.path``-relative (bare) imports to the
+  project's own modules; standard-library and third-party imports become
+  external nodes
+- Separates load-time imports from imports deferred inside functions
+- Reports import cycles among load-time imports
+- Transitive import cost per module, from source size or from the times of a
+  saved import-time profile
+- Ranks the imports whose deferral would save the most startup cost
+- Exports the graph as Graphviz DOT or JSON
+- Incremental: parsed imports come from the per-file import cache
+"""
+
+import argparse
+import json
+import os
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.core.add_requirements import DEFAULT_EXCLUDED_DIRS
+from src.core.import_scanner import (
+    ImportCache, ImportRecord, iter_python_files, scan_imports, stdlib_modules
+)
+
+@dataclass
+class ModuleNode:
+    """A module in the graph."""
+    name: str
+    # 'local', 'stdlib' or 'third-party'
+    kind: str
+    path: Optional[str] = None
+    # Cost of executing the module itself, in the graph's cost unit
+    cost: float = 0.0
+
+@dataclass(frozen=True)
+class ImportEdge:
+    """One import statement from a project module."""
+    source: str
+    target: str
+    lineno: int
+    # True when the import runs only when the enclosing function is called
+    deferred: bool
+
+def module_name(path: str, root: str) -> str:
+    """Return the dotted module name of a source file relative to the project root."""
+    parts = os.path.splitext(os.path.relpath(path, root))[0].split(os.sep)
+    if parts[-1] == '__init__':
+        parts.pop()
+    return '.'.join(parts)
+
+class ImportGraph:
+    """Module import graph of a project."""
+
+    def __init__(self, cost_unit: str = 'KB'):
+        """Create an empty graph.
+
+        Args:
+            cost_unit (str): Unit of the module costs, for reports. Defaults to 'KB'.
+        """
+        self.nodes: Dict[str, ModuleNode] = {}
+        self.edges: List[ImportEdge] = []
+        self.cost_unit = cost_unit
+        self._load_deps: Dict[str, Set[str]] = defaultdict(set)
+        self._stdlib = stdlib_modules()
+
+    @classmethod
+    def build(cls, directory: str, cache: Optional[ImportCache] = None,
+              workers: Optional[int] = None,
+              excluded_dirs: Iterable[str] = DEFAULT_EXCLUDED_DIRS,
+              profile_timings: Optional[Dict[str, Tuple[int, int]]] = None) -> "ImportGraph":
+        """Scan a project and build its import graph.
+
+        Args:
+            directory (str): Project root; module names are relative to it.
+            cache (Optional[ImportCache]): Per-file import cache. Defaults to None.
+            workers (Optional[int]): Parser processes for uncached files.
+            excluded_dirs (Iterable[str]): Directory names not scanned.
+            profile_timings (Optional[Dict[str, Tuple[int, int]]]): Module name to
+                (self, cumulative) microseconds from an import-time profile. When
+                given, costs are measured times in ms: a project module costs its
+                self time and an external module its cumulative time. Otherwise a
+                project module costs its source size in KB and external modules
+                cost nothing.
+
+        Returns:
+            ImportGraph: The graph.
+        """
+        graph = cls('ms' if profile_timings is not None else 'KB')
+        files = iter_python_files(directory, excluded_dirs)
+        for path in files:
+            name = module_name(path, directory)
+            if profile_timings is not None:
+                cost = graph._profile_time(profile_timings, name, 0) / 1000
+            else:
+                cost = os.path.getsize(path) / 1024
+            graph.nodes[name] = ModuleNode(name, 'local', path, cost)
+        graph._index_suffixes()
+
+        for path, records in scan_imports(files, cache=cache, workers=workers).items():
+            source = module_name(path, directory)
+            for record in records:
+                for target in graph._resolve(source, path, record):
+                    if target not in graph.nodes:
+                        top = target.split('.')[0]
+                        kind = 'stdlib' if top in graph._stdlib else 'third-party'
+                        cost = 0.0
+                        if profile_timings is not None:
+                            cost = graph._profile_time(profile_timings, target, 1) / 1000
+                        graph.nodes[target] = ModuleNode(target, kind, cost=cost)
+                    graph.add_edge(ImportEdge(source, target, record.lineno, record.deferred))
+        return graph
+
+    @staticmethod
+    def _profile_time(timings: Dict[str, Tuple[int, int]], name: str, field: int) -> int:
+        """Look a module up in profile timings, also by the bare name a path hack gives it."""
+        parts = name.split('.')
+        for i in range(len(parts)):
+            times = timings.get('.'.join(parts[i:]))
+            if times:
+                return times[field]
+        return 0
+
+    def _index_suffixes(self) -> None:
+        """Index project modules by every dotted suffix of their name.
+
+        Tools in this repository add their own folders to ``sys.path``, so
+        ``from core import x`` may refer to ``src.core.x``.
+        """
+        self._by_suffix: Dict[str, Set[str]] = defaultdict(set)
+        for name in self.nodes:
+            parts = name.split('.')
+            for i in range(len(parts)):
+                self._by_suffix['.'.join(parts[i:])].add(name)
+
+    def _lookup(self, name: str) -> Optional[str]:
+        """Return the project module a dotted name refers to, if exactly one matches."""
+        if name in self.nodes and self.nodes[name].kind == 'local':
+            return name
+        matches = self._by_suffix.get(name, ())
+        return next(iter(matches)) if len(matches) == 1 else None
+
+    def _resolve(self, source: str, path: str, record: ImportRecord) -> List[str]:
+        """Return the modules one import statement loads."""
+        if record.level:
+            package = source.split('.') if path.endswith('__init__.py') else source.split('.')[:-1]
+            package = package[:len(package) - (record.level - 1)]
+            base = '.'.join(package + ([record.module] if record.module else []))
+        else:
+            base = record.module
+            if base.split('.')[0] in self._stdlib and base not in self.nodes:
+                return [base.split('.')[0]]
+
+        # ``from package import submodule`` loads the submodule itself
+        targets = [found for found in (self._lookup(f"{base}.{name}" if base else name)
+                                       for name in record.names if name != '*') if found]
+        if targets:
+            return targets
+        parts = base.split('.')
+        while parts:
+            found = self._lookup('.'.join(parts))
+            if found:
+                return [found]
+            parts.pop()
+        if record.level:
+            return []  # relative import of something outside the scanned tree
+        return [record.module.split('.')[0]]
+
+    def add_edge(self, edge: ImportEdge) -> None:
+        """Add an import to the graph."""
+        if edge.source == edge.target:
+            return
+        self.edges.append(edge)
+        if not edge.deferred:
+            self._load_deps[edge.source].add(edge.target)
+
+    def _dependencies(self, name: str) -> Set[str]:
+        """Modules loaded when ``name`` is, including its enclosing package."""
+        deps = set(self._load_deps.get(name, ()))
+        parent = name.rpartition('.')[0]
+        if parent and parent in self.nodes:
+            deps.add(parent)
+        return deps
+
+    def closure(self, name: str, skip: Optional[Tuple[str, str]] = None) -> Set[str]:
+        """Return every module loaded by importing ``name`` (itself included).
+
+        Args:
+            name (str): Module to start from.
+            skip (Optional[Tuple[str, str]]): A (source, target) import to leave
+                out, as if it were deferred.
+        """
+        seen = {name}
+        stack = [name]
+        while stack:
+            current = stack.pop()
+            for dep in self._dependencies(current):
+                if dep not in seen and (current, dep) != skip:
+                    seen.add(dep)
+                    stack.append(dep)
+        return seen
+
+    def transitive_cost(self, name: str, skip: Optional[Tuple[str, str]] = None) -> float:
+        """Return the cost of importing a module and everything it loads.
+
+        Shared dependencies are counted once. Externally measured modules may
+        overlap (two libraries importing the same stdlib module), so with
+        profile costs this is an upper bound.
+        """
+        return sum(self.nodes[module].cost for module in self.closure(name, skip))
+
+    def cycles(self) -> List[List[str]]:
+        """Return the import cycles among load-time imports of project modules.
+
+        Each cycle is a strongly connected component of two or more modules,
+        found with an iterative Tarjan's algorithm and sorted by name.
+        """
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        components = []
+        counter = 0
+        for start in sorted(self._load_deps):
+            if start in index:
+                continue
+            work = [(start, iter(sorted(self._load_deps.get(start, ()))))]
+            index[start] = lowlink[start] = counter
+            counter += 1
+            stack.append(start)
+            on_stack.add(start)
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child not in index:
+                        index[child] = lowlink[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(sorted(self._load_deps.get(child, ())))))
+                        break
+                    if child in on_stack:
+                        lowlink[node] = min(lowlink[node], index[child])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        if len(component) > 1:
+                            components.append(sorted(component))
+        return sorted(components)
+
+    def heaviest_modules(self, limit: int = 10) -> List[Tuple[str, float, int]]:
+        """Return (module, transitive cost, modules loaded) for the costliest project modules."""
+        rows = [(name, self.transitive_cost(name), len(self.closure(name)))
+                for name, node in self.nodes.items() if node.kind == 'local']
+        return sorted(rows, key=lambda row: (-row[1], row[0]))[:limit]
+
+    def deferral_candidates(self, limit: int = 10) -> List[Tuple[str, str, float]]:
+        """Rank load-time imports by the cost deferring them would save.
+
+        The saving of an import is how much cheaper importing its source module
+        becomes when that one import moves into the functions that need it.
+        Dependencies still reached through other imports save nothing.
+
+        Returns:
+            List[Tuple[str, str, float]]: (importer, imported, saving), largest first.
+        """
+        rows = []
+        for source, targets in self._load_deps.items():
+            full = self.transitive_cost(source)
+            for target in targets:
+                saving = full - self.transitive_cost(source, skip=(source, target))
+                if saving > 0:
+                    rows.append((source, target, saving))
+        return sorted(rows, key=lambda row: (-row[2], row[0], row[1]))[:limit]
+
+    def to_dict(self) -> dict:
+        """Return the graph, costs and cycles as JSON-serializable data."""
+        return {
+            'cost_unit': self.cost_unit,
+            'modules': [
+                {'name': node.name, 'kind': node.kind, 'path': node.path,
+                 'cost': round(node.cost, 3),
+                 'transitive_cost': round(self.transitive_cost(node.name), 3)}
+                for node in sorted(self.nodes.values(), key=lambda node: node.name)
+            ],
+            'imports': [
+                {'source': edge.source, 'target': edge.target,
+                 'line': edge.lineno, 'deferred': edge.deferred}
+                for edge in self.edges
+            ],
+            'cycles': self.cycles(),
+        }
+
+    def to_dot(self, include_external: bool = True) -> str:
+        """Return the graph in Graphviz DOT format.
+
+        Deferred imports are dashed, imports inside a cycle are red and
+        external modules are drawn as grey boxes.
+        """
+        in_cycle = {module: i for i, cycle in enumerate(self.cycles()) for module in cycle}
+        lines = ['digraph imports {', '    rankdir=LR;', '    node [shape=ellipse];']
+        for node in sorted(self.nodes.values(), key=lambda node: node.name):
+            if node.kind != 'local' and not include_external:
+                continue
+            style = '' if node.kind == 'local' else ', shape=box, color=grey'
+            lines.append(f'    "{node.name}" [label="{node.name}\\n'
+                         f'{self.transitive_cost(node.name):.1f} {self.cost_unit}"{style}];')
+        drawn = set()
+        for edge in self.edges:
+            key = (edge.source, edge.target, edge.deferred)
+            if key in drawn or (self.nodes[edge.target].kind != 'local' and not include_external):
+                continue
+            drawn.add(key)
+            attrs = []
+            if edge.deferred:
+                attrs.append('style=dashed')
+            elif in_cycle.get(edge.source, -1) == in_cycle.get(edge.target, -2):
+                attrs.append('color=red')
+            suffix = f" [{', '.join(attrs)}]" if attrs else ''
+            lines.append(f'    "{edge.source}" -> "{edge.target}"{suffix};')
+        lines.append('}')
+        return '\n'.join(lines) + '\n'
+
+    def report(self, limit: int = 10) -> str:
+        """Return a readable summary: size, cycles, heaviest modules and deferral candidates."""
+        local = sum(1 for node in self.nodes.values() if node.kind == 'local')
+        deferred = sum(1 for edge in self.edges if edge.deferred)
+        lines = [f"Import graph: {local} project modules, {len(self.nodes) - local} external, "
+                 f"{len(self.edges)} imports ({deferred} deferred)"]
+
+        cycles = self.cycles()
+        lines.append(f"\nImport cycles: {len(cycles) or 'none'}")
+        for cycle in cycles:
+            lines.append(f"  {' -> '.join(cycle + cycle[:1])}")
+
+        lines.append("\nHeaviest modules to import (transitive cost, modules loaded):")
+        for name, cost, count in self.heaviest_modules(limit):
+            lines.append(f"  {cost:10.1f} {self.cost_unit} {count:5d}  {name}")
+
+        lines.append("\nBest candidates for deferred imports (saving on import):")
+        candidates = self.deferral_candidates(limit)
+        if not candidates:
+            lines.append("  none")
+        for source, target, saving in candidates:
+            lines.append(f"  {saving:10.1f} {self.cost_unit}  {source} -> {target}")
+        return '\n'.join(lines)
+
+def load_profile_timings(path: str) -> Dict[str, Tuple[int, int]]:
+    """Read module (self, cumulative) times from a saved import-time profile."""
+    from src.tools.import_profiler import ImportProfile
+    return {name: (node.self_us, node.cumulative_us)
+            for name, node in ImportProfile.load(path).timings().items()}
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Analyze the import graph of a project: cycles, import cost and "
+                    "candidates for deferred imports."
+    )
+    parser.add_argument('directory', nargs='?', default='.', help="Project root (default: .)")
+    parser.add_argument('--json', metavar='FILE', help="Write the graph as JSON")
+    parser.add_argument('--dot', metavar='FILE', help="Write the graph as Graphviz DOT")
+    parser.add_argument('--local-only', action='store_true',
+                        help="Leave external modules out of the DOT graph")
+    parser.add_argument('--profile', metavar='FILE',
+                        help="Import-time profile (from import_profiler --save) "
+                             "to use measured times as costs")
+    parser.add_argument('--top', type=int, default=10, help="Rows per ranking (default: 10)")
+    parser.add_argument('--workers', type=int, help="Parser processes (default: CPU count)")
+    parser.add_argument('--no-cache', action='store_true', help="Do not use the import cache")
+    args = parser.parse_args()
+
+    timings = load_profile_timings(args.profile) if args.profile else None
+    cache = None if args.no_cache else ImportCache()
+    try:
+        graph = ImportGraph.build(args.directory, cache, args.workers, profile_timings=timings)
+    finally:
+        if cache:
+            cache.close()
+
+    print(graph.report(args.top))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(graph.to_dict(), f, indent=2)
+        print(f"\nGraph written to {args.json}")
+    if args.dot:
+        with open(args.dot, 'w') as f:
+            f.write(graph.to_dot(include_external=not args.local_only))
+        print(f"\nGraph written to {args.dot}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+AST Import Scanner
+-----------------
+Extracts import statements from Python source files by parsing them, rather
+than matching lines, so indented, conditional and multi-line imports are seen.
+Features:
+- Records module, relative level, imported names, line and whether the import
+  runs at module load or is deferred inside a function
+- Parses files in a process pool
+- SQLite cache keyed on absolute path, valid while size and mtime_ns are unchanged
+- Standard-library detection that works before Python 3.10
+"""
+
+import ast
+import json
+import os
+import sqlite3
+import sys
+import sysconfig
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple, Union
+from src.core.file_walker import walk
+from src.core.shared_scan import iter_shared_scan
+
+DEFAULT_IMPORT_CACHE_PATH = Path.home() / '.cache' / 'python_tools' / 'import_cache.sqlite3'
+
+# Below this many uncached files, parsing in-process beats starting a pool
+PARALLEL_THRESHOLD = 32
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_imports (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    imports TEXT NOT NULL
+)
+"""
+
+class ImportRecord(NamedTuple):
+    """One imported module as written in the source."""
+    module: str
+    # 0 for absolute imports, otherwise the number of leading dots
+    level: int
+    # Names taken by ``from module import a, b``; empty for ``import module``
+    names: Tuple[str, ...]
+    lineno: int
+    # True when the import sits inside a function, so it only runs when called
+    deferred: bool
+
+    @property
+    def top_level(self) -> str:
+        """First component of the module name."""
+        return self.module.split('.')[0]
+
+class _ImportVisitor(ast.NodeVisitor):
+    """Collects imports, tracking whether each one is inside a function body."""
+
+    def __init__(self):
+        self.records: List[ImportRecord] = []
+        self._function_depth = 0
+
+    def _visit_function(self, node: ast.AST) -> None:
+        self._function_depth += 1
+        self.generic_visit(node)
+        self._function_depth -= 1
+
+    visit_FunctionDef = visit_AsyncFunctionDef = _visit_function
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self.records.append(ImportRecord(alias.name, 0, (), node.lineno,
+                                             self._function_depth > 0))
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        self.records.append(ImportRecord(
+            node.module or '', node.level, tuple(alias.name for alias in node.names),
+            node.lineno, self._function_depth > 0
+        ))
+
+def parse_imports(source: Union[str, bytes], filename: str = '<unknown>') -> List[ImportRecord]:
+    """Return every import in a piece of Python source.
+
+    Raises:
+        SyntaxError: If the source cannot be parsed.
+    """
+    visitor = _ImportVisitor()
+    visitor.visit(ast.parse(source, filename=filename))
+    return visitor.records
+
+def _parse_file(path: str) -> Tuple[str, Optional[List[ImportRecord]], Optional[str]]:
+    """Parse one file. Module-level so it can run in a worker process.
+
+    Returns:
+        Tuple: The path, its imports (None on failure) and an error message.
+    """
+    try:
+        with open(path, 'rb') as f:
+            return path, parse_imports(f.read(), path), None
+    except (OSError, SyntaxError, ValueError) as e:
+        return path, None, str(e)
+
+class ImportCache:
+    """On-disk cache of the imports found in each source file."""
+
+    def __init__(self, db_path: Union[str, Path] = DEFAULT_IMPORT_CACHE_PATH):
+        """Open (creating if necessary) the cache database.
+
+        Args:
+            db_path (Union[str, Path]): Location of the SQLite database file.
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(_SCHEMA)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, st: os.stat_result) -> Optional[List[ImportRecord]]:
+        """Return the cached imports of a file if it is unchanged since they were stored.
+
+        Rows are keyed on the absolute path, so the same relative path in two
+        projects never shares an entry.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, imports FROM file_imports WHERE path = ?",
+                (os.path.abspath(path),)
+            ).fetchone()
+        if row is None or (row[0], row[1]) != (st.st_size, st.st_mtime_ns):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [ImportRecord(module, level, tuple(names), lineno, deferred)
+                for module, level, names, lineno, deferred in json.loads(row[2])]
+
+    def put(self, path: str, st: os.stat_result, records: List[ImportRecord]) -> None:
+        """Store the imports of a file together with its size and mtime."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO file_imports (path, size, mtime_ns, imports) "
+                "VALUES (?, ?, ?, ?)",
+                (os.path.abspath(path), st.st_size, st.st_mtime_ns, json.dumps(records))
+            )
+
+    def report(self) -> str:
+        """Return a one-line summary of cache effectiveness."""
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0.0
+        return f"Import cache: {self.hits} hits, {self.misses} misses ({rate:.1%} hit rate)"
+
+    def close(self) -> None:
+        """Commit pending writes and close the database."""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    def __enter__(self) -> "ImportCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+def iter_python_files(directory: Union[str, Path],
+                      excluded_dirs: Iterable[str] = ()) -> List[str]:
+    """Return every ``.py`` file below a directory, sorted, skipping excluded names.
+
+    Reuses a shared scan taken by a tool pipeline when one covers the directory.
+    """
+    entries = iter_shared_scan(directory, excluded_dirs)
+    if entries is None:
+        entries = walk(directory, excluded_dirs=excluded_dirs)
+    return sorted(entry.path for entry in entries if entry.name.endswith('.py'))
+
+def scan_imports(paths: Iterable[str], cache: Optional[ImportCache] = None,
+                 workers: Optional[int] = None) -> Dict[str, List[ImportRecord]]:
+    """Extract the imports of many files, using the cache and a process pool.
+
+    Args:
+        paths (Iterable[str]): Source files to scan.
+        cache (Optional[ImportCache]): Cache consulted before parsing. Defaults to None.
+        workers (Optional[int]): Worker processes for uncached files. Defaults to
+                               the CPU count; 1 parses in this process.
+
+    Returns:
+        Dict[str, List[ImportRecord]]: Imports per file. Files that cannot be read
+                                       or parsed are reported and left out.
+    """
+    results: Dict[str, List[ImportRecord]] = {}
+    stats: Dict[str, os.stat_result] = {}
+    misses: List[str] = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            print(f"Error reading {path}: {e}")
+            continue
+        cached = cache.get(path, st) if cache else None
+        if cached is not None:
+            results[path] = cached
+        else:
+            stats[path] = st
+            misses.append(path)
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(misses) >= PARALLEL_THRESHOLD:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = list(executor.map(_parse_file, misses, chunksize=16))
+    else:
+        parsed = [_parse_file(path) for path in misses]
+
+    for path, records, error in parsed:
+        if records is None:
+            print(f"Skipping {path}: {error}")
+            continue
+        results[path] = records
+        if cache:
+            cache.put(path, stats[path], records)
+    return results
+
+def stdlib_modules() -> FrozenSet[str]:
+    """Top-level module names of the standard library of the running interpreter."""
+    names = getattr(sys, 'stdlib_module_names', None)
+    if names is not None:
+        return frozenset(names)
+    # Python < 3.10: built-in modules plus whatever lives in the stdlib directory
+    names = set(sys.builtin_module_names)
+    stdlib = sysconfig.get_paths()['stdlib']
+    for directory in (stdlib, os.path.join(stdlib, 'lib-dynload')):
+        try:
+            entries = os.listdir(directory)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry == 'site-packages':
+                continue
+            name = entry.split('.')[0]
+            if entry.endswith(('.py', '.so', '.pyd')) or os.path.isdir(os.path.join(directory, entry)):
+                names.add(name)
+    return frozenset(names)
@@ -0,0 +1,209 @@
+"""
+Requirements Installer
+---------------------
+Installs the project's requirements, but only when they are not already met.
+Features:
+- Checks requirements.txt against installed distributions with
+  importlib.metadata, without starting pip
+- Stamp of the requirements, interpreter and site-packages state, so an
+  unchanged environment is confirmed without parsing anything
+- Runs pip only when a requirement is missing or out of range
+- Logs how long the check took; only the command line prints it
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import site
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from importlib import metadata
+from pathlib import Path
+from typing import List, Optional, Union
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+REQUIREMENTS_PATH = PROJECT_ROOT / 'requirements.txt'
+DEFAULT_STAMP_PATH = Path.home() / '.cache' / 'python_tools' / 'requirements.stamp'
+
+# Tools call install_requirements() when imported, so nothing is printed unless pip runs
+logger = logging.getLogger(__name__)
+
+@dataclass
+class RequirementCheck:
+    """Outcome of checking requirements against the installed distributions."""
+    satisfied: bool
+    # Requirement lines that are not installed or not in the required range
+    unmet: List[str] = field(default_factory=list)
+    # True when an unchanged stamp confirmed the requirements without checking them
+    from_stamp: bool = False
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        """Return a one-line summary including the time the check took."""
+        took = f"{self.elapsed * 1000:.1f} ms"
+        if self.satisfied:
+            how = "unchanged since last check" if self.from_stamp else "all installed"
+            return f"Requirements satisfied ({how}) in {took}"
+        return f"Requirements not satisfied ({', '.join(self.unmet)}) in {took}"
+
+def _site_directories() -> List[str]:
+    """Directories pip installs into for the running interpreter."""
+    directories = list(site.getsitepackages()) if hasattr(site, 'getsitepackages') else []
+    if site.ENABLE_USER_SITE:
+        directories.append(site.getusersitepackages())
+    return directories
+
+def environment_stamp(requirements_file: Union[str, Path] = REQUIREMENTS_PATH) -> str:
+    """Return a digest of the requirements, the interpreter and its site-packages.
+
+    Installing or removing a distribution changes the modification time of its
+    site-packages directory, so the stamp changes with the environment too.
+    """
+    digest = hashlib.sha256()
+    with open(requirements_file, 'rb') as f:
+        digest.update(f.read())
+    digest.update(sys.executable.encode())
+    for directory in _site_directories():
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            mtime_ns = 0
+        digest.update(f"\0{directory}\0{mtime_ns}".encode())
+    return digest.hexdigest()
+
+def read_requirements(requirements_file: Union[str, Path] = REQUIREMENTS_PATH) -> List[str]:
+    """Return the requirement lines of a requirements file, without comments or options."""
+    requirements = []
+    with open(requirements_file) as f:
+        for line in f:
+            line = line.split(' #', 1)[0].strip()
+            if line and not line.startswith(('#', '-')):
+                requirements.append(line)
+    return requirements
+
+def _load_requirement_parser():
+    """Return packaging's Requirement class, from pip's vendored copy if needed."""
+    try:
+        from packaging.requirements import Requirement
+    except ImportError:
+        try:
+            from pip._vendor.packaging.requirements import Requirement
+        except ImportError:
+            return None
+    return Requirement
+
+def is_satisfied(requirement: str, parser=None) -> bool:
+    """Return True if an installed distribution meets a requirement line.
+
+    Requirements whose environment marker does not apply (another platform or
+    Python version) count as met.
+
+    Raises:
+        ValueError: If the line is not a valid requirement.
+    """
+    parser = parser or _load_requirement_parser()
+    if parser is None:
+        raise ValueError("packaging is unavailable, so requirements cannot be checked")
+    try:
+        parsed = parser(requirement)
+    except Exception as e:  # InvalidRequirement, from whichever packaging was found
+        raise ValueError(f"Invalid requirement {requirement!r}: {e}") from e
+    if parsed.marker is not None and not parsed.marker.evaluate():
+        return True
+    try:
+        installed = metadata.version(parsed.name)
+    except metadata.PackageNotFoundError:
+        return False
+    return parsed.specifier.contains(installed, prereleases=True)
+
+def check_requirements(requirements_file: Union[str, Path] = REQUIREMENTS_PATH,
+                       stamp_path: Optional[Union[str, Path]] = DEFAULT_STAMP_PATH
+                       ) -> RequirementCheck:
+    """Check whether every requirement is installed, without running pip.
+
+    Args:
+        requirements_file (Union[str, Path]): Requirements to check.
+        stamp_path (Optional[Union[str, Path]]): Stamp recording the environment
+            of the last successful check. None always checks every requirement.
+
+    Returns:
+        RequirementCheck: Unmet requirements and the time taken.
+    """
+    started = time.perf_counter()
+    stamp = environment_stamp(requirements_file)
+    if stamp_path:
+        try:
+            if Path(stamp_path).read_text().strip() == stamp:
+                return RequirementCheck(True, from_stamp=True,
+                                        elapsed=time.perf_counter() - started)
+        except OSError:
+            pass
+
+    parser = _load_requirement_parser()
+    unmet = []
+    for requirement in read_requirements(requirements_file):
+        try:
+            if not is_satisfied(requirement, parser):
+                unmet.append(requirement)
+        except ValueError:
+            unmet.append(requirement)  # let pip decide
+    if not unmet and stamp_path:
+        try:
+            Path(stamp_path).parent.mkdir(parents=True, exist_ok=True)
+            Path(stamp_path).write_text(stamp + '\n')
+        except OSError:
+            pass  # the next run just checks again
+    return RequirementCheck(not unmet, unmet, elapsed=time.perf_counter() - started)
+
+def install_requirements(requirements_file: Union[str, Path] = REQUIREMENTS_PATH,
+                         force: bool = False,
+                         stamp_path: Optional[Union[str, Path]] = DEFAULT_STAMP_PATH) -> bool:
+    """Install the requirements with pip unless they are already satisfied.
+
+    Args:
+        requirements_file (Union[str, Path]): Requirements file to install.
+        force (bool): Run pip even if the check passes. Defaults to False.
+        stamp_path (Optional[Union[str, Path]]): Stamp of the last successful check.
+
+    Returns:
+        bool: True if the requirements are satisfied afterwards.
+    """
+    if not os.path.exists(requirements_file):
+        logger.warning(f"Requirements file not found: {requirements_file}")
+        return False
+    check = check_requirements(requirements_file, stamp_path)
+    logger.info(check.summary())
+    if check.satisfied and not force:
+        return True
+
+    logger.warning(f"Installing requirements from {requirements_file}...")
+    result = subprocess.run([sys.executable, '-m', 'pip', 'install', '-r', str(requirements_file)])
+    if result.returncode != 0:
+        logger.error(f"pip exited with status {result.returncode}")
+        return False
+    # Record the new environment so the next launch skips pip
+    return check_requirements(requirements_file, stamp_path).satisfied
+
+def main():
+    """Check the requirements and install them if needed."""
+    parser = argparse.ArgumentParser(description="Install the project requirements if needed.")
+    parser.add_argument('requirements', nargs='?', default=str(REQUIREMENTS_PATH),
+                        help="Requirements file (default: the project's requirements.txt)")
+    parser.add_argument('--check', action='store_true',
+                        help="Only check; exit with status 1 if requirements are unmet")
+    parser.add_argument('--force', action='store_true', help="Run pip even if satisfied")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    if args.check:
+        check = check_requirements(args.requirements, stamp_path=None)
+        print(check.summary())
+        sys.exit(0 if check.satisfied else 1)
+    if not install_requirements(args.requirements, args.force):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
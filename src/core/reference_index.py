@@ -0,0 +1,193 @@
+"""
+Reference Index
+--------------
+Persistent index of the files in a known corpus (a golden archive), so new
+trees can be checked against it without rehashing the corpus every time.
+Features:
+- SQLite table of path, size and digest, indexed on (size, digest)
+- Bloom filters over sizes and over (size, digest) pairs, so most files that
+  are not in the corpus are rejected without being read or looked up
+- Filters are stored with the index and rebuilt when it changes
+"""
+
+import hashlib
+import math
+import sqlite3
+import struct
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+# Target false-positive rate of each Bloom filter
+DEFAULT_FALSE_POSITIVE_RATE = 0.01
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS refs (
+    path TEXT PRIMARY KEY, size INTEGER NOT NULL, digest TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS refs_size_digest ON refs (size, digest);
+"""
+
+_HEADER = struct.Struct('<QI')
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over a BLAKE2b digest."""
+
+    def __init__(self, capacity: int, false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE):
+        """Create an empty filter.
+
+        Args:
+            capacity (int): Number of keys the filter is sized for.
+            false_positive_rate (float): Acceptable false-positive rate at capacity.
+        """
+        capacity = max(capacity, 1)
+        self.size = max(64, int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: bytes) -> Iterable[int]:
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: bytes) -> None:
+        """Add a key to the filter."""
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: bytes) -> bool:
+        """Return False if the key was never added, True if it probably was."""
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(key))
+
+    def to_bytes(self) -> bytes:
+        """Serialize the filter."""
+        return _HEADER.pack(self.size, self.hash_count) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        """Load a filter written by ``to_bytes``."""
+        bloom = cls.__new__(cls)
+        bloom.size, bloom.hash_count = _HEADER.unpack_from(data)
+        bloom.bits = bytearray(data[_HEADER.size:])
+        return bloom
+
+def _size_key(size: int) -> bytes:
+    return struct.pack('<Q', size)
+
+def _entry_key(size: int, digest: str) -> bytes:
+    return struct.pack('<Q', size) + bytes.fromhex(digest)
+
+class ReferenceIndex:
+    """On-disk index of (size, digest) pairs found in a reference corpus."""
+
+    def __init__(self, db_path: Union[str, Path], algorithm: str):
+        """Open (creating if necessary) a reference index.
+
+        Args:
+            db_path (Union[str, Path]): Location of the SQLite database file.
+            algorithm (str): Digest algorithm the index holds. Opening an index
+                           built with another algorithm is an error.
+
+        Raises:
+            ValueError: If the index was built with a different algorithm.
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.algorithm = algorithm
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.executescript(_SCHEMA)
+        stored = self._get_meta('algorithm')
+        if stored is None:
+            with self._conn:
+                self._set_meta('algorithm', algorithm)
+        elif stored != algorithm:
+            self._conn.close()
+            raise ValueError(f"Reference index {self.db_path} holds {stored} digests, "
+                             f"not {algorithm}")
+        self._sizes: Optional[BloomFilter] = None
+        self._entries: Optional[BloomFilter] = None
+        self._dirty = False
+        sizes, entries = self._get_meta('size_filter'), self._get_meta('entry_filter')
+        if sizes is not None and entries is not None:
+            self._sizes = BloomFilter.from_bytes(sizes)
+            self._entries = BloomFilter.from_bytes(entries)
+        elif len(self):
+            self.rebuild_filters()
+
+    def _get_meta(self, key: str):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM refs").fetchone()[0]
+
+    def add(self, path: str, size: int, digest: str) -> None:
+        """Record a corpus file, replacing any previous entry for the path.
+
+        Filters are rebuilt by ``save``; until then lookups still see the file.
+        """
+        self._conn.execute(
+            "INSERT OR REPLACE INTO refs (path, size, digest) VALUES (?, ?, ?)",
+            (path, size, digest)
+        )
+        self._dirty = True
+
+    def clear(self) -> None:
+        """Remove every entry, e.g. before rebuilding the index from scratch."""
+        with self._conn:
+            self._conn.execute("DELETE FROM refs")
+            self._conn.execute("DELETE FROM meta WHERE key IN ('size_filter', 'entry_filter')")
+        self._sizes = self._entries = None
+        self._dirty = False
+
+    def rebuild_filters(self, false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE) -> None:
+        """Size the Bloom filters for the current entries and store them."""
+        count = len(self)
+        distinct_sizes = self._conn.execute("SELECT COUNT(DISTINCT size) FROM refs").fetchone()[0]
+        sizes = BloomFilter(distinct_sizes, false_positive_rate)
+        entries = BloomFilter(count, false_positive_rate)
+        for size, digest in self._conn.execute("SELECT size, digest FROM refs"):
+            sizes.add(_size_key(size))
+            entries.add(_entry_key(size, digest))
+        with self._conn:
+            self._set_meta('size_filter', sizes.to_bytes())
+            self._set_meta('entry_filter', entries.to_bytes())
+        self._sizes, self._entries = sizes, entries
+        self._dirty = False
+
+    def save(self) -> None:
+        """Commit added entries and refresh the filters."""
+        self._conn.commit()
+        if self._dirty:
+            self.rebuild_filters()
+
+    def may_contain_size(self, size: int) -> bool:
+        """Return False if no corpus file has this size, without touching the database."""
+        if self._dirty:
+            return True
+        return self._sizes is not None and _size_key(size) in self._sizes
+
+    def lookup(self, size: int, digest: str) -> Optional[str]:
+        """Return the path of a corpus file with this size and digest, if any."""
+        if not self._dirty and (self._entries is None or _entry_key(size, digest) not in self._entries):
+            return None
+        row = self._conn.execute(
+            "SELECT path FROM refs WHERE size = ? AND digest = ? LIMIT 1", (size, digest)
+        ).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        """Save pending changes and close the database."""
+        self.save()
+        self._conn.close()
+
+    def __enter__(self) -> "ReferenceIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,102 @@
+"""
+Shared Filesystem Scan
+---------------------
+Lets several tool processes reuse one walk of a directory tree instead of each
+walking it again.
+Features:
+- The coordinating process walks the tree once and writes every file with its
+  stat fields to a JSON-lines scan file
+- Workers find the scan through an environment variable and read it in place
+  of ``walk``, keeping their own exclusions and size limits
+- A scan is only used when it covers the worker's root and excluded no
+  directory the worker wants to see; otherwise the worker walks as usual
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+
+from src.core.file_walker import WalkEntry, walk
+
+# Environment variable holding the path of the scan file for worker processes
+SCAN_ENV_VAR = 'PYTHON_TOOLS_SHARED_SCAN'
+
+def write_scan(roots: Iterable[Union[str, Path]], scan_path: Union[str, Path],
+               excluded_dirs: Iterable[str] = ()) -> int:
+    """Walk the roots once and record every regular file.
+
+    Args:
+        roots (Iterable[Union[str, Path]]): Directories to walk.
+        scan_path (Union[str, Path]): File the scan is written to.
+        excluded_dirs (Iterable[str]): Directory names pruned from the walk.
+
+    Returns:
+        int: Number of files recorded.
+    """
+    roots = [os.path.abspath(root) for root in roots]
+    excluded_dirs = sorted(set(excluded_dirs))
+    count = 0
+    with open(scan_path, 'w') as f:
+        f.write(json.dumps({'roots': roots, 'excluded_dirs': excluded_dirs}) + '\n')
+        for root in roots:
+            for entry in walk(root, excluded_dirs=excluded_dirs):
+                st = entry.stat
+                f.write(json.dumps([entry.path, list(st)[:10], st.st_mtime_ns,
+                                    getattr(st, 'st_blocks', 0)]) + '\n')
+                count += 1
+    return count
+
+def _covers(roots: Iterable[str], root: str) -> bool:
+    return any(root == scanned or root.startswith(scanned.rstrip(os.sep) + os.sep)
+               for scanned in roots)
+
+def iter_shared_scan(root: Union[str, Path], excluded_dirs: Iterable[str] = (),
+                     max_file_size: Optional[int] = None) -> Optional[Iterator[WalkEntry]]:
+    """Return the files below ``root`` from the shared scan, if one applies.
+
+    Paths are rebuilt on ``root`` as given, so they look exactly like those
+    ``walk(root)`` would yield.
+
+    Args:
+        root (Union[str, Path]): Directory the caller would walk.
+        excluded_dirs (Iterable[str]): Directory names the caller prunes.
+        max_file_size (Optional[int]): Skip files larger than this many bytes.
+
+    Returns:
+        Optional[Iterator[WalkEntry]]: Files as ``walk`` would yield them, or None
+        when no scan is configured or it does not cover this walk.
+    """
+    scan_path = os.environ.get(SCAN_ENV_VAR)
+    if not scan_path:
+        return None
+    try:
+        f = open(scan_path)
+        header = json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+    root = os.fspath(root)
+    absolute = os.path.abspath(root)
+    excluded = frozenset(excluded_dirs)
+    if not _covers(header['roots'], absolute) or not excluded.issuperset(header['excluded_dirs']):
+        f.close()
+        return None
+
+    def entries() -> Iterator[WalkEntry]:
+        prefix = absolute.rstrip(os.sep) + os.sep
+        with f:
+            for line in f:
+                path, fields, mtime_ns, blocks = json.loads(line)
+                if not path.startswith(prefix):
+                    continue
+                relative = path[len(prefix):]
+                parts = relative.split(os.sep)
+                if excluded.intersection(parts[:-1]):
+                    continue
+                st = os.stat_result(fields, {'st_mtime': mtime_ns / 1e9,
+                                             'st_mtime_ns': mtime_ns, 'st_blocks': blocks})
+                if max_file_size is not None and st.st_size > max_file_size:
+                    continue
+                yield WalkEntry(os.path.join(root, relative), parts[-1], False, st)
+
+    return entries()
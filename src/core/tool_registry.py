@@ -0,0 +1,157 @@
+"""
+Tool Registry
+------------
+Lists the menu's tools without importing them, and imports a tool only when
+it is run.
+Features:
+- Descriptions are read from each tool's module docstring with ``ast``, so no
+  tool code (requirement installs, logger setup, heavy imports) runs
+- Descriptions are cached in a JSON manifest, refreshed only for files whose
+  size or modification time changed
+- Tools are loaded from their file on demand, in a fresh module each run
+"""
+
+import ast
+import importlib.util
+import json
+import os
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, List, NamedTuple, Optional, Union
+
+DEFAULT_MANIFEST_PATH = Path.home() / '.cache' / 'python_tools' / 'tool_manifest.json'
+
+NO_DESCRIPTION = "No description available"
+DESCRIPTION_UNAVAILABLE = "Description unavailable"
+
+# Menu category -> tool name -> path relative to src/. Kept here, free of import
+# side effects, so the command-line interface can list the tools without the menu
+TOOL_CATEGORIES = {
+    "Core Tools": {
+        "Requirements Manager": "core/install_requirements.py",
+        "Add Requirements": "core/add_requirements.py",
+        "Import Graph": "core/import_graph.py"
+    },
+    "Development Tools": {
+        "VS Code Backup": "tools/vscode_backup_restore.py",
+        "Remove Duplicates": "tools/remove_duplicates.py",
+        "Check Codebase": "tools/check_codebase.py",
+        "Doc Checker": "tools/doc_checker.py",
+        "Import Profiler": "tools/import_profiler.py"
+    },
+    "Utility Tools": {
+        "Project Cleaner": "utils/cleaner.py",
+        "Move Docs": "tools/move_docs.py",
+        "Update Python": "tools/update_python.py"  # Added new tool
+    }
+}
+
+class ToolInfo(NamedTuple):
+    """A tool as shown in the menu."""
+    name: str
+    category: str
+    # Path relative to the registry's base directory
+    path: str
+    description: str
+
+def read_description(path: Union[str, Path]) -> str:
+    """Return the first line of a module's docstring without executing the module."""
+    try:
+        with open(path, 'rb') as f:
+            tree = ast.parse(f.read(), filename=str(path))
+    except (OSError, SyntaxError, ValueError):
+        return DESCRIPTION_UNAVAILABLE
+    docstring = ast.get_docstring(tree)
+    return docstring.split('\n')[0] if docstring else NO_DESCRIPTION
+
+class ToolRegistry:
+    """Tools of the menu, grouped by category, with cached descriptions."""
+
+    def __init__(self, base_dir: Union[str, Path], categories: Dict[str, Dict[str, str]],
+                 manifest_path: Optional[Union[str, Path]] = DEFAULT_MANIFEST_PATH):
+        """Create a registry.
+
+        Args:
+            base_dir (Union[str, Path]): Directory the tool paths are relative to.
+            categories (Dict[str, Dict[str, str]]): Category name to a mapping of
+                tool name to tool path, as in ``TOOL_CATEGORIES``.
+            manifest_path (Optional[Union[str, Path]]): Description cache file.
+                None keeps descriptions in memory only.
+        """
+        self.base_dir = Path(base_dir)
+        self.categories = categories
+        self.manifest_path = Path(manifest_path) if manifest_path else None
+        self._manifest: Optional[Dict[str, dict]] = None
+        self._dirty = False
+
+    def _load_manifest(self) -> Dict[str, dict]:
+        if self._manifest is None:
+            self._manifest = {}
+            if self.manifest_path:
+                try:
+                    with open(self.manifest_path) as f:
+                        self._manifest = json.load(f)
+                except (OSError, ValueError):
+                    pass  # missing or corrupt: rebuilt as tools are described
+        return self._manifest
+
+    def save(self) -> None:
+        """Write the manifest if any description changed."""
+        if not self._dirty or not self.manifest_path:
+            return
+        try:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.manifest_path.with_suffix('.tmp')
+            with open(temp_path, 'w') as f:
+                json.dump(self._manifest, f, indent=2)
+            os.replace(temp_path, self.manifest_path)
+            self._dirty = False
+        except OSError as e:
+            print(f"Warning: could not save tool manifest {self.manifest_path}: {e}")
+
+    def full_path(self, tool_path: str) -> Path:
+        """Return the absolute path of a tool."""
+        return self.base_dir / tool_path
+
+    def description(self, tool_path: str) -> str:
+        """Return a tool's description, from the manifest while the file is unchanged."""
+        full_path = self.full_path(tool_path)
+        try:
+            st = full_path.stat()
+        except OSError:
+            return DESCRIPTION_UNAVAILABLE
+        manifest = self._load_manifest()
+        key = str(full_path)
+        entry = manifest.get(key)
+        if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            return entry['description']
+        description = read_description(full_path)
+        manifest[key] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                         'description': description}
+        self._dirty = True
+        return description
+
+    def tools(self) -> List[ToolInfo]:
+        """Return every tool with its description, in menu order, saving the manifest."""
+        tools = [ToolInfo(name, category, tool_path, self.description(tool_path))
+                 for category, entries in self.categories.items()
+                 for name, tool_path in entries.items()]
+        self.save()
+        return tools
+
+    def load(self, tool_path: str) -> ModuleType:
+        """Import a tool from its file. Each call executes the module afresh.
+
+        Raises:
+            FileNotFoundError: If the tool file does not exist.
+            ImportError: If no loader can be created for the file.
+        """
+        full_path = self.full_path(tool_path)
+        if not full_path.exists():
+            raise FileNotFoundError(f"Tool not found: {tool_path}")
+        spec = importlib.util.spec_from_file_location("module", full_path)
+        if not spec or not spec.loader:
+            raise ImportError(f"Could not load tool: {tool_path}")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
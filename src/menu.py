@@ -4,16 +4,16 @@ Python Tools Menu Interface
 Provides a command-line interface for accessing various Python tools.
 Features:
 - Categorized tool organization
-- Dynamic tool loading
+- Tools listed from a cached manifest and imported only when run
 - Error handling and recovery
 - Safe requirements installation
+- Per-run wall/CPU time, peak RSS and I/O summary, with optional profiling
 """
 
 import os
 import sys
 from pathlib import Path
 from typing import List, Tuple, Optional, Dict, Any
-import importlib.util
 import glob
 
 # Add src directory to Python path
@@ -24,6 +24,13 @@ if src_dir not in sys.path:
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from src.core.tool_registry import TOOL_CATEGORIES, ToolRegistry, read_description
+# Same module name as the tools use, so their I/O reports reach the active run
+from src.utils.instrumentation import ToolRun
+
+# Set to 'cprofile' or 'tracemalloc' to profile every tool run from the menu
+PROFILE_ENV_VAR = 'PYTHON_TOOLS_PROFILE'
+
 class ToolError(Exception):
     """Custom exception for tool-related errors."""
     pass
@@ -31,7 +38,7 @@ class ToolError(Exception):
 def safe_install_requirements():
     """Safely attempt to install requirements with interrupt handling"""
     try:
-        from core import install_requirements
+        from src.core import install_requirements
         install_requirements.install_requirements()
     except KeyboardInterrupt:
         print("\nInstallation interrupted by user. Continuing with available packages...")
@@ -45,40 +52,21 @@ def safe_install_requirements():
 # Attempt to install requirements
 safe_install_requirements()
 
-TOOL_CATEGORIES = {
-    "Core Tools": {
-        "Requirements Manager": "core/install_requirements.py",
-        "Add Requirements": "core/add_requirements.py"
-    },
-    "Development Tools": {
-        "VS Code Backup": "tools/vscode_backup_restore.py",
-        "Remove Duplicates": "tools/remove_duplicates.py",
-        "Check Codebase": "tools/check_codebase.py",
-        "Doc Checker": "tools/doc_checker.py"
-    },
-    "Utility Tools": {
-        "Project Cleaner": "utils/cleaner.py",
-        "Move Docs": "tools/move_docs.py",
-        "Update Python": "tools/update_python.py"  # Added new tool
-    }
-}
+# Descriptions come from module docstrings, read without importing the tools
+registry = ToolRegistry(src_dir, TOOL_CATEGORIES)
 
 def get_tool_description(tool_path: str) -> str:
     """Get the description of a tool from its docstring.
     
+    The docstring is read statically, so the tool module is not executed.
+    
     Args:
         tool_path (str): Path to the tool file
         
     Returns:
         str: Tool description or default message if not found
     """
-    try:
-        spec = importlib.util.spec_from_file_location("module", tool_path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-        return module.__doc__.split('\n')[0] if module.__doc__ else "No description available"
-    except Exception:
-        return "Description unavailable"
+    return read_description(tool_path)
 
 def display_menu(categories: dict) -> Tuple[str, Dict[str, Tuple[str, str]]]:
     """Display categorized menu options with tool descriptions.
@@ -94,53 +82,63 @@ def display_menu(categories: dict) -> Tuple[str, Dict[str, Tuple[str, str]]]:
     
     option_map = {}
     option_number = 1
+    # The shared registry keeps its manifest in memory between redraws
+    tool_registry = registry if categories is TOOL_CATEGORIES else ToolRegistry(src_dir, categories)
     
-    for category, tools in categories.items():
-        print(f"\n📁 {category}:")
-        for tool_name, tool_path in tools.items():
-            full_path = os.path.join(os.path.dirname(__file__), tool_path)
-            description = get_tool_description(full_path)
-            print(f"{option_number}. {tool_name}")
-            print(f"   └─ {description}")
-            option_map[str(option_number)] = (tool_name, tool_path)
-            option_number += 1
+    current_category = None
+    for tool in tool_registry.tools():
+        if tool.category != current_category:
+            current_category = tool.category
+            print(f"\n📁 {current_category}:")
+        print(f"{option_number}. {tool.name}")
+        print(f"   └─ {tool.description}")
+        option_map[str(option_number)] = (tool.name, tool.path)
+        option_number += 1
     
     print("\n0. Exit")
     return input("\n👉 Select an option (0-{}): ".format(len(option_map))), option_map
 
-def run_tool(tool_path: str) -> None:
+def run_tool(tool_path: str, profiler: Optional[str] = None) -> None:
     """Run the selected Python tool with error handling.
     
+    The run is measured (wall and CPU time, peak RSS, files and bytes the tool
+    reports) and a summary line is printed and appended to
+    ~/.cache/python_tools/logs/tool_runs.jsonl.
+    
     Args:
         tool_path (str): Path to the tool to run
+        profiler (Optional[str]): 'cprofile' or 'tracemalloc' to also profile the
+            run, writing an artifact to ~/.cache/python_tools/logs/profiles.
+            Defaults to the PYTHON_TOOLS_PROFILE environment variable.
         
     Raises:
         ToolError: If the tool cannot be run
     """
+    run = None
     try:
-        full_path = os.path.join(os.path.dirname(__file__), tool_path)
-        if not os.path.exists(full_path):
+        if not registry.full_path(tool_path).exists():
             raise ToolError(f"Tool not found: {tool_path}")
 
         print(f"\n🚀 Running {os.path.basename(tool_path)}...")
         
-        spec = importlib.util.spec_from_file_location("module", full_path)
-        if not spec or not spec.loader:
-            raise ToolError(f"Could not load tool: {tool_path}")
+        run = ToolRun(Path(tool_path).stem, profiler or os.environ.get(PROFILE_ENV_VAR) or None)
+        with run:
+            # The tool is imported here, on first use, never when the menu is drawn
+            module = registry.load(tool_path)
             
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-        
-        if hasattr(module, 'main'):
-            module.main()
-            print(f"\n✅ Successfully completed: {os.path.basename(tool_path)}")
-        else:
-            raise ToolError(f"Tool has no main() function: {tool_path}")
+            if hasattr(module, 'main'):
+                module.main()
+            else:
+                raise ToolError(f"Tool has no main() function: {tool_path}")
+        print(f"\n✅ Successfully completed: {os.path.basename(tool_path)}")
             
     except Exception as e:
         error_msg = f"❌ Error running {tool_path}: {str(e)}"
         print(error_msg)
         raise ToolError(error_msg) from e
+    finally:
+        if run is not None and run.stats.started:
+            print(f"📊 {run.stats.summary()}")
 
 def main():
     """Main program loop"""
@@ -0,0 +1,300 @@
+"""
+Import-Time Profiler
+-------------------
+Measures what importing a module costs at startup, using the interpreter's own
+``-X importtime`` instrumentation in a fresh subprocess.
+Features:
+- Parses the importtime output into a tree with self and cumulative times
+- Repeated runs with per-module medians to smooth out noise
+- Interpreter startup imports measured separately and left out of the tree
+- Ranking of the heaviest imports by cumulative or self time
+- Saved JSON profiles that can be diffed to catch startup regressions
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Module of the ``python_tools`` console script (src.cli:main). src.menu is not
+# the default: importing it checks and may install requirements, which would be
+# measured as import time
+DEFAULT_TARGETS = ['src.cli']
+
+DEFAULT_REPEAT = 5
+
+_PREFIX = 'import time:'
+
+@dataclass
+class ImportNode:
+    """One module import with its own time and the time of everything it imported."""
+    name: str
+    self_us: int
+    cumulative_us: int
+    children: List["ImportNode"] = field(default_factory=list)
+
+    def walk(self, depth: int = 0) -> Iterator[Tuple[int, "ImportNode"]]:
+        """Yield (depth, node) for this node and its descendants, parents first."""
+        yield depth, self
+        for child in self.children:
+            yield from child.walk(depth + 1)
+
+    def to_dict(self) -> dict:
+        return {'name': self.name, 'self_us': self.self_us,
+                'cumulative_us': self.cumulative_us,
+                'children': [child.to_dict() for child in self.children]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ImportNode":
+        return cls(data['name'], data['self_us'], data['cumulative_us'],
+                   [cls.from_dict(child) for child in data['children']])
+
+def parse_importtime(output: str) -> List[ImportNode]:
+    """Build the import tree from ``-X importtime`` output.
+
+    The interpreter prints a module after everything it imported, indented two
+    spaces per nesting level, so children are collected until their parent's
+    line arrives. Lines not produced by importtime are ignored.
+
+    Args:
+        output (str): Captured standard error of the profiled process.
+
+    Returns:
+        List[ImportNode]: Top-level imports in the order they completed.
+    """
+    pending: Dict[int, List[ImportNode]] = {}
+    for line in output.splitlines():
+        if not line.startswith(_PREFIX):
+            continue
+        fields = line[len(_PREFIX):].split('|', 2)
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        name = fields[2].rstrip()
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        node = ImportNode(name.strip(), int(fields[0]), int(fields[1]),
+                          pending.pop(level + 1, []))
+        pending.setdefault(level, []).append(node)
+    return pending.get(0, [])
+
+def run_importtime(targets: Sequence[str], python: str = sys.executable,
+                   cwd: Path = PROJECT_ROOT) -> str:
+    """Import modules in a new interpreter under ``-X importtime``.
+
+    The project root is put on ``PYTHONPATH`` so ``src.*`` modules resolve.
+    A target that fails to import still yields the timings recorded up to the
+    failure, so a warning is printed instead of raising.
+
+    Args:
+        targets (Sequence[str]): Dotted module names to import, in order.
+        python (str): Interpreter to profile. Defaults to the current one.
+        cwd (Path): Working directory of the subprocess. Defaults to the project root.
+
+    Returns:
+        str: The importtime report written to standard error.
+    """
+    code = '; '.join(f'import {target}' for target in targets) or 'pass'
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get('PYTHONPATH')]))
+    result = subprocess.run([python, '-X', 'importtime', '-c', code], cwd=str(cwd), env=env,
+                            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith(_PREFIX)]
+        print(f"Warning: importing {', '.join(targets)} exited with status "
+              f"{result.returncode}; timings stop at the failure")
+        if errors:
+            print('   ' + errors[-1])
+    return result.stderr
+
+@dataclass
+class ImportProfile:
+    """Import tree of some target modules, excluding interpreter startup."""
+    targets: List[str]
+    roots: List[ImportNode]
+    # Cumulative time of the imports every bare interpreter performs
+    startup_us: int = 0
+    runs: int = 1
+
+    @property
+    def total_us(self) -> int:
+        """Time spent importing the targets and their dependencies."""
+        return sum(root.cumulative_us for root in self.roots)
+
+    def nodes(self) -> Iterator[Tuple[int, ImportNode]]:
+        """Yield (depth, node) for every import in the tree."""
+        for root in self.roots:
+            yield from root.walk()
+
+    def timings(self) -> Dict[str, ImportNode]:
+        """Map each module name to its node. A module is imported at most once."""
+        return {node.name: node for _, node in self.nodes()}
+
+    def heaviest(self, limit: int = 20, by: str = 'cumulative') -> List[ImportNode]:
+        """Return the most expensive imports, by cumulative or self time."""
+        key = (lambda node: node.self_us) if by == 'self' else (lambda node: node.cumulative_us)
+        return sorted((node for _, node in self.nodes()), key=key, reverse=True)[:limit]
+
+    def render_tree(self, min_us: int = 1000, max_depth: Optional[int] = None) -> str:
+        """Return the tree as indented text, hiding imports cheaper than ``min_us``."""
+        lines = []
+        for depth, node in self.nodes():
+            if node.cumulative_us < min_us or (max_depth is not None and depth > max_depth):
+                continue
+            lines.append(f"{node.cumulative_us / 1000:9.1f} ms {node.self_us / 1000:8.1f} ms  "
+                         f"{'  ' * depth}{node.name}")
+        return '\n'.join(lines)
+
+    def to_dict(self) -> dict:
+        return {'targets': self.targets, 'startup_us': self.startup_us, 'runs': self.runs,
+                'roots': [root.to_dict() for root in self.roots]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ImportProfile":
+        return cls(data['targets'], [ImportNode.from_dict(root) for root in data['roots']],
+                   data.get('startup_us', 0), data.get('runs', 1))
+
+    def save(self, path: str) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "ImportProfile":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+def _median_tree(runs: List[List[ImportNode]]) -> List[ImportNode]:
+    """Return the first run's tree with each module's times replaced by its median."""
+    samples: Dict[str, List[Tuple[int, int]]] = {}
+    for roots in runs:
+        for root in roots:
+            for _, node in root.walk():
+                samples.setdefault(node.name, []).append((node.self_us, node.cumulative_us))
+
+    def rebuild(node: ImportNode) -> ImportNode:
+        times = samples[node.name]
+        return ImportNode(node.name,
+                          int(statistics.median(t[0] for t in times)),
+                          int(statistics.median(t[1] for t in times)),
+                          [rebuild(child) for child in node.children])
+
+    return [rebuild(root) for root in runs[0]]
+
+def profile_imports(targets: Sequence[str], repeat: int = DEFAULT_REPEAT,
+                    python: str = sys.executable) -> ImportProfile:
+    """Profile importing the targets, each run in a fresh interpreter.
+
+    Args:
+        targets (Sequence[str]): Dotted module names to import.
+        repeat (int): Runs to take per-module medians over. Defaults to 5.
+        python (str): Interpreter to profile. Defaults to the current one.
+
+    Returns:
+        ImportProfile: Median import tree of the targets.
+    """
+    repeat = max(1, repeat)
+    baseline = _median_tree([parse_importtime(run_importtime([], python))
+                             for _ in range(repeat)])
+    startup = {node.name for root in baseline for _, node in root.walk()}
+    runs = [[root for root in parse_importtime(run_importtime(targets, python))
+             if root.name not in startup]
+            for _ in range(repeat)]
+    return ImportProfile(list(targets), _median_tree(runs),
+                         sum(root.cumulative_us for root in baseline), repeat)
+
+def diff_profiles(old: ImportProfile, new: ImportProfile,
+                  min_delta_us: int = 1000) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """Compare the cumulative time of every module between two profiles.
+
+    Args:
+        old (ImportProfile): Baseline profile.
+        new (ImportProfile): Profile to compare against it.
+        min_delta_us (int): Hide modules whose time changed by less than this.
+
+    Returns:
+        List[Tuple[str, Optional[int], Optional[int]]]: (module, old time, new time)
+        in microseconds, largest change first. A time is None when the module is
+        not imported in that profile.
+    """
+    before, after = old.timings(), new.timings()
+    changes = []
+    for name in before.keys() | after.keys():
+        old_us = before[name].cumulative_us if name in before else None
+        new_us = after[name].cumulative_us if name in after else None
+        if abs((new_us or 0) - (old_us or 0)) >= min_delta_us:
+            changes.append((name, old_us, new_us))
+    return sorted(changes, key=lambda c: (-abs((c[2] or 0) - (c[1] or 0)), c[0]))
+
+def format_diff(old: ImportProfile, new: ImportProfile, min_delta_us: int = 1000,
+                limit: int = 20) -> str:
+    """Return a readable summary of the changes between two profiles."""
+    delta = new.total_us - old.total_us
+    lines = [f"Total import time: {old.total_us / 1000:.1f} ms -> {new.total_us / 1000:.1f} ms "
+             f"({delta / 1000:+.1f} ms)"]
+    for name, old_us, new_us in diff_profiles(old, new, min_delta_us)[:limit]:
+        if old_us is None:
+            lines.append(f"  + {name}: new import, {new_us / 1000:.1f} ms")
+        elif new_us is None:
+            lines.append(f"  - {name}: no longer imported, was {old_us / 1000:.1f} ms")
+        else:
+            lines.append(f"    {name}: {old_us / 1000:.1f} ms -> {new_us / 1000:.1f} ms "
+                         f"({(new_us - old_us) / 1000:+.1f} ms)")
+    return '\n'.join(lines)
+
+def print_report(profile: ImportProfile, top: int, tree: bool, min_ms: float) -> None:
+    print(f"Import profile of {', '.join(profile.targets)} "
+          f"(median of {profile.runs} run{'s' if profile.runs != 1 else ''})")
+    print(f"Interpreter startup: {profile.startup_us / 1000:.1f} ms; "
+          f"targets: {profile.total_us / 1000:.1f} ms")
+    print("\nHeaviest imports (cumulative / self):")
+    for node in profile.heaviest(top):
+        print(f"{node.cumulative_us / 1000:9.1f} ms {node.self_us / 1000:8.1f} ms  {node.name}")
+    if tree:
+        print(f"\nImport tree (imports over {min_ms:g} ms):")
+        print(profile.render_tree(int(min_ms * 1000)))
+
+def main(argv: Optional[List[str]] = None):
+    """Profile imports, or diff two saved profiles."""
+    parser = argparse.ArgumentParser(
+        description="Measure the import time of modules with python -X importtime."
+    )
+    parser.add_argument('targets', nargs='*', default=DEFAULT_TARGETS,
+                        help=f"Modules to import (default: {' '.join(DEFAULT_TARGETS)})")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help=f"Runs to take medians over (default: {DEFAULT_REPEAT})")
+    parser.add_argument('--python', default=sys.executable,
+                        help="Interpreter to profile (default: the current one)")
+    parser.add_argument('--top', type=int, default=20, help="Imports to rank (default: 20)")
+    parser.add_argument('--tree', action='store_true', help="Print the import tree")
+    parser.add_argument('--min-ms', type=float, default=1.0,
+                        help="Hide tree entries and diff changes below this (default: 1.0)")
+    parser.add_argument('--save', metavar='FILE', help="Write the profile as JSON")
+    parser.add_argument('--compare', metavar='FILE',
+                        help="Diff the new profile against a saved baseline")
+    parser.add_argument('--diff', nargs=2, metavar=('OLD', 'NEW'),
+                        help="Diff two saved profiles without running anything")
+    args = parser.parse_args(argv)
+
+    min_delta_us = int(args.min_ms * 1000)
+    if args.diff:
+        print(format_diff(ImportProfile.load(args.diff[0]), ImportProfile.load(args.diff[1]),
+                          min_delta_us, args.top))
+        return
+
+    profile = profile_imports(args.targets, args.repeat, args.python)
+    print_report(profile, args.top, args.tree, args.min_ms)
+    if args.save:
+        profile.save(args.save)
+        print(f"\nProfile saved to {args.save}")
+    if args.compare:
+        print()
+        print(format_diff(ImportProfile.load(args.compare), profile, min_delta_us, args.top))
+
+if __name__ == "__main__":
+    main()
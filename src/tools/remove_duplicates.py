@@ -1,42 +1,341 @@
 """
 Duplicate File Detection and Removal Tool
 ---------------------------------------
-Identifies and safely removes duplicate files in a directory tree using SHA256 hashing.
+Identifies and safely removes duplicate files in a directory tree using SHA256
+(or BLAKE2b) hashing.
 Features:
 - Secure file comparison using cryptographic hashing
-- Safe removal with backup options
-- Memory-efficient processing for large files
+- Staged scan (size, head/tail sample, full hash) that only reads colliding files
+- Optional persistent hash cache so unchanged files are never re-read
+- Parallel hashing in a bounded thread or process pool with deterministic output
+- Safe removal with backup options, or replacement of copies by hardlinks/reflinks
+- Batched per-directory deletes with reclaimed-bytes/throughput report and dry run
+- Hardlinked paths are collapsed by inode so the same data is never read twice
+- Whole-directory mode that reports duplicated subtrees via Merkle digests
+- Bounded-memory mode that spills sorted runs to disk for very large trees
+- Reference index of a known corpus (with a Bloom-filter front) to flag or
+  remove files in new trees that the corpus already holds
+- Block-level report of near-identical files using content-defined chunking
+- Checkpointed scans that can be resumed after a crash or Ctrl-C, with periodic
+  progress lines (files/s, MB/s, ETA) that need no interactive terminal
+- Memory-efficient processing for large files: reusable read buffers sized from
+  the file, and sparse-file holes skipped on Linux
+- Non-interactive batch mode streaming each confirmed group as NDJSON or CSV
 - Detailed reporting of operations
 """
 
 import os
+import argparse
+import errno
 import hashlib
+import heapq
+import struct
+import tempfile
+import threading
+import time
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, deque
+from itertools import chain, groupby, islice, tee
+from operator import itemgetter
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import shutil
 import subprocess
 import sys
-from typing import Dict, List, Set, Optional
+import uuid
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Set, Optional, Tuple
+from dataclasses import dataclass, field
 import logging
 from src.utils.logger import setup_logger
+from src.utils.group_writer import GROUP_FORMATS, GroupWriter
+from src.utils.progress import ProgressReporter
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: reflinks are unavailable
+from src.core.batch_remove import DEFAULT_REMOVAL_WORKERS, BatchRemover, RemovalReport
+from src.core.checkpoint import FileRecord, ScanCheckpoint
+from src.core.chunking import (COMPILED_CHUNKER, DEFAULT_AVG_CHUNK, DEFAULT_MAX_CHUNK,
+                               DEFAULT_MIN_CHUNK, chunk_digests)
+from src.core.external_sort import ExternalSorter, PathTable
+from src.core.file_walker import WalkEntry, load_walk_settings, walk
+from src.core.hash_cache import HashCache
+from src.core.reference_index import ReferenceIndex
+from src.core.shared_scan import iter_shared_scan
 
 # Initialize logger
 logger = setup_logger("duplicate_finder", "duplicate_finder.log")
 
+# Bytes hashed from each end of a file during the sampling stage
+DEFAULT_SAMPLE_SIZE = 64 * 1024
+
+# Digest algorithms FileProcessor can use; BLAKE2b is faster than SHA256 on 64-bit CPUs
+SUPPORTED_ALGORITHMS = ('sha256', 'blake2b')
+DEFAULT_ALGORITHM = 'sha256'
+
+# Holes in sparse files can only be located on platforms exposing SEEK_DATA/SEEK_HOLE
+_SPARSE_SUPPORTED = hasattr(os, 'SEEK_DATA') and hasattr(os, 'SEEK_HOLE')
+
+# Per-thread read buffers reused across files
+_buffers = threading.local()
+
+# Records held in memory per sorting stage by the bounded-memory scan
+DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024
+
+# How remove_duplicates() disposes of redundant copies
+REMOVAL_MODES = ('delete', 'hardlink', 'reflink')
+
+# ioctl request that shares extents between files on btrfs/XFS (linux/fs.h)
+FICLONE = 0x40049409
+
+# Redundant copies queued by a batch run before they are deleted together
+DEFAULT_DELETE_BATCH = 10000
+
+# Hashing threads used by the interactive tool; reads dominate, so exceed core count
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# Hash cache used by the interactive tool between runs
+DEFAULT_CACHE_PATH = Path.home() / '.cache' / 'python_tools' / 'hash_cache.sqlite3'
+
+# Walk state saved by the interactive tool so an interrupted scan can be resumed
+DEFAULT_CHECKPOINT_PATH = Path.home() / '.cache' / 'python_tools' / 'duplicate_scan.checkpoint'
+
+# Seconds between checkpoint saves and between progress lines
+DEFAULT_CHECKPOINT_INTERVAL = 30.0
+DEFAULT_PROGRESS_INTERVAL = 10.0
+
+# Files smaller than this are left out of block-level (chunk) analysis
+DEFAULT_CDC_MIN_FILE_SIZE = 1024 * 1024
+
+# Bytes chunked per file: the pure-Python chunker runs at a few MB/s, so without
+# the compiled one only the start of each file is sampled
+DEFAULT_CDC_MAX_BYTES = None if COMPILED_CHUNKER else 64 * 1024 * 1024
+
+# File pairs kept by a chunk analysis, largest shared bytes first
+DEFAULT_CDC_TOP_PAIRS = 100
+
+@dataclass
+class StageStats:
+    """Counters for a single stage of the duplicate scan pipeline."""
+    name: str
+    files_in: int = 0
+    files_eliminated: int = 0
+    bytes_read: int = 0
+    bytes_avoided: int = 0
+
+    def summary(self) -> str:
+        """Return a one-line, human readable summary of the stage."""
+        return (f"Stage '{self.name}': {self.files_in} files in, "
+                f"{self.files_eliminated} eliminated, "
+                f"{self.bytes_read} bytes read, {self.bytes_avoided} bytes avoided")
+
+def auto_chunk_size(size: int) -> int:
+    """Pick a read size that keeps syscall count low without wasting memory.
+
+    Args:
+        size (int): Size of the file about to be read.
+
+    Returns:
+        int: Chunk size in bytes, from 64 KB for small files up to 1 MB.
+    """
+    if size < 1024 * 1024:
+        return 64 * 1024
+    if size < 64 * 1024 * 1024:
+        return 256 * 1024
+    return 1024 * 1024
+
+def _get_buffer(size: int) -> memoryview:
+    """Return a per-thread reusable read buffer of at least ``size`` bytes."""
+    buffer = getattr(_buffers, 'data', None)
+    if buffer is None or len(buffer) < size:
+        buffer = _buffers.data = bytearray(size)
+    return memoryview(buffer)[:size]
+
+def _file_segments(fd: int, size: int) -> Iterator[Tuple[int, int, bool]]:
+    """Split a sparse file into data and hole ranges using SEEK_DATA/SEEK_HOLE.
+
+    Yields:
+        Tuple[int, int, bool]: Offset, length and whether the range holds data.
+        Falls back to a single data range where the platform lacks support.
+    """
+    position = 0
+    while position < size:
+        try:
+            data_start = os.lseek(fd, position, os.SEEK_DATA)
+        except OSError as e:
+            if e.errno != errno.ENXIO:
+                # Filesystem cannot report holes; read the remainder normally
+                yield position, size - position, True
+                return
+            data_start = size  # Only a trailing hole remains
+        data_start = min(data_start, size)
+        if data_start > position:
+            yield position, data_start - position, False
+        if data_start >= size:
+            return
+        hole_start = min(os.lseek(fd, data_start, os.SEEK_HOLE), size)
+        yield data_start, hole_start - data_start, True
+        position = hole_start
+
+def _read_file_digest(filepath: Path, chunk_size: Optional[int],
+                      algorithm: str = DEFAULT_ALGORITHM) -> Tuple[str, int]:
+    """Hash a whole file. Module-level so it can run in a worker process.
+
+    Reads into a reusable buffer with ``readinto`` so no bytes object is created
+    per chunk. On Linux, holes in sparse files are hashed as zeros without being
+    read from disk.
+
+    Returns:
+        Tuple[str, int]: Hexadecimal digest and number of bytes read.
+    """
+    hasher = hashlib.new(algorithm)
+    bytes_read = 0
+    with open(filepath, 'rb', buffering=0) as f:
+        st = os.fstat(f.fileno())
+        view = _get_buffer(chunk_size or auto_chunk_size(st.st_size))
+        if _SPARSE_SUPPORTED and st.st_blocks * 512 < st.st_size:
+            for offset, length, is_data in _file_segments(f.fileno(), st.st_size):
+                if not is_data:
+                    zeros = memoryview(bytes(min(length, len(view))))
+                    for _ in range(length // len(zeros)):
+                        hasher.update(zeros)
+                    hasher.update(zeros[:length % len(zeros)])
+                    continue
+                f.seek(offset)
+                remaining = length
+                while remaining:
+                    n = f.readinto(view[:min(remaining, len(view))])
+                    if not n:
+                        break
+                    hasher.update(view[:n])
+                    bytes_read += n
+                    remaining -= n
+        else:
+            while True:
+                n = f.readinto(view)
+                if not n:
+                    break
+                hasher.update(view[:n])
+                bytes_read += n
+    return hasher.hexdigest(), bytes_read
+
+def _read_sample_digest(filepath: Path, size: int, sample_size: int,
+                        algorithm: str = DEFAULT_ALGORITHM) -> Tuple[str, int]:
+    """Hash the head and tail of a file. Module-level so it can run in a worker process.
+
+    Returns:
+        Tuple[str, int]: Hexadecimal digest and number of bytes read.
+    """
+    # The size is mixed in so files of different lengths never share a sample hash
+    hasher = hashlib.new(algorithm, str(size).encode())
+    with open(filepath, 'rb') as f:
+        if size <= 2 * sample_size:
+            data = f.read()
+            hasher.update(data)
+            return hasher.hexdigest(), len(data)
+        hasher.update(f.read(sample_size))
+        f.seek(-sample_size, os.SEEK_END)
+        hasher.update(f.read(sample_size))
+    return hasher.hexdigest(), 2 * sample_size
+
+def distinct_roots(roots: Iterable[str]) -> List[Path]:
+    """Resolve scan roots, dropping any root equal to or nested inside another.
+
+    Scanning a directory twice, or a directory and one of its subdirectories,
+    would report every file below it as its own duplicate.
+
+    Args:
+        roots (Iterable[str]): Directories to scan, in order.
+
+    Returns:
+        List[Path]: Real paths of the roots that remain, in their original order.
+    """
+    resolved = list(dict.fromkeys(os.path.realpath(root) for root in roots))
+    kept = []
+    for root in resolved:
+        parent = next((other for other in resolved if other != root and
+                       root.startswith(other.rstrip(os.sep) + os.sep)), None)
+        if parent is not None:
+            logger.warning(f"Skipping root {root}: it is inside {parent}")
+            continue
+        kept.append(Path(root))
+    return kept
+
+def _unique_inodes(records: Iterator[Tuple[int, bytes, int]],
+                   stage: StageStats) -> Iterator[Tuple[int, bytes, int]]:
+    """Drop records for paths whose (dev, inode) was already seen.
+
+    Records must be sorted so that hardlinks of one inode are adjacent.
+    """
+    previous = None
+    for record in records:
+        key = record[:2]
+        if key == previous:
+            stage.files_eliminated += 1
+            continue
+        previous = key
+        yield record
+
+def _shared_key_groups(records: Iterator[Tuple[int, bytes, int]], key: Callable,
+                       stage: StageStats, already_read: Optional[int] = 0
+                       ) -> Iterator[Tuple[Any, Iterator[Tuple[int, bytes, int]]]]:
+    """Group sorted records by key, skipping keys held by a single record.
+
+    Groups are streamed rather than materialised, so each must be consumed before
+    the next is requested. Skipped records are counted as eliminated by ``stage``,
+    and their size less ``already_read`` as bytes avoided (None: nothing avoided).
+    """
+    for value, group in groupby(records, key):
+        first = next(group)
+        second = next(group, None)
+        if second is None:
+            stage.files_eliminated += 1
+            if already_read is not None:
+                stage.bytes_avoided += max(0, first[0] - already_read)
+            continue
+        yield value, chain((first, second), group)
+
 class FileProcessor:
     """Handles file processing operations with safety checks."""
     
-    def __init__(self, chunk_size: int = 4096):
+    def __init__(self, chunk_size: Optional[int] = None, cache: Optional[HashCache] = None,
+                 workers: int = 1, use_processes: bool = False,
+                 max_in_flight: Optional[int] = None,
+                 algorithm: str = DEFAULT_ALGORITHM):
         """Initialize file processor.
         
         Args:
-            chunk_size (int): Size of chunks to read when processing large files.
-                            Defaults to 4KB for optimal performance.
+            chunk_size (Optional[int]): Size of chunks to read when processing large
+                                      files. Defaults to None, which sizes chunks
+                                      from each file (see ``auto_chunk_size``).
+            cache (Optional[HashCache]): Persistent digest cache consulted before
+                                       reading a file. Defaults to None.
+            workers (int): Number of files hashed concurrently. Defaults to 1 (serial).
+            use_processes (bool): Hash in a process pool instead of a thread pool.
+                                Threads suit I/O-bound hashing as hashlib releases
+                                the GIL. Defaults to False.
+            max_in_flight (Optional[int]): Upper bound on queued hashing jobs, keeping
+                                         memory flat on huge trees. Defaults to
+                                         four jobs per worker.
+            algorithm (str): Digest algorithm, one of SUPPORTED_ALGORITHMS.
+                           Defaults to 'sha256'.
+                                         
+        Raises:
+            ValueError: If the algorithm is not supported.
         """
+        if algorithm not in SUPPORTED_ALGORITHMS:
+            raise ValueError(f"Unsupported hash algorithm: {algorithm}. "
+                             f"Choose one of: {', '.join(SUPPORTED_ALGORITHMS)}")
+        self.algorithm = algorithm
         self.chunk_size = chunk_size
+        self.cache = cache
+        self.workers = max(1, workers)
+        self.use_processes = use_processes
+        self.max_in_flight = max_in_flight or self.workers * 4
         self.processed_files: Set[str] = set()
+        self.bytes_read = 0
         
     def calculate_file_hash(self, filepath: Path) -> Optional[str]:
-        """Generate SHA256 hash of file contents.
+        """Generate hash of file contents (SHA256 unless another algorithm is configured).
         
         Args:
             filepath (Path): Path to the file to hash.
@@ -47,111 +346,1481 @@ class FileProcessor:
         Note:
             Uses chunked reading to handle large files efficiently.
         """
+        return self._hash_one(filepath, _read_file_digest,
+                              (filepath, self.chunk_size, self.algorithm),
+                              lambda st: self.cache.get_digest(st, self.algorithm),
+                              lambda st, digest: self.cache.put_digest(filepath, st, self.algorithm, digest))
+
+    def calculate_sample_hash(self, filepath: Path, size: int, sample_size: int) -> Optional[str]:
+        """Generate hash of the first and last ``sample_size`` bytes of a file.
+
+        Args:
+            filepath (Path): Path to the file to hash.
+            size (int): Size of the file in bytes, as seen when it was scanned.
+            sample_size (int): Number of bytes to read from each end of the file.
+
+        Returns:
+            Optional[str]: Hexadecimal hash string or None if file cannot be read.
+
+        Note:
+            Files no larger than two samples are hashed whole.
+        """
+        return self._hash_one(filepath, _read_sample_digest,
+                              (filepath, size, sample_size, self.algorithm),
+                              lambda st: self.cache.get_sample(st, self.algorithm, sample_size),
+                              lambda st, digest: self.cache.put_sample(filepath, st, self.algorithm,
+                                                                       sample_size, digest))
+
+    def _hash_one(self, path: Path, reader: Callable, args: tuple,
+                  lookup: Callable, store: Callable) -> Optional[str]:
+        """Hash a single file in the calling thread, without starting a pool."""
         try:
-            hasher = hashlib.sha256()
-            with open(filepath, 'rb') as f:
-                for chunk in iter(lambda: f.read(self.chunk_size), b''):
-                    hasher.update(chunk)
-            return hasher.hexdigest()
-        except (IOError, PermissionError) as e:
-            logger.error(f"Error reading file {filepath}: {e}")
+            st = os.stat(path) if self.cache else None
+            cached = lookup(st) if st else None
+            if cached:
+                return cached
+            digest, bytes_read = reader(*args)
+        except Exception as e:
+            logger.error(f"Error reading file {path}: {e}")
             return None
+        self.bytes_read += bytes_read
+        if st:
+            store(st, digest)
+        return digest
+
+    def hash_files(self, paths: Iterable[Path]) -> Iterator[Tuple[Path, Optional[str]]]:
+        """Generate hashes for many files, concurrently when workers > 1.
+
+        Args:
+            paths (Iterable[Path]): Files to hash.
+
+        Yields:
+            Tuple[Path, Optional[str]]: Each path with its hash (None if unreadable),
+                                        in the same order as ``paths``.
+        """
+        jobs = ((path, (path, self.chunk_size, self.algorithm)) for path in paths)
+        return self._map_ordered(
+            jobs, _read_file_digest,
+            lambda st: self.cache.get_digest(st, self.algorithm),
+            lambda path, st, digest: self.cache.put_digest(path, st, self.algorithm, digest)
+        )
+
+    def sample_files(self, items: Iterable[Tuple[Path, int]],
+                     sample_size: int) -> Iterator[Tuple[Path, Optional[str]]]:
+        """Generate head/tail sample hashes for many files, concurrently when workers > 1.
+
+        Args:
+            items (Iterable[Tuple[Path, int]]): Files to hash with their sizes.
+            sample_size (int): Number of bytes to read from each end of a file.
+
+        Yields:
+            Tuple[Path, Optional[str]]: Each path with its sample hash (None if
+                                        unreadable), in the same order as ``items``.
+        """
+        jobs = ((path, (path, size, sample_size, self.algorithm)) for path, size in items)
+        return self._map_ordered(
+            jobs, _read_sample_digest,
+            lambda st: self.cache.get_sample(st, self.algorithm, sample_size),
+            lambda path, st, digest: self.cache.put_sample(path, st, self.algorithm, sample_size, digest)
+        )
+
+    def chunk_files(self, paths: Iterable[Path], min_size: int = DEFAULT_MIN_CHUNK,
+                    avg_size: int = DEFAULT_AVG_CHUNK, max_size: int = DEFAULT_MAX_CHUNK,
+                    max_bytes: Optional[int] = None
+                    ) -> Iterator[Tuple[Path, Optional[List[Tuple[bytes, int]]]]]:
+        """Split many files into content-defined chunks, concurrently when workers > 1.
+
+        Without the compiled chunker, chunking is CPU-bound pure Python, so
+        ``use_processes=True`` is the setting that scales it across cores.
+
+        Args:
+            paths (Iterable[Path]): Files to chunk.
+            min_size (int): Smallest chunk.
+            avg_size (int): Target average chunk size.
+            max_size (int): Largest chunk.
+            max_bytes (Optional[int]): Chunk only the start of each file. Defaults
+                                     to None (whole files).
+
+        Yields:
+            Tuple[Path, Optional[List[Tuple[bytes, int]]]]: Each path with its chunk
+                digests and lengths (None if unreadable), in the same order as ``paths``.
+        """
+        jobs = ((path, (path, min_size, avg_size, max_size, 16, max_bytes)) for path in paths)
+        return self._map_ordered(jobs, chunk_digests, lambda st: None, lambda *args: None)
+
+    def _map_ordered(self, jobs: Iterable[Tuple[Path, tuple]], reader: Callable,
+                     lookup: Callable, store: Callable) -> Iterator[Tuple[Path, Optional[str]]]:
+        """Run ``reader`` over jobs with a bounded queue, yielding results in job order.
+
+        Cache lookups, cache writes and byte accounting all happen in the calling
+        thread; only the file reads are handed to the pool.
+        """
+        executor = None
+        if self.workers > 1:
+            pool_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            executor = pool_class(max_workers=self.workers)
+        pending: Deque[Tuple[Path, Optional[os.stat_result], bool, Future]] = deque()
+        try:
+            for path, args in jobs:
+                try:
+                    st = os.stat(path) if self.cache else None
+                    cached = lookup(st) if st else None
+                except OSError as e:
+                    st, cached = None, None
+                    future = Future()
+                    future.set_exception(e)
+                    pending.append((path, st, True, future))
+                else:
+                    if cached:
+                        future = Future()
+                        future.set_result((cached, 0))
+                    elif executor:
+                        future = executor.submit(reader, *args)
+                    else:
+                        future = Future()
+                        try:
+                            future.set_result(reader(*args))
+                        except Exception as e:
+                            future.set_exception(e)
+                    pending.append((path, st, bool(cached), future))
+                while len(pending) >= self.max_in_flight:
+                    yield self._collect(*pending.popleft(), store)
+            while pending:
+                yield self._collect(*pending.popleft(), store)
+        finally:
+            if executor:
+                executor.shutdown(wait=True)
+
+    def _collect(self, path: Path, st: Optional[os.stat_result], cached: bool,
+                 future: Future, store: Callable) -> Tuple[Path, Optional[str]]:
+        """Wait for one hashing job and record its result."""
+        try:
+            digest, bytes_read = future.result()
+        except Exception as e:
+            # A worker failure (or a crashed process pool) only loses this file
+            logger.error(f"Error reading file {path}: {e}")
+            return path, None
+        self.bytes_read += bytes_read
+        if st and not cached:
+            store(path, st, digest)
+        return path, digest
 
 class DuplicateFinder:
     """Finds and manages duplicate files in a directory tree."""
     
-    def __init__(self, base_dir: str):
+    def __init__(self, base_dir: str, sample_size: int = DEFAULT_SAMPLE_SIZE,
+                 cache_path: Optional[str] = None, workers: int = 1,
+                 use_processes: bool = False, algorithm: str = DEFAULT_ALGORITHM,
+                 max_file_size: Optional[int] = None, memory_limit: Optional[int] = None,
+                 checkpoint_path: Optional[str] = None,
+                 checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+                 progress_interval: float = DEFAULT_PROGRESS_INTERVAL,
+                 extra_roots: Optional[List[str]] = None, min_file_size: int = 0,
+                 removal_workers: int = DEFAULT_REMOVAL_WORKERS):
         """Initialize duplicate finder.
         
         Args:
             base_dir (str): Root directory to start searching for duplicates.
+            sample_size (int): Bytes hashed from the head and tail of same-size
+                             files before committing to a full hash.
+            cache_path (Optional[str]): SQLite file used to persist digests between
+                                      runs. Defaults to None (no caching).
+            workers (int): Number of files hashed concurrently. Defaults to 1.
+            use_processes (bool): Hash in worker processes instead of threads.
+                                Defaults to False.
+            algorithm (str): Digest algorithm, 'sha256' or 'blake2b'. Defaults to 'sha256'.
+            max_file_size (Optional[int]): Ignore files larger than this many bytes.
+                                         Defaults to None (no limit).
+            memory_limit (Optional[int]): When set, ``find_duplicates`` uses the
+                                        bounded-memory scan with this budget per
+                                        stage. Defaults to None (in-memory scan).
+            checkpoint_path (Optional[str]): File the walk position is saved to, so
+                                           ``find_duplicates(resume=True)`` can pick
+                                           up an interrupted scan. Digests are kept
+                                           in the hash cache (a private one next to
+                                           the checkpoint if no cache_path is given).
+                                           Defaults to None (no checkpoints).
+            checkpoint_interval (float): Seconds between checkpoint saves.
+            progress_interval (float): Seconds between progress log lines.
+            extra_roots (Optional[List[str]]): Further directories scanned together
+                                             with ``base_dir`` by ``find_duplicates``,
+                                             so copies across trees are found. Roots
+                                             are resolved, and a root inside another
+                                             (or repeated) is dropped.
+            min_file_size (int): Ignore files smaller than this many bytes.
+                               Defaults to 0 (every file).
+            removal_workers (int): Directories deleted from concurrently.
+                                 Defaults to 8.
         """
         self.base_dir = Path(base_dir)
-        self.processor = FileProcessor()
+        self.roots = distinct_roots([base_dir, *(extra_roots or ())])
+        self.sample_size = sample_size
+        self.max_file_size = max_file_size
+        self.min_file_size = min_file_size
+        # Files passed over for being larger than max_file_size, logged on close
+        self.files_too_large = 0
+        self.removal_workers = removal_workers
+        self.memory_limit = memory_limit
+        # Without a shared cache, a checkpointed scan keeps its digests privately
+        self._private_cache_path = None
+        if checkpoint_path and not cache_path:
+            cache_path = self._private_cache_path = f"{checkpoint_path}-hashes"
+        self.cache = HashCache(cache_path) if cache_path else None
+        self.checkpoint = ScanCheckpoint(checkpoint_path) if checkpoint_path else None
+        self.checkpoint_interval = checkpoint_interval
+        self.progress_interval = progress_interval
+        self._last_flush = time.monotonic()
+        self.processor = FileProcessor(cache=self.cache, workers=workers,
+                                       use_processes=use_processes, algorithm=algorithm)
         self.duplicates: Dict[str, List[Path]] = defaultdict(list)
+        self.stats: List[StageStats] = []
+        self.duplicate_dirs: Dict[str, List[Path]] = {}
+        self.dir_sizes: Dict[str, int] = {}
+        # Extra hardlink paths of each scanned inode, keyed by the path that was hashed
+        self.hardlinks: Dict[str, List[str]] = defaultdict(list)
+        # Files found in a reference corpus, mapped to the corpus copy
+        self.known_files: Dict[Path, str] = {}
         
-    def find_duplicates(self, exclude_dirs: Optional[List[str]] = None) -> Dict[str, List[Path]]:
+    def find_duplicates(self, exclude_dirs: Optional[List[str]] = None,
+                        resume: bool = False) -> Dict[str, List[Path]]:
         """Scan directory tree for duplicate files.
         
         Args:
-            exclude_dirs (Optional[List[str]]): Directories to exclude from scan.
+            exclude_dirs (Optional[List[str]]): Directory names to exclude from scan.
+                                              Matched against whole path components.
                                               Defaults to None.
+            resume (bool): Continue the scan saved in the checkpoint instead of
+                         starting over. Defaults to False.
+                                              
+        Raises:
+            ValueError: If resuming without a usable checkpoint, or with memory_limit set.
                                               
         Returns:
             Dict[str, List[Path]]: Dictionary mapping file hashes to lists of duplicate files.
             
         Note:
-            Skips unreadable files and logs errors instead of crashing.
+            Skips unreadable files and logs errors instead of crashing. Paths within
+            a group are sorted and groups are ordered by their first path, so the
+            result is identical across runs regardless of worker count.
+        """
+        if self.memory_limit:
+            if resume:
+                raise ValueError("The bounded-memory scan cannot be resumed")
+            self.duplicates = dict(self.iter_duplicates_external(exclude_dirs, self.memory_limit))
+            return self.duplicates
+        
+        groups = sorted((v, k) for k, v in self.iter_duplicates(exclude_dirs, resume))
+        self.duplicates = {k: v for v, k in groups}
+        return self.duplicates
+
+    def iter_duplicates(self, exclude_dirs: Optional[List[str]] = None,
+                        resume: bool = False) -> Iterator[Tuple[str, List[Path]]]:
+        """Scan for duplicate files, yielding each group as soon as it is confirmed.
+
+        Runs the same staged scan as ``find_duplicates``, but a group is yielded
+        once every file of its size/sample candidate set has been hashed, so
+        results can be written out or acted on while the scan continues.
+
+        Args:
+            exclude_dirs (Optional[List[str]]): Directory names to exclude from scan.
+            resume (bool): Continue the scan saved in the checkpoint. Defaults to False.
+
+        Yields:
+            Tuple[str, List[Path]]: Hex digest and the sorted duplicate files sharing
+                                    it, hardlinked paths included.
         """
         exclude_dirs = exclude_dirs or []
-        hash_map = defaultdict(list)
+        self.stats = []
+        self.hardlinks = defaultdict(list)
+        
+        logger.info(f"Starting duplicate file scan in {', '.join(map(str, self.roots))}")
+        
+        size_groups = self._group_by_size(exclude_dirs, resume)
+        candidates = self._group_by_sample(size_groups)
+        
+        groups = 0
+        for digest, paths in self._iter_full_hash_groups(candidates):
+            groups += 1
+            # Restore the hardlinked paths that were skipped while hashing
+            yield digest, sorted(paths + [Path(alias) for path in paths
+                                          for alias in self.hardlinks.get(str(path), ())])
+        self._log_scan_summary(groups)
+        self._complete_checkpoint()
+
+    def _log_scan_summary(self, group_count: int) -> None:
+        """Log per-stage counters and cache effectiveness at the end of a scan."""
+        for stage in self.stats:
+            logger.info(stage.summary())
+        if self.cache:
+            pruned = self.cache.prune()
+            logger.info(f"{self.cache.report()}, {pruned} vanished entries pruned")
+        logger.info(f"Found {group_count} groups of duplicate files")
+
+    def close(self) -> None:
+        """Release resources held by the finder, flushing the hash cache.
+
+        An unfinished scan's checkpoint is kept so it can be resumed.
+        """
+        if self.files_too_large:
+            logger.info(f"Skipped {self.files_too_large} files larger than "
+                        f"{self.max_file_size / (1024 * 1024):.1f} MB")
+            self.files_too_large = 0
+        if self.cache:
+            self.cache.close()
+            self.cache = None
+            self.processor.cache = None
+        if self.checkpoint:
+            self.checkpoint.close()
+            self.checkpoint = None
+
+    def _complete_checkpoint(self) -> None:
+        """Delete the checkpoint (and its private digests) once a scan has finished."""
+        if not self.checkpoint:
+            return
+        self.checkpoint.close(remove=True)
+        self.checkpoint = None
+        if self._private_cache_path:
+            self.cache.close()
+            self.cache = None
+            self.processor.cache = None
+            Path(self._private_cache_path).unlink(missing_ok=True)
+
+    def _checkpoint_params(self, exclude_dirs: List[str]) -> Dict[str, Any]:
+        """Scan parameters that must match for a checkpoint to be resumed."""
+        return {
+            'base_dir': os.path.abspath(self.base_dir),
+            'exclude_dirs': sorted(exclude_dirs),
+            'max_file_size': self.max_file_size,
+            'roots': [os.fspath(root) for root in self.roots],
+            'min_file_size': self.min_file_size,
+        }
+
+    def _walk_records(self, exclude_dirs: List[str], resume: bool) -> Iterator[FileRecord]:
+        """Yield (path, size, dev, ino, nlink) for every file, checkpointing the walk.
+
+        When resuming, files recorded in the checkpoint are replayed first and the
+        walk continues from the saved directory stack.
+        """
+        progress = ProgressReporter("walk", logger, interval=self.progress_interval)
+        if not self.checkpoint:
+            for entry in self._walk_files(exclude_dirs):
+                st = entry.stat
+                progress.update(files=1)
+                yield entry.path, st.st_size, st.st_dev, st.st_ino, st.st_nlink
+            progress.finish()
+            return
+        
+        params = self._checkpoint_params(exclude_dirs)
+        if resume:
+            walk_complete, pending = self.checkpoint.resume(params)
+            logger.info(f"Resuming scan from checkpoint {self.checkpoint.path}")
+            for record in self.checkpoint.walked_files():
+                progress.update(files=1)
+                yield record
+        else:
+            self.checkpoint.start(params, os.fspath(self.base_dir))
+            walk_complete, pending = False, self._root_stack()
+            self.checkpoint.save_walk(pending, [])
+        
+        if not walk_complete:
+            unsaved: List[FileRecord] = []
+            last_save = time.monotonic()
+            
+            def save(stack: List[str]) -> None:
+                nonlocal last_save
+                if time.monotonic() - last_save >= self.checkpoint_interval:
+                    self.checkpoint.save_walk(stack, unsaved)
+                    unsaved.clear()
+                    last_save = time.monotonic()
+            
+            # A shared scan has no directory stack to checkpoint, so its files are
+            # saved in one go at the end; replaying it again after a crash is cheap
+            entries = None if resume else self._shared_scan(exclude_dirs)
+            if entries is None:
+                entries = self._walk_files(exclude_dirs, pending=pending, on_directory_done=save)
+            for entry in entries:
+                st = entry.stat
+                record = (entry.path, st.st_size, st.st_dev, st.st_ino, st.st_nlink)
+                unsaved.append(record)
+                progress.update(files=1)
+                yield record
+            self.checkpoint.save_walk([], unsaved)
+            self.checkpoint.finish_walk()
+        progress.finish()
+
+    def _within_size_limit(self, size: int) -> bool:
+        """Return whether a file of ``size`` bytes is scanned, counting those that are not."""
+        if self.max_file_size is not None and size > self.max_file_size:
+            self.files_too_large += 1
+            return False
+        return True
+
+    def _root_stack(self) -> List[str]:
+        """Return a walker stack that visits the roots in order."""
+        return [os.fspath(root) for root in reversed(self.roots)]
+
+    def _walk_files(self, exclude_dirs: List[str], pending: Optional[List[str]] = None,
+                    **options) -> Iterator[WalkEntry]:
+        """Walk every root, yielding files within the configured size limits.
+
+        A plain walk reuses a shared scan taken by a tool pipeline when one
+        covers every root.
+        """
+        shared = self._shared_scan(exclude_dirs) if pending is None and not options else None
+        if shared is not None:
+            yield from shared
+            return
+        for entry in walk(self.base_dir, excluded_dirs=exclude_dirs,
+                          onerror=self._log_walk_error,
+                          pending=pending if pending is not None else self._root_stack(),
+                          **options):
+            if entry.size >= self.min_file_size and self._within_size_limit(entry.size):
+                yield entry
+
+    def _shared_scan(self, exclude_dirs: List[str]) -> Optional[Iterator[WalkEntry]]:
+        """Return the files of every root from a pipeline's shared scan, if it covers them all."""
+        shared = [iter_shared_scan(root, exclude_dirs) for root in self.roots]
+        if any(scan is None for scan in shared):
+            return None
+        logger.info("Using the shared scan of the tool pipeline instead of walking")
+        return (entry for entry in chain.from_iterable(shared)
+                if entry.size >= self.min_file_size and self._within_size_limit(entry.size))
+
+    def _hash_progress(self, progress: ProgressReporter, bytes_before: int) -> int:
+        """Advance hashing progress by one file and flush digests periodically.
+
+        Returns:
+            int: The processor's byte counter, to pass in on the next call.
+        """
+        bytes_now = self.processor.bytes_read
+        progress.update(files=1, nbytes=bytes_now - bytes_before)
+        if self.cache and time.monotonic() - self._last_flush >= self.checkpoint_interval:
+            self.cache.flush()
+            self._last_flush = time.monotonic()
+        return bytes_now
+
+    def _group_by_size(self, exclude_dirs: List[str], resume: bool = False) -> Dict[int, List[Path]]:
+        """Stage 1: bucket files by size, dropping sizes that occur only once.
+
+        Args:
+            exclude_dirs (List[str]): Directory names to prune from the walk.
+            resume (bool): Continue a checkpointed walk. Defaults to False.
+
+        Returns:
+            Dict[int, List[Path]]: File size mapped to files sharing that size.
+        """
+        stage = StageStats("size")
+        # Plain strings keep memory low; only surviving files become Path objects
+        size_map: Dict[int, List[str]] = defaultdict(list)
+        # First path seen for each inode
+        inodes: Dict[Tuple[int, int], str] = {}
+        linked = 0
+        
+        for path, size, dev, ino, nlink in self._walk_records(exclude_dirs, resume):
+            stage.files_in += 1
+            key = (dev, ino)
+            if key in inodes:
+                linked += 1
+                # Another name of a hardlinked file is listed with it; the same file
+                # reached twice (e.g. through a bind mount) is not a copy at all
+                if nlink > 1 and path != inodes[key]:
+                    self.hardlinks[inodes[key]].append(path)
+                continue
+            inodes[key] = path
+            size_map[size].append(path)
         
-        logger.info(f"Starting duplicate file scan in {self.base_dir}")
+        if linked:
+            logger.info(f"Collapsed {linked} paths onto already scanned inodes (hardlinks or repeats)")
         
-        for path in self.base_dir.rglob('*'):
-            if path.is_file() and not any(d in str(path) for d in exclude_dirs):
-                file_hash = self.processor.calculate_file_hash(path)
+        groups = {}
+        stage.files_eliminated = linked
+        for size, paths in size_map.items():
+            if len(paths) > 1:
+                groups[size] = sorted(map(Path, paths))
+            else:
+                stage.files_eliminated += 1
+                stage.bytes_avoided += size
+        self.stats.append(stage)
+        return groups
+
+    @staticmethod
+    def _log_walk_error(error: OSError) -> None:
+        """Log a directory or file that could not be scanned."""
+        logger.error(f"Error scanning {error.filename}: {error}")
+
+    def _group_by_sample(self, size_groups: Dict[int, List[Path]]) -> List[Tuple[int, List[Path]]]:
+        """Stage 2: split same-size groups by a hash of each file's head and tail.
+
+        Args:
+            size_groups (Dict[int, List[Path]]): Output of the size stage.
+
+        Returns:
+            List[Tuple[int, List[Path]]]: File size and candidate group for every
+                                          group that still needs a full hash.
+        """
+        stage = StageStats("sample")
+        candidates: List[Tuple[int, List[Path]]] = []
+        bytes_before = self.processor.bytes_read
+        
+        to_sample: List[Tuple[Path, int]] = []
+        for size, paths in size_groups.items():
+            stage.files_in += len(paths)
+            if size <= 2 * self.sample_size:
+                # Sampling would read the whole file anyway; defer to the full hash
+                candidates.append((size, paths))
+                continue
+            to_sample.extend((path, size) for path in paths)
+        
+        # Sample digests mix in the file size, so one map covers every size group
+        sample_map: Dict[str, List[Tuple[Path, int]]] = defaultdict(list)
+        progress = ProgressReporter("sample", logger, total_files=len(to_sample),
+                                    total_bytes=2 * self.sample_size * len(to_sample),
+                                    interval=self.progress_interval)
+        counter = bytes_before
+        results = self.processor.sample_files(to_sample, self.sample_size)
+        for (path, size), (_, sample_hash) in zip(to_sample, results):
+            counter = self._hash_progress(progress, counter)
+            if sample_hash:
+                sample_map[sample_hash].append((path, size))
+        progress.finish()
+        
+        for group in sample_map.values():
+            if len(group) > 1:
+                candidates.append((group[0][1], [path for path, _ in group]))
+            else:
+                stage.files_eliminated += 1
+                stage.bytes_avoided += group[0][1] - 2 * self.sample_size
+        stage.bytes_read = self.processor.bytes_read - bytes_before
+        self.stats.append(stage)
+        return candidates
+
+    def _iter_full_hash_groups(self, candidates: List[Tuple[int, List[Path]]]
+                               ) -> Iterator[Tuple[str, List[Path]]]:
+        """Stage 3: fully hash the files that survived the cheaper stages.
+
+        Files of different candidate sets can never match, so each set's groups
+        are yielded as soon as its last file is hashed, while the pool keeps
+        working on the following sets.
+
+        Args:
+            candidates (List[Tuple[int, List[Path]]]): File size and groups of
+                                                     files that may be identical.
+
+        Yields:
+            Tuple[str, List[Path]]: Full file hash and the files sharing it.
+        """
+        stage = StageStats("full")
+        bytes_before = self.processor.bytes_read
+        
+        paths = [path for _, group in candidates for path in group]
+        stage.files_in = len(paths)
+        progress = ProgressReporter("hash", logger, total_files=len(paths),
+                                    total_bytes=sum(size * len(group) for size, group in candidates),
+                                    interval=self.progress_interval)
+        counter = bytes_before
+        results = self.processor.hash_files(paths)
+        for _, group in candidates:
+            hash_map: Dict[str, List[Path]] = defaultdict(list)
+            for path, file_hash in islice(results, len(group)):
+                counter = self._hash_progress(progress, counter)
                 if file_hash:
                     hash_map[file_hash].append(path)
+            for file_hash, matches in hash_map.items():
+                if len(matches) > 1:
+                    yield file_hash, matches
+                else:
+                    stage.files_eliminated += 1
+        progress.finish()
         
-        # Filter for only duplicates (more than one file with same hash)
-        self.duplicates = {k: v for k, v in hash_map.items() if len(v) > 1}
-        logger.info(f"Found {len(self.duplicates)} groups of duplicate files")
-        return self.duplicates
+        stage.bytes_read = self.processor.bytes_read - bytes_before
+        self.stats.append(stage)
+
+    def iter_duplicates_external(self, exclude_dirs: Optional[List[str]] = None,
+                                 memory_limit: int = DEFAULT_MEMORY_LIMIT,
+                                 temp_dir: Optional[str] = None) -> Iterator[Tuple[str, List[Path]]]:
+        """Find duplicate files using bounded memory, yielding groups as they are confirmed.
+
+        Walk results and digests are spilled to sorted runs on disk and merged,
+        so memory use is set by ``memory_limit`` rather than by the number of
+        files. Paths are kept in an on-disk table and referenced by offset, and
+        digests are carried as raw bytes.
+
+        Args:
+            exclude_dirs (Optional[List[str]]): Directory names to exclude from scan.
+                                              Defaults to None.
+            memory_limit (int): Approximate bytes of records held in memory by each
+                              sorting stage. Defaults to 256 MB.
+            temp_dir (Optional[str]): Where runs and the path table are written.
+                                    Defaults to the system temporary directory.
 
-    def remove_duplicates(self, keep_first: bool = True) -> None:
+        Yields:
+            Tuple[str, List[Path]]: Hex digest and the duplicate files sharing it,
+                                    ordered by file size then digest.
+
+        Note:
+            Hardlinked paths are collapsed onto one path per inode and not listed.
+        """
+        exclude_dirs = exclude_dirs or []
+        self.stats = []
+        digest_size = hashlib.new(self.processor.algorithm).digest_size
+        logger.info(f"Starting bounded-memory duplicate scan in {', '.join(map(str, self.roots))} "
+                    f"({memory_limit} bytes per stage)")
+        
+        with tempfile.TemporaryDirectory(prefix='dedupe-', dir=temp_dir) as work:
+            paths = PathTable(os.path.join(work, 'paths'))
+            try:
+                # Stage 1: sort by size, with (dev, inode) as digest to spot hardlinks
+                stage = StageStats("size")
+                by_size = ExternalSorter(16, memory_limit, work)
+                for entry in self._walk_files(exclude_dirs):
+                    st = entry.stat
+                    by_size.add(st.st_size, struct.pack('>QQ', st.st_dev, st.st_ino),
+                                paths.add(entry.path))
+                    stage.files_in += 1
+                
+                # Stage 2: sample hashes of same-size files (small files pass straight on)
+                sample_stage = StageStats("sample")
+                by_sample = ExternalSorter(digest_size, memory_limit, work)
+                unsampled = bytes(digest_size)
+                bytes_before = self.processor.bytes_read
+                for size, group in _shared_key_groups(
+                        _unique_inodes(by_size.sorted(), stage), itemgetter(0), stage):
+                    if size <= 2 * self.sample_size:
+                        for _, _, offset in group:
+                            sample_stage.files_in += 1
+                            by_sample.add(size, unsampled, offset)
+                        continue
+                    offsets, jobs = tee(offset for _, _, offset in group)
+                    items = ((Path(paths.get(offset)), size) for offset in jobs)
+                    # Results first: zip must drain the hashing generator, not the offsets
+                    results = self.processor.sample_files(items, self.sample_size)
+                    for (_, digest), offset in zip(results, offsets):
+                        sample_stage.files_in += 1
+                        if digest:
+                            by_sample.add(size, bytes.fromhex(digest), offset)
+                sample_stage.bytes_read = self.processor.bytes_read - bytes_before
+                self.stats.extend([stage, sample_stage])
+                
+                # Stage 3: full hashes of files whose samples still collide
+                full_stage = StageStats("full")
+                by_digest = ExternalSorter(digest_size, memory_limit, work)
+                bytes_before = self.processor.bytes_read
+                for (size, _), group in _shared_key_groups(
+                        by_sample.sorted(), itemgetter(0, 1), sample_stage,
+                        already_read=2 * self.sample_size):
+                    offsets, jobs = tee(offset for _, _, offset in group)
+                    items = (Path(paths.get(offset)) for offset in jobs)
+                    for (_, digest), offset in zip(self.processor.hash_files(items), offsets):
+                        full_stage.files_in += 1
+                        if digest:
+                            by_digest.add(size, bytes.fromhex(digest), offset)
+                full_stage.bytes_read = self.processor.bytes_read - bytes_before
+                self.stats.append(full_stage)
+                
+                groups = 0
+                for (_, digest), group in _shared_key_groups(
+                        by_digest.sorted(), itemgetter(0, 1), full_stage,
+                        already_read=None):
+                    groups += 1
+                    yield digest.hex(), sorted(Path(paths.get(offset)) for _, _, offset in group)
+            finally:
+                paths.close()
+        
+        self._log_scan_summary(groups)
+
+    def find_duplicate_dirs(self, exclude_dirs: Optional[List[str]] = None) -> Dict[str, List[Path]]:
+        """Scan directory tree for whole directories with identical contents.
+
+        Each directory gets a Merkle digest built from the names and content hashes
+        of its children, so a copied subtree is reported once rather than as one
+        group per file. Only the largest duplicated subtrees are reported: a group
+        whose directories are the children of exactly one other group, one per
+        directory, is dropped.
+
+        Args:
+            exclude_dirs (Optional[List[str]]): Directory names to exclude from scan.
+                                              A directory containing an excluded
+                                              directory, an oversized file, a
+                                              symlink or a special file is never
+                                              reported, since part of it was not
+                                              compared.
+
+        Returns:
+            Dict[str, List[Path]]: Merkle digest mapped to identical directories,
+                                   largest reclaimable subtrees first.
+
+        Note:
+            Files are only hashed inside directories whose layout of names and
+            sizes matches another directory, so unique directories cost one walk.
+        """
+        exclude_dirs = exclude_dirs or []
+        logger.info(f"Starting duplicate directory scan in {self.base_dir}")
+        
+        files, subdirs, incomplete = self._build_dir_tree(exclude_dirs)
+        # Deepest directories first, so children are always digested before parents
+        order = sorted(files, key=lambda d: d.count(os.sep), reverse=True)
+        
+        # Pass 1: layout digests from names and sizes only (no file reads)
+        layout: Dict[str, str] = {}
+        file_counts: Dict[str, int] = {}
+        self.dir_sizes = {}
+        for directory in order:
+            hasher = hashlib.new(self.processor.algorithm)
+            for name, size in files[directory]:
+                hasher.update(f"f\0{name}\0{size}\n".encode('utf-8', 'surrogateescape'))
+            for name in subdirs[directory]:
+                child = os.path.join(directory, name)
+                hasher.update(f"d\0{name}\0{layout[child]}\n".encode('utf-8', 'surrogateescape'))
+            layout[directory] = hasher.hexdigest()
+            children = [os.path.join(directory, name) for name in subdirs[directory]]
+            self.dir_sizes[directory] = (sum(size for _, size in files[directory]) +
+                                         sum(self.dir_sizes[child] for child in children))
+            file_counts[directory] = (len(files[directory]) +
+                                      sum(file_counts[child] for child in children))
+        layout_counts: Dict[str, int] = defaultdict(int)
+        for directory, digest in layout.items():
+            if directory not in incomplete:
+                layout_counts[digest] += 1
+        candidates = [d for d in order if d not in incomplete and layout_counts[layout[d]] > 1]
+        logger.info(f"{len(candidates)} of {len(order)} directories share a layout with another")
+        
+        # Pass 2: content digests for candidate directories only
+        candidate_set = set(candidates)
+        # Joined as strings: Path() would drop a leading './' and miss the lookups below
+        to_hash = [os.path.join(directory, name) for directory in candidates
+                   for name, _ in files[directory]]
+        digests = dict(self.processor.hash_files(to_hash))
+        merkle: Dict[str, Optional[str]] = {}
+        for directory in candidates:
+            hasher = hashlib.new(self.processor.algorithm)
+            complete = True
+            for name, _ in files[directory]:
+                digest = digests.get(os.path.join(directory, name))
+                complete = complete and digest is not None
+                hasher.update(f"f\0{name}\0{digest}\n".encode('utf-8', 'surrogateescape'))
+            for name in subdirs[directory]:
+                child = merkle.get(os.path.join(directory, name))
+                complete = complete and child is not None
+                hasher.update(f"d\0{name}\0{child}\n".encode('utf-8', 'surrogateescape'))
+            merkle[directory] = hasher.hexdigest() if complete else None
+        
+        groups: Dict[str, List[str]] = defaultdict(list)
+        for directory in candidates:
+            # Empty subtrees are all alike and reclaim nothing, so never report them
+            if merkle[directory] and file_counts[directory]:
+                groups[merkle[directory]].append(directory)
+        groups = {k: sorted(v) for k, v in groups.items() if len(v) > 1}
+        group_of = {d: k for k, dirs in groups.items() for d in dirs}
+        maximal = [(k, v) for k, v in groups.items()
+                   if not self._covered_by_parents(v, groups, group_of)]
+        # Largest reclaimable space first, then by path for a stable order
+        maximal.sort(key=lambda item: (-self.dir_sizes[item[1][0]] * (len(item[1]) - 1), item[1]))
+        self.duplicate_dirs = {k: [Path(d) for d in v] for k, v in maximal}
+        logger.info(f"Found {len(self.duplicate_dirs)} groups of duplicate directories")
+        return self.duplicate_dirs
+
+    @staticmethod
+    def _covered_by_parents(dirs: List[str], groups: Dict[str, List[str]],
+                            group_of: Dict[str, str]) -> bool:
+        """Return True if removing a larger duplicate already covers this group.
+
+        That is the case only when the parents of the directories form exactly
+        one other group, one parent per directory. Parents duplicated in
+        different groups (or alongside unrelated directories) leave some copies
+        of this group in place, so it must still be reported.
+        """
+        parents = {os.path.dirname(d) for d in dirs}
+        parent_groups = {group_of.get(parent) for parent in parents}
+        if len(parent_groups) != 1 or None in parent_groups:
+            return False
+        return len(parents) == len(dirs) and set(groups[parent_groups.pop()]) == parents
+
+    def _build_dir_tree(self, exclude_dirs: List[str]) -> Tuple[Dict[str, List[Tuple[str, int]]],
+                                                                 Dict[str, List[str]], Set[str]]:
+        """Walk the tree once, recording each directory's files and subdirectories.
+
+        Returns:
+            Tuple: Files (name, size) per directory, subdirectory names per
+                   directory, and the directories with contents left unscanned.
+        """
+        root = os.path.normpath(os.fspath(self.base_dir))
+        files: Dict[str, List[Tuple[str, int]]] = defaultdict(list)
+        subdirs: Dict[str, List[str]] = defaultdict(list)
+        incomplete: Set[str] = set()
+        excluded = frozenset(exclude_dirs)
+
+        def should_descend(entry) -> bool:
+            if entry.name in excluded:
+                incomplete.add(os.path.dirname(entry.path))
+                return False
+            return True
+
+        def skipped(path: str) -> None:
+            # Symlinks and special files are not compared, so their directory is not either
+            incomplete.add(os.path.dirname(path))
+
+        files[root] = []
+        for entry in walk(root, include_dirs=True, should_descend=should_descend,
+                          onerror=self._log_walk_error, on_skipped=skipped):
+            parent = os.path.dirname(entry.path)
+            if entry.is_dir:
+                if entry.name not in excluded:
+                    subdirs[parent].append(entry.name)
+                    files[entry.path] = []
+            elif not self._within_size_limit(entry.size):
+                incomplete.add(parent)
+            else:
+                files[parent].append((entry.name, entry.size))
+        for directory in files:
+            files[directory].sort()
+            subdirs[directory].sort()
+        # A directory is incomplete if any directory below it is
+        for directory in list(incomplete):
+            while directory != root:
+                directory = os.path.dirname(directory)
+                if directory in incomplete:
+                    break
+                incomplete.add(directory)
+        return files, subdirs, incomplete
+
+    def remove_duplicates(self, keep_first: bool = True, mode: str = 'delete',
+                          dry_run: bool = False) -> Optional[RemovalReport]:
         """Remove identified duplicate files.
         
         Args:
             keep_first (bool): If True, keeps the first occurrence of each file.
                              Defaults to True.
+            mode (str): 'delete' unlinks redundant copies; 'hardlink' and 'reflink'
+                      replace them with links to the first file, keeping every
+                      path. Link modes always keep the first file. Defaults to 'delete'.
+            dry_run (bool): Touch nothing; report the files and bytes that would be
+                          reclaimed. Defaults to False.
+                             
+        Returns:
+            Optional[RemovalReport]: Files removed, bytes reclaimed and throughput
+                                     for deletions and dry runs; None for link modes.
+                             
+        Raises:
+            ValueError: If the mode is not one of REMOVAL_MODES.
                              
         Note:
-            - Logs all removal operations
-            - Implements safety checks before deletion
+            - Deletions are batched per directory (see ``BatchRemover``) and
+              logged as a single summary line
             - Preserves at least one copy when keep_first is True
         """
+        if mode not in REMOVAL_MODES:
+            raise ValueError(f"Unknown removal mode: {mode}. "
+                             f"Choose one of: {', '.join(REMOVAL_MODES)}")
         if not self.duplicates:
             logger.warning("No duplicates found to remove")
-            return
-            
+            return None
+        
+        if mode == 'delete' or dry_run:
+            keep = 1 if keep_first or mode != 'delete' else 0
+            return self.delete_files(
+                (path for file_list in self.duplicates.values() for path in file_list[keep:]),
+                dry_run
+            )
         for hash_value, file_list in self.duplicates.items():
             logger.info(f"\nProcessing duplicate group with hash {hash_value}:")
-            self._process_duplicate_group(file_list, keep_first)
+            self._link_duplicate_group(file_list, mode)
+        return None
+
+    def delete_files(self, paths: Iterable[Path], dry_run: bool = False) -> RemovalReport:
+        """Delete files with the batched, per-directory removal engine.
+
+        Args:
+            paths (Iterable[Path]): Files to delete.
+            dry_run (bool): Only report what would be deleted. Defaults to False.
+
+        Returns:
+            RemovalReport: Files removed, bytes reclaimed and throughput.
+        """
+        report = BatchRemover(workers=self.removal_workers, dry_run=dry_run,
+                              logger=logger).remove(paths)
+        logger.info(report.summary())
+        return report
+
+    def _link_duplicate_group(self, file_list: List[Path], mode: str) -> None:
+        """Replace every file in a group after the first with a link to it.
 
-    def _process_duplicate_group(self, file_list: List[Path], keep_first: bool) -> None:
-        """Process a group of duplicate files.
-        
         Args:
             file_list (List[Path]): List of duplicate files.
-            keep_first (bool): If True, keeps the first occurrence of each file.
+            mode (str): 'hardlink' or 'reflink'.
         """
-        for i, filepath in enumerate(file_list):
+        original = file_list[0]
+        logger.info(f"Keeping original: {original}")
+        try:
+            original_stat = original.stat()
+        except OSError as e:
+            logger.error(f"Cannot link to {original}: {e}")
+            return
+        
+        for filepath in file_list[1:]:
+            try:
+                target_stat = filepath.stat()
+            except FileNotFoundError:
+                logger.warning(f"File no longer exists: {filepath}")
+                continue
+            except OSError as e:
+                logger.error(f"Error linking {filepath}: {e}")
+                continue
+            if (target_stat.st_dev, target_stat.st_ino) == (original_stat.st_dev, original_stat.st_ino):
+                logger.info(f"Already linked: {filepath}")
+                continue
             try:
+                replace_with_link(original, filepath, mode)
+                logger.info(f"Replaced with {mode}: {filepath}")
+            except PermissionError:
+                logger.error(f"Permission denied: {filepath}")
+            except OSError as e:
+                logger.error(f"Error linking {filepath}: {e}")
+
+    def remove_duplicate_dirs(self, keep_first: bool = True) -> None:
+        """Remove directories found by ``find_duplicate_dirs``.
+
+        Args:
+            keep_first (bool): If True, keeps the first directory of each group.
+                             Defaults to True.
+        """
+        if not self.duplicate_dirs:
+            logger.warning("No duplicate directories found to remove")
+            return
+        
+        for hash_value, dir_list in self.duplicate_dirs.items():
+            logger.info(f"\nProcessing duplicate directory group with hash {hash_value}:")
+            for i, dirpath in enumerate(dir_list):
                 if keep_first and i == 0:
-                    logger.info(f"Keeping original: {filepath}")
+                    logger.info(f"Keeping original: {dirpath}")
                     continue
-                    
-                # Safety check before removal
-                if not filepath.exists():
-                    logger.warning(f"File no longer exists: {filepath}")
+                # A directory may already be gone with a larger duplicate removed earlier
+                if not dirpath.is_dir():
+                    logger.warning(f"Directory no longer exists: {dirpath}")
                     continue
-                    
-                filepath.unlink()
-                logger.info(f"Removed: {filepath}")
-            except PermissionError:
-                logger.error(f"Permission denied: {filepath}")
-            except Exception as e:
-                logger.error(f"Error removing {filepath}: {e}")
+                try:
+                    shutil.rmtree(dirpath)
+                    logger.info(f"Removed directory: {dirpath}")
+                except OSError as e:
+                    logger.error(f"Error removing {dirpath}: {e}")
 
-def main():
+    def build_reference_index(self, index: ReferenceIndex,
+                              exclude_dirs: Optional[List[str]] = None,
+                              rebuild: bool = False) -> int:
+        """Hash every file under ``base_dir`` into a reference index.
+
+        Unchanged files are served from the hash cache, so refreshing the index
+        of a large corpus only reads what changed since the last build.
+
+        Args:
+            index (ReferenceIndex): Index to fill; its algorithm must match the finder's.
+            exclude_dirs (Optional[List[str]]): Directory names to exclude.
+            rebuild (bool): Drop existing entries first, so files deleted from the
+                          corpus disappear from the index. Defaults to False.
+
+        Returns:
+            int: Number of files added to the index.
+        """
+        if rebuild:
+            index.clear()
+        logger.info(f"Indexing reference corpus {self.base_dir} into {index.db_path}")
+        sizes: Deque[int] = deque()
+        inodes: Set[Tuple[int, int]] = set()
+
+        def paths() -> Iterator[Path]:
+            for entry in walk(self.base_dir, excluded_dirs=exclude_dirs,
+                              onerror=self._log_walk_error):
+                if not self._within_size_limit(entry.size):
+                    continue
+                key = (entry.stat.st_dev, entry.stat.st_ino)
+                if entry.stat.st_nlink > 1:
+                    if key in inodes:
+                        continue
+                    inodes.add(key)
+                sizes.append(entry.size)
+                yield Path(os.path.abspath(entry.path))
+
+        progress = ProgressReporter("index", logger, interval=self.progress_interval)
+        counter = self.processor.bytes_read
+        added = 0
+        for path, digest in self.processor.hash_files(paths()):
+            size = sizes.popleft()
+            counter = self._hash_progress(progress, counter)
+            if digest is not None:
+                index.add(str(path), size, digest)
+                added += 1
+        progress.finish()
+        index.save()
+        if self.cache:
+            self.cache.flush()
+        logger.info(f"Reference index holds {len(index)} files ({added} indexed this run)")
+        return added
+
+    def find_known_files(self, index: ReferenceIndex,
+                         exclude_dirs: Optional[List[str]] = None) -> Dict[Path, str]:
+        """Find files under ``base_dir`` that already exist in a reference corpus.
+
+        Files whose size is absent from the index's Bloom filter are rejected
+        without being read; the rest are hashed and looked up.
+
+        Args:
+            index (ReferenceIndex): Index built with ``build_reference_index``.
+            exclude_dirs (Optional[List[str]]): Directory names to exclude.
+
+        Returns:
+            Dict[Path, str]: Each known file mapped to a corpus file with the
+                             same contents, sorted by path.
+        """
+        stage = StageStats("reference")
+        self.stats.append(stage)
+        logger.info(f"Checking {self.base_dir} against reference index {index.db_path}")
+        sizes: Deque[int] = deque()
+
+        def candidates() -> Iterator[Path]:
+            for entry in walk(self.base_dir, excluded_dirs=exclude_dirs,
+                              onerror=self._log_walk_error):
+                if not self._within_size_limit(entry.size):
+                    continue
+                stage.files_in += 1
+                if not index.may_contain_size(entry.size):
+                    stage.files_eliminated += 1
+                    stage.bytes_avoided += entry.size
+                    continue
+                sizes.append(entry.size)
+                yield Path(entry.path)
+
+        progress = ProgressReporter("reference", logger, interval=self.progress_interval)
+        bytes_before = self.processor.bytes_read
+        counter = bytes_before
+        known = {}
+        for path, digest in self.processor.hash_files(candidates()):
+            size = sizes.popleft()
+            counter = self._hash_progress(progress, counter)
+            original = index.lookup(size, digest) if digest is not None else None
+            if original is None:
+                stage.files_eliminated += 1
+                continue
+            # Never treat the corpus copy itself as a redundant file
+            try:
+                if os.path.samefile(original, path):
+                    continue
+            except OSError:
+                pass
+            known[path] = original
+        progress.finish()
+        stage.bytes_read = self.processor.bytes_read - bytes_before
+        self.known_files = dict(sorted(known.items()))
+        logger.info(stage.summary())
+        logger.info(f"Found {len(self.known_files)} files already in the reference corpus")
+        return self.known_files
+
+    def remove_known_files(self, mode: str = 'delete',
+                           dry_run: bool = False) -> Optional[RemovalReport]:
+        """Dispose of files found by ``find_known_files``; the corpus is never touched.
+
+        Args:
+            mode (str): 'delete' unlinks the files; 'hardlink' and 'reflink' replace
+                      them with links to the corpus copy (same filesystem only).
+                      Defaults to 'delete'.
+            dry_run (bool): Only report what would be reclaimed. Defaults to False.
+
+        Returns:
+            Optional[RemovalReport]: Removal counters for deletions and dry runs.
+
+        Raises:
+            ValueError: If the mode is not one of REMOVAL_MODES.
+
+        Note:
+            The index may be stale, so each corpus copy is hashed again first and
+            a file is only removed while its corpus copy still exists with the
+            same contents.
+        """
+        if mode not in REMOVAL_MODES:
+            raise ValueError(f"Unknown removal mode: {mode}. "
+                             f"Choose one of: {', '.join(REMOVAL_MODES)}")
+        if not self.known_files:
+            logger.warning("No known files found to remove")
+            return None
+        verified = self._verify_known_files()
+        if mode == 'delete' or dry_run:
+            return self.delete_files(verified, dry_run)
+        for path, original in verified.items():
+            self._link_duplicate_group([Path(original), path], mode)
+        return None
+
+    def _verify_known_files(self) -> Dict[Path, str]:
+        """Return the known files whose corpus copy still holds the same contents."""
+        originals = sorted(set(self.known_files.values()))
+        paths = list(self.known_files) + [Path(original) for original in originals]
+        digests = dict(self.processor.hash_files(paths))
+        verified = {}
+        for path, original in self.known_files.items():
+            digest = digests.get(path)
+            if digest is None or digest != digests.get(Path(original)):
+                logger.error(f"Refusing to remove {path}: the corpus copy {original} "
+                             "is missing or no longer matches")
+                continue
+            verified[path] = original
+        return verified
+
+def replace_with_link(original: Path, target: Path, mode: str = 'hardlink') -> None:
+    """Atomically replace ``target`` with a hardlink or reflink of ``original``.
+
+    The link is created under a temporary name next to ``target`` and then moved
+    over it with ``os.replace``, so ``target`` never disappears, even on failure.
+
+    Args:
+        original (Path): File whose contents are kept.
+        target (Path): Duplicate file to replace.
+        mode (str): 'hardlink' to share the inode, or 'reflink' to share extents
+                  while keeping a separate inode (btrfs, XFS). Defaults to 'hardlink'.
+
+    Raises:
+        OSError: If the link cannot be created, e.g. across filesystems or when
+                 the filesystem does not support reflinks.
+    """
+    temp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.dedup")
+    try:
+        if mode == 'hardlink':
+            os.link(original, temp_path)
+        elif mode == 'reflink':
+            if fcntl is None:
+                raise OSError(errno.EOPNOTSUPP, "Reflinks are not supported on this platform")
+            with open(original, 'rb') as src, open(temp_path, 'xb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            # A reflink is a new inode; keep the duplicate's own permissions and times
+            shutil.copystat(target, temp_path)
+        else:
+            raise ValueError(f"Unknown link mode: {mode}")
+        os.replace(temp_path, target)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+@dataclass
+class BlockDedupReport:
+    """Estimated block-level deduplication savings from a chunk analysis."""
+    files: int = 0
+    total_bytes: int = 0
+    unique_bytes: int = 0
+    chunks: int = 0
+    unique_chunks: int = 0
+    # Files of which only the first max_bytes_per_file bytes were chunked
+    sampled_files: int = 0
+    # (earlier file, later file) -> bytes of the later file already held by the
+    # earlier one, for the pairs sharing the most bytes only
+    pair_savings: Dict[Tuple[str, str], int] = field(default_factory=dict)
+    # Directory -> bytes of its files already held by files scanned before them
+    dir_savings: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def saved_bytes(self) -> int:
+        """Bytes block-level dedup would avoid storing."""
+        return self.total_bytes - self.unique_bytes
+
+    def top_pairs(self, limit: int = 10) -> List[Tuple[Tuple[str, str], int]]:
+        """Return the file pairs sharing the most bytes, largest first."""
+        return sorted(self.pair_savings.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def top_dirs(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """Return the directories with the most redundant bytes, largest first."""
+        return sorted(self.dir_savings.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def summary(self) -> str:
+        """Return a one-line summary of chunked bytes and estimated savings."""
+        ratio = self.saved_bytes / self.total_bytes if self.total_bytes else 0.0
+        line = (f"Chunk analysis: {self.files} files, {self.total_bytes} bytes in "
+                f"{self.chunks} chunks ({self.unique_chunks} unique); block-level "
+                f"dedup would save {self.saved_bytes} bytes ({ratio:.1%})")
+        if self.sampled_files:
+            line += f"; only the start of {self.sampled_files} large files was chunked"
+        return line
+
+class BlockDedupAnalyzer:
+    """Estimates block-level savings for near-identical files.
+
+    File hashing only finds exact copies. Splitting files into content-defined
+    chunks also catches VM images, archives and dumps that differ by a few
+    bytes, since an edit only changes the chunks around it.
+    """
+
+    def __init__(self, base_dir: str, processor: Optional[FileProcessor] = None,
+                 min_file_size: int = DEFAULT_CDC_MIN_FILE_SIZE,
+                 max_file_size: Optional[int] = None,
+                 avg_chunk_size: int = DEFAULT_AVG_CHUNK,
+                 max_bytes_per_file: Optional[int] = DEFAULT_CDC_MAX_BYTES,
+                 top_pairs: int = DEFAULT_CDC_TOP_PAIRS):
+        """Initialize the analyzer.
+
+        Args:
+            base_dir (str): Root directory to analyze.
+            processor (Optional[FileProcessor]): Processor used to chunk files.
+                                               Defaults to a serial one.
+            min_file_size (int): Skip files smaller than this many bytes.
+                               Defaults to 1 MB.
+            max_file_size (Optional[int]): Skip files larger than this many bytes.
+            avg_chunk_size (int): Target average chunk size, a power of two.
+                                Chunks range from a quarter to four times this.
+                                Defaults to 16 KB.
+            max_bytes_per_file (Optional[int]): Chunk only the start of larger
+                                              files. Defaults to 64 MB with the
+                                              pure-Python chunker and no limit
+                                              with the compiled one.
+            top_pairs (int): File pairs kept in the report. Defaults to 100.
+        """
+        self.base_dir = Path(base_dir)
+        self.processor = processor or FileProcessor()
+        self.min_file_size = min_file_size
+        self.max_file_size = max_file_size
+        self.avg_chunk_size = avg_chunk_size
+        self.max_bytes_per_file = max_bytes_per_file
+        self.top_pairs = top_pairs
+
+    def analyze(self, exclude_dirs: Optional[List[str]] = None) -> BlockDedupReport:
+        """Chunk every eligible file and estimate block-level savings.
+
+        Files are streamed one at a time; only the index of unique chunk digests
+        and a bounded heap of the top file pairs are kept, so memory grows with
+        the amount of unique data, not with the number of file pairs. A repeated
+        chunk is credited to the pair formed with the first file that held it,
+        and to the directory of the file repeating it.
+
+        Args:
+            exclude_dirs (Optional[List[str]]): Directory names to exclude.
+
+        Returns:
+            BlockDedupReport: Totals plus per-pair and per-directory savings.
+        """
+        report = BlockDedupReport()
+        # Chunk digest -> index into ``paths`` of the first file holding it
+        index: Dict[bytes, int] = {}
+        paths: List[str] = []
+        seen_inodes: Set[Tuple[int, int]] = set()
+        # Min-heap of (saved bytes, earlier file, later file) for the top pairs
+        top_pairs: List[Tuple[int, int, int]] = []
+        dir_savings: Dict[str, int] = defaultdict(int)
+        limit = self.max_bytes_per_file
+
+        def eligible() -> Iterator[Path]:
+            for entry in walk(self.base_dir, excluded_dirs=exclude_dirs,
+                              max_file_size=self.max_file_size,
+                              onerror=DuplicateFinder._log_walk_error):
+                key = (entry.stat.st_dev, entry.stat.st_ino)
+                # Hardlinks share their data already
+                if entry.size >= self.min_file_size and key not in seen_inodes:
+                    seen_inodes.add(key)
+                    yield Path(entry.path)
+
+        logger.info(f"Starting chunk analysis in {self.base_dir}")
+        progress = ProgressReporter("chunk", logger)
+        bytes_before = self.processor.bytes_read
+        avg = self.avg_chunk_size
+        for path, chunks in self.processor.chunk_files(eligible(), avg // 4, avg, avg * 4,
+                                                       max_bytes=limit):
+            progress.update(files=1, nbytes=self.processor.bytes_read - bytes_before)
+            bytes_before = self.processor.bytes_read
+            if chunks is None:
+                continue
+            file_id = len(paths)
+            paths.append(str(path))
+            report.files += 1
+            if limit is not None and sum(length for _, length in chunks) >= limit:
+                report.sampled_files += 1
+            # Pairs with this file are complete once its chunks are counted
+            pair_savings: Dict[int, int] = defaultdict(int)
+            for digest, length in chunks:
+                report.chunks += 1
+                report.total_bytes += length
+                owner = index.get(digest)
+                if owner is None:
+                    index[digest] = file_id
+                    report.unique_chunks += 1
+                    report.unique_bytes += length
+                    continue
+                # Repeats inside one file still save space but form no pair
+                if owner != file_id:
+                    pair_savings[owner] += length
+                dir_savings[str(path.parent)] += length
+            for owner, saved in pair_savings.items():
+                item = (saved, -owner, -file_id)
+                if len(top_pairs) < self.top_pairs:
+                    heapq.heappush(top_pairs, item)
+                elif item > top_pairs[0]:
+                    heapq.heapreplace(top_pairs, item)
+        progress.finish()
+
+        report.pair_savings = {(paths[-a], paths[-b]): saved for saved, a, b in top_pairs}
+        report.dir_savings = dict(dir_savings)
+        logger.info(report.summary())
+        for (first, second), saved in report.top_pairs(5):
+            logger.info(f"{saved} bytes of {second} are shared with {first}")
+        return report
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line options.
+
+    Args:
+        argv (Optional[List[str]]): Arguments to parse. Defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: Parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Find and remove duplicate files.")
+    parser.add_argument('directory', nargs='*',
+                        help="Directories to scan together (prompted for when omitted)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue the scan saved in the checkpoint file")
+    parser.add_argument('--checkpoint', nargs='?', const=str(DEFAULT_CHECKPOINT_PATH),
+                        metavar='FILE',
+                        help="Save the scan to FILE (default: %(const)s) so it can be "
+                             "resumed; without it or --resume no checkpoint is written")
+    reference = parser.add_mutually_exclusive_group()
+    reference.add_argument('--build-reference', metavar='INDEX',
+                           help="Index the directory as a reference corpus into INDEX")
+    reference.add_argument('--reference', metavar='INDEX',
+                           help="Find files in the directory that the corpus in INDEX already holds")
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument('--batch', action='store_true',
+                       help="Run without prompts, streaming each group to --output as it "
+                            "is confirmed and applying --action to it")
+    batch.add_argument('--exclude', action='append', metavar='NAME',
+                       help="Directory name to skip; repeatable (default: from settings)")
+    batch.add_argument('--min-size', type=int, default=0, metavar='BYTES',
+                       help="Ignore files smaller than BYTES (default: %(default)s)")
+    batch.add_argument('--max-file-size', type=float, metavar='MB',
+                       help="Ignore files larger than MB megabytes; the number skipped "
+                            "is logged (default: no limit)")
+    batch.add_argument('--action', choices=('report',) + REMOVAL_MODES, default='report',
+                       help="What to do with redundant copies (default: %(default)s)")
+    batch.add_argument('--dry-run', action='store_true',
+                       help="Report the files and bytes --action would reclaim without "
+                            "changing anything")
+    batch.add_argument('--format', choices=GROUP_FORMATS, default='ndjson',
+                       help="Output format (default: %(default)s)")
+    batch.add_argument('--output', default='-', metavar='FILE',
+                       help="Write groups to FILE instead of standard output")
+    batch.add_argument('--memory-limit', type=int, metavar='MB',
+                       help="Use the bounded-memory scan with this budget per stage")
+    args = parser.parse_args(argv)
+    if args.batch and not args.directory:
+        parser.error("--batch needs at least one directory")
+    if args.memory_limit and (args.resume or args.checkpoint):
+        parser.error("the bounded-memory scan (--memory-limit) cannot be checkpointed or resumed")
+    if args.resume and not args.checkpoint:
+        args.checkpoint = str(DEFAULT_CHECKPOINT_PATH)
+    return args
+
+def run_batch(finder: DuplicateFinder, args: argparse.Namespace, exclude_dirs: List[str]) -> int:
+    """Stream duplicate groups to the requested output, applying the action to each.
+
+    Args:
+        finder (DuplicateFinder): Finder configured with the roots to scan.
+        args (argparse.Namespace): Parsed batch options.
+        exclude_dirs (List[str]): Directory names to skip.
+
+    Returns:
+        int: Number of duplicate groups found.
+
+    Note:
+        Deletions (and dry runs) are queued and applied in batches of
+        DEFAULT_DELETE_BATCH files so they can be grouped by directory. A group
+        is written only once its batch has been applied, so an interrupted run
+        never lists files it did not get to. Dry-run records carry the action
+        as 'dry-run:<action>'.
+    """
+    if args.memory_limit:
+        groups = finder.iter_duplicates_external(exclude_dirs, args.memory_limit * 1024 * 1024)
+    else:
+        groups = finder.iter_duplicates(exclude_dirs, resume=args.resume)
+    action = None if args.action == 'report' else args.action
+    label = f"dry-run:{action}" if action and args.dry_run else action
+    # Groups waiting for their queued deletions, in output order
+    pending: List[Tuple[str, List[Path], Optional[int]]] = []
+    to_delete: List[Path] = []
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+
+    def flush() -> None:
+        if to_delete:
+            finder.delete_files(to_delete, dry_run=args.dry_run)
+            to_delete.clear()
+        for group in pending:
+            writer.write(*group, label)
+        pending.clear()
+
+    try:
+        writer = GroupWriter(output, args.format)
+        for digest, file_list in groups:
+            try:
+                size = file_list[0].stat().st_size
+            except OSError:
+                size = None
+            if action == 'delete' or (action and args.dry_run):
+                to_delete.extend(file_list[1:])
+            elif action:
+                finder._link_duplicate_group(file_list, action)
+            pending.append((digest, file_list, size))
+            if not to_delete or len(to_delete) >= DEFAULT_DELETE_BATCH:
+                flush()
+        flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return writer.groups
+
+def main(argv: Optional[List[str]] = None):
     """Main execution function with error handling."""
+    args = parse_args(argv)
+    finder = None
     try:
-        directory = input("Enter directory to scan: ")
-        directory = directory or "."
+        directories = args.directory or [input("Enter directory to scan: ") or "."]
+        
+        walk_settings = load_walk_settings()
+        finder = DuplicateFinder(directories[0], extra_roots=directories[1:],
+                                 cache_path=str(DEFAULT_CACHE_PATH),
+                                 workers=DEFAULT_WORKERS,
+                                 # Large files are where deduplication saves the most,
+                                 # so only an explicit limit skips them
+                                 max_file_size=int(args.max_file_size * 1024 * 1024)
+                                 if args.max_file_size else None,
+                                 min_file_size=args.min_size,
+                                 # Reference modes never walk with checkpoints
+                                 checkpoint_path=None if args.build_reference or args.reference
+                                 else args.checkpoint)
+        exclude_dirs = (args.exclude or walk_settings['excluded_dirs']
+                        or ['.git', '__pycache__', 'node_modules'])
+        if args.build_reference:
+            with ReferenceIndex(args.build_reference, finder.processor.algorithm) as index:
+                added = finder.build_reference_index(index, exclude_dirs)
+            finder.close()
+            print(f"Indexed {added} files into {args.build_reference}")
+            return
+        if args.reference:
+            with ReferenceIndex(args.reference, finder.processor.algorithm) as index:
+                known = finder.find_known_files(index, exclude_dirs)
+            finder.close()
+            if not known:
+                print("No files from the reference corpus found.")
+                return
+            print("\nFound the following files already in the reference corpus:")
+            for filepath, original in known.items():
+                print(f"{filepath} (same as {original})")
+            if args.batch:
+                if args.action != 'report':
+                    finder.remove_known_files(args.action, dry_run=args.dry_run)
+            elif input("\nWould you like to remove them? (y/n): ").lower() == 'y':
+                finder.remove_known_files()
+                print("\nKnown files have been removed.")
+            return
+        if args.batch:
+            groups = run_batch(finder, args, exclude_dirs)
+            finder.close()
+            logger.info(f"Batch run wrote {groups} duplicate groups")
+            return
         
-        finder = DuplicateFinder(directory)
-        duplicates = finder.find_duplicates(exclude_dirs=['.git', '__pycache__', 'node_modules'])
+        duplicates = finder.find_duplicates(exclude_dirs=exclude_dirs, resume=args.resume)
+        finder.close()
         
         if not duplicates:
             print("No duplicate files found.")
@@ -168,7 +1837,12 @@ def main():
             print("\nDuplicate files have been removed.")
         
     except KeyboardInterrupt:
-        print("\nOperation cancelled by user.")
+        if finder and finder.checkpoint:
+            finder.close()
+            print("\nScan interrupted. Progress was saved; rerun with "
+                  f"--resume --checkpoint {args.checkpoint} to continue.")
+        else:
+            print("\nOperation cancelled by user.")
         sys.exit(1)
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
@@ -1,6 +1,6 @@
-# Import and initialize requirements installer
-import docs.install_requirements as install_requirements
-install_requirements.install_requirements()
+# Import and initialize requirements installer (pip only runs when needed)
+from src.core.install_requirements import install_requirements
+install_requirements()
 
 import os
 import shutil
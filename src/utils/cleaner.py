@@ -1,83 +1,677 @@
-import docs.install_requirements as install_requirements
-install_requirements.install_requirements()
+from src.core.install_requirements import install_requirements
+install_requirements()
 
+import argparse
+import errno
+import gzip
+import lzma
 import os
+import re
 import shutil
-from pathlib import Path
-from typing import List, Optional
+import time
+import uuid
+from collections import defaultdict
+from functools import lru_cache
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+from src.core.file_walker import WalkEntry, load_walk_settings, walk
+
+# Default directory names for each cleanup rule
+DEFAULT_LOG_DIRS = ['logs', 'log']
+LOG_EXTENSIONS = ('.log', '.txt')
+# Log files including rotated (app.log.1) and compressed (app.log.2.gz) generations
+LOG_FILE_PATTERN = r'.+\.(?:log|txt)(?:\.\d+)?(?:\.(?:gz|xz))?'
+CACHE_DIRS = ['__pycache__', '.pytest_cache', '.mypy_cache', '.cache']
+DEFAULT_DATA_DIRS = ['user_data', 'data']
+TOOL_DATA_DIRS = ['temp', 'tmp', '.tmp']
+
+# Directory under the project root that matched directories are renamed into
+# when deleting in the background; it is never walked or matched itself
+TRASH_DIR = '.cleaner_trash'
+DEFAULT_PURGE_WORKERS = 4
+
+# Directories listed concurrently when a dry run measures what would be removed
+DEFAULT_SCAN_WORKERS = 8
+
+# Compression methods for retained logs and the suffix each one adds
+COMPRESSORS = {'gzip': (gzip.open, '.gz'), 'lzma': (lzma.open, '.xz')}
+COMPRESSED_SUFFIXES = tuple(suffix for _, suffix in COMPRESSORS.values())
+
+# Bytes copied per read while compressing, so memory stays flat on huge logs
+COMPRESS_CHUNK = 1024 * 1024
+
+@dataclass(frozen=True)
+class CleanupRule:
+    """A named group of directories to clean.
+
+    Without extensions or a pattern, every directory whose name is in
+    ``dir_names`` is removed whole. Otherwise only files ending in one of the
+    extensions, or whose name fully matches the regular expression ``pattern``,
+    are removed, from anywhere below a directory whose name is in ``dir_names``.
+    """
+    name: str
+    dir_names: FrozenSet[str]
+    extensions: Optional[Tuple[str, ...]] = None
+    pattern: Optional[str] = None
+
+    @property
+    def selects_files(self) -> bool:
+        return bool(self.extensions or self.pattern)
+
+    def matches_file(self, name: str) -> bool:
+        """Return True if a file with this name is covered by the rule."""
+        if self.extensions and name.endswith(self.extensions):
+            return True
+        return bool(self.pattern) and _compile(self.pattern).fullmatch(name) is not None
+
+@lru_cache(maxsize=None)
+def _compile(pattern: str) -> "re.Pattern":
+    return re.compile(pattern)
+
+@dataclass
+class RetentionPolicy:
+    """How many log files to keep, and which to compress, in ``clear_logs``.
+
+    Files are grouped per logger (``app.log``, ``app.log.1`` and ``app.log.2.gz``
+    belong to ``app``) within each directory. The newest file of each logger
+    may still be written to, so it is never compressed or removed.
+    """
+    # Remove logs last modified longer ago than this
+    max_age_days: Optional[float] = None
+    # Remove the oldest logs until all log directories together fit in this many bytes
+    max_total_size: Optional[int] = None
+    # Keep at most this many files per logger, newest first
+    keep_last: Optional[int] = None
+    # Compress kept logs older than compress_after_days: 'gzip', 'lzma' or None
+    compress: Optional[str] = 'gzip'
+    compress_after_days: float = 1.0
+    # Files compressed concurrently
+    workers: int = 4
+
+class CleanupMatcher:
+    """All cleanup rules compiled into name lookups for a single walk.
+
+    Names are matched against whole path components, so ``data`` matches a
+    directory called ``data`` but not ``metadata`` or ``data_old``.
+    """
+
+    def __init__(self, rules: Iterable[CleanupRule]):
+        self.rules = list(rules)
+        # Directory name -> rule removing such directories whole
+        self.dir_rules: Dict[str, CleanupRule] = {}
+        # Directory name -> rule removing matching files below such directories
+        self.file_rules: Dict[str, CleanupRule] = {}
+        for rule in self.rules:
+            target = self.file_rules if rule.selects_files else self.dir_rules
+            for name in rule.dir_names:
+                target.setdefault(name, rule)
+
+    @property
+    def names(self) -> FrozenSet[str]:
+        """Every directory name any rule refers to."""
+        return frozenset(self.dir_rules) | frozenset(self.file_rules)
+
+@dataclass
+class CleanupTarget:
+    """A directory or file a cleanup will remove, with its measured size."""
+    rule: str
+    path: str
+    is_dir: bool
+    files: int = 0
+    bytes: int = 0
+
+@dataclass
+class CleanupPlan:
+    """Everything a cleanup will remove; produced by a dry run or a real run alike.
+
+    Sizes are only filled in when the plan was measured. Bytes of a hardlinked
+    file are counted once, however many of its names the plan removes.
+    """
+    targets: List[CleanupTarget] = field(default_factory=list)
+    measured: bool = False
+    # Files compressed rather than removed (log retention), and how
+    compress: List[CleanupTarget] = field(default_factory=list)
+    compression: Optional[str] = None
+    compress_workers: int = 4
+
+    @property
+    def total_files(self) -> int:
+        return sum(target.files for target in self.targets)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(target.bytes for target in self.targets)
+
+    def by_rule(self) -> Dict[str, Tuple[int, int]]:
+        """Rule name mapped to (files, bytes) it would reclaim."""
+        return self._totals(lambda target: target.rule)
+
+    def by_directory(self) -> Dict[str, Tuple[int, int]]:
+        """Directory mapped to (files, bytes) reclaimed from it.
+
+        A removed directory is its own entry; removed files are grouped under
+        their parent directory.
+        """
+        return self._totals(lambda target: target.path if target.is_dir
+                            else os.path.dirname(target.path))
+
+    def _totals(self, key) -> Dict[str, Tuple[int, int]]:
+        totals: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        for target in self.targets:
+            entry = totals[key(target)]
+            entry[0] += target.files
+            entry[1] += target.bytes
+        return {name: (files, size) for name, (files, size) in totals.items()}
+
+    def report(self) -> List[str]:
+        """Human readable lines: totals, then per rule, then per directory."""
+        lines = [f"Would reclaim {_format_size(self.total_bytes)} in {self.total_files} files "
+                 f"from {len(self.targets)} matches"]
+        if self.compress:
+            lines.append(f"Would compress {len(self.compress)} files "
+                         f"({_format_size(sum(target.bytes for target in self.compress))}) "
+                         f"with {self.compression}")
+        for rule, (files, size) in sorted(self.by_rule().items()):
+            lines.append(f"  {rule}: {_format_size(size)} in {files} files")
+        for directory, (files, size) in sorted(self.by_directory().items(),
+                                               key=lambda item: -item[1][1]):
+            lines.append(f"  {directory}: {_format_size(size)} in {files} files")
+        return lines
+
+def _logger_name(filename: str) -> str:
+    """Return the logger a log file belongs to, ignoring rotation, dates and compression."""
+    name = re.sub(r'\.(?:gz|xz)$', '', filename)
+    name = re.sub(r'\.\d+$', '', name)
+    name = re.sub(r'\.(?:log|txt)$', '', name)
+    return re.sub(r'[-_.]?\d{4}-?\d{2}-?\d{2}(?:[T_-]?\d{2,6})?$', '', name) or name
+
+def _report_compression(target: CleanupTarget, future: Future) -> None:
+    """Print the outcome of one finished log compression."""
+    try:
+        size = future.result()
+        print(f"Compressed log: {target.path} "
+              f"({_format_size(target.bytes)} -> {_format_size(size)})")
+    except Exception as e:
+        print(f"Error compressing {target.path}: {e}")
+
+def _compressed_destination(path: str, suffix: str) -> str:
+    """Return a name for the compressed copy of a log that does not exist yet.
+
+    Rotation renames app.log.1 but never the app.log.1.gz compressed earlier,
+    so when that name is taken the log's modification time is added to its
+    stem (app-20240102-030405.log.1.gz), which _logger_name still recognises.
+    """
+    destination = path + suffix
+    if not os.path.exists(destination):
+        return destination
+    directory, filename = os.path.split(path)
+    match = re.fullmatch(r'(.+?)(\.(?:log|txt)(?:\.\d+)?)', filename)
+    stem, tail = match.groups() if match else (filename, '')
+    # Replace a date already in the stem, since only one is stripped when grouping
+    stem = _logger_name(stem)
+    stamp = int(os.stat(path).st_mtime)
+    while True:
+        date = time.strftime('%Y%m%d-%H%M%S', time.localtime(stamp))
+        destination = os.path.join(directory, f"{stem}-{date}{tail}{suffix}")
+        if not os.path.exists(destination):
+            return destination
+        stamp += 1
+
+def compress_log(path: str, method: str = 'gzip') -> int:
+    """Compress a log file next to itself and remove the original.
+
+    The data is streamed in fixed-size chunks, the modification time is kept so
+    retention ordering is unchanged, and the compressed file only appears under
+    its final name once complete. An existing compressed file is never
+    replaced; see _compressed_destination.
+
+    Args:
+        path (str): Log file to compress.
+        method (str): 'gzip' or 'lzma'.
+
+    Returns:
+        int: Size of the compressed file in bytes.
+    """
+    opener, suffix = COMPRESSORS[method]
+    destination = _compressed_destination(path, suffix)
+    temp_path = destination + '.tmp'
+    try:
+        with open(path, 'rb') as src, opener(temp_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, COMPRESS_CHUNK)
+        shutil.copystat(path, temp_path)
+        os.replace(temp_path, destination)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    os.unlink(path)
+    return os.path.getsize(destination)
+
+def _format_size(size: int) -> str:
+    """Format a byte count with a binary unit."""
+    if size < 1024:
+        return f"{size} B"
+    for unit in ('KB', 'MB', 'GB', 'TB'):
+        size /= 1024
+        if size < 1024 or unit == 'TB':
+            return f"{size:.1f} {unit}"
+
+def _scan_directory(path: str) -> Tuple[int, int, List[Tuple[Tuple[int, int], int]], List[str]]:
+    """List one directory with lstat semantics for size accounting.
+
+    Returns:
+        Tuple: Count and total size of singly-linked files, (inode key, size) of
+        hardlinked files, and the subdirectories still to scan.
+    """
+    files = size = 0
+    linked = []
+    subdirs = []
+    try:
+        with os.scandir(path) as scanner:
+            for entry in scanner:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if st.st_nlink > 1:
+                    linked.append(((st.st_dev, st.st_ino), st.st_size))
+                else:
+                    files += 1
+                    size += st.st_size
+    except OSError as e:
+        print(f"Error scanning {path}: {e}")
+    return files, size, linked, subdirs
 
 class ProjectCleaner:
-    def __init__(self, project_root: str = None):
+    def __init__(self, project_root: str = None, excluded_dirs: Optional[List[str]] = None,
+                 background_delete: bool = False, purge_workers: int = DEFAULT_PURGE_WORKERS):
         # Set the project root directory
         self.project_root = project_root or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        # Directory names never walked into (e.g. .git, venv), from settings by default
+        if excluded_dirs is None:
+            excluded_dirs = load_walk_settings()['excluded_dirs']
+        self.excluded_dirs = excluded_dirs
+        # Rename matched directories into the trash and delete them on a thread pool
+        self.background_delete = background_delete
+        self.purge_workers = purge_workers
+        self.trash_dir = os.path.join(self.project_root, TRASH_DIR)
+        self._purge_executor: Optional[ThreadPoolExecutor] = None
+        # Trashed directory -> its pending deletion
+        self._purges: Dict[str, Future] = {}
+        # Log compressions queued on the purge pool by execute()
+        self._compressions: List[Future] = []
+
+    @staticmethod
+    def log_rule(log_dirs: List[str] = None) -> CleanupRule:
+        """Rule for log files inside log directories."""
+        return CleanupRule('logs', frozenset(log_dirs or DEFAULT_LOG_DIRS), LOG_EXTENSIONS,
+                           LOG_FILE_PATTERN)
+
+    @staticmethod
+    def cache_rule() -> CleanupRule:
+        """Rule for cache directories."""
+        return CleanupRule('cache', frozenset(CACHE_DIRS))
+
+    @staticmethod
+    def user_data_rule(data_dirs: List[str] = None) -> CleanupRule:
+        """Rule for user data directories."""
+        return CleanupRule('user_data', frozenset(data_dirs or DEFAULT_DATA_DIRS))
+
+    @staticmethod
+    def tool_data_rule() -> CleanupRule:
+        """Rule for tool-specific temporary directories."""
+        return CleanupRule('tool_data', frozenset(TOOL_DATA_DIRS))
 
-    def clear_logs(self, log_dirs: List[str] = None) -> None:
-        """Clear log files from specified directories."""
-        default_log_dirs = ['logs', 'log']
-        log_dirs = log_dirs or default_log_dirs
-        for log_dir in log_dirs:
-            # Clear log files in the specified directories
-            self._clear_directory(log_dir, ['.log', '.txt'])
+    def default_rules(self) -> List[CleanupRule]:
+        """Every rule ``full_cleanup`` applies."""
+        return [self.log_rule(), self.cache_rule(), self.user_data_rule(), self.tool_data_rule()]
 
-    def clear_cache(self) -> None:
+    def clear_logs(self, log_dirs: List[str] = None, dry_run: bool = False,
+                   retention: Optional[RetentionPolicy] = None) -> CleanupPlan:
+        """Clear log files from specified directories.
+
+        Without a retention policy every log file is removed; with one, only
+        logs outside the policy are removed and older kept logs are compressed.
+        """
+        if retention is None:
+            return self.clean([self.log_rule(log_dirs)], dry_run)
+        return self._run(self.retention_plan(retention, log_dirs), dry_run)
+
+    def clear_cache(self, dry_run: bool = False) -> CleanupPlan:
         """Clear cache directories and files."""
-        cache_patterns = [
-            '__pycache__',
-            '.pytest_cache',
-            '.mypy_cache',
-            '.cache'
-        ]
-        for pattern in cache_patterns:
-            # Clear cache directories matching the patterns
-            self._clear_directory(pattern)
-
-    def clear_user_data(self, data_dirs: List[str] = None) -> None:
+        return self.clean([self.cache_rule()], dry_run)
+
+    def clear_user_data(self, data_dirs: List[str] = None, dry_run: bool = False) -> CleanupPlan:
         """Clear user data directories."""
-        default_data_dirs = ['user_data', 'data']
-        data_dirs = data_dirs or default_data_dirs
-        for data_dir in data_dirs:
-            # Clear user data directories
-            self._clear_directory(data_dir)
+        return self.clean([self.user_data_rule(data_dirs)], dry_run)
 
-    def clear_tool_data(self) -> None:
+    def clear_tool_data(self, dry_run: bool = False) -> CleanupPlan:
         """Clear tool-specific temporary data."""
-        tool_patterns = [
-            'temp',
-            'tmp',
-            '.tmp'
-        ]
-        for pattern in tool_patterns:
-            # Clear tool-specific temporary directories
-            self._clear_directory(pattern)
-
-    def full_cleanup(self) -> None:
-        """Perform all cleanup operations."""
-        self.clear_logs()
-        self.clear_cache()
-        self.clear_user_data()
-        self.clear_tool_data()
-
-    def _clear_directory(self, pattern: str, extensions: Optional[List[str]] = None) -> None:
-        """Helper method to clear directories/files matching pattern."""
-        for path in Path(self.project_root).rglob('*'):
-            if pattern in str(path):
-                if path.is_dir():
-                    try:
-                        # Remove the directory and its contents
-                        shutil.rmtree(path)
-                        print(f"Cleared directory: {path}")
-                    except Exception as e:
-                        print(f"Error clearing {path}: {e}")
-                elif path.is_file() and extensions:
-                    if any(str(path).endswith(ext) for ext in extensions):
-                        try:
-                            # Delete the file
-                            path.unlink()
-                            print(f"Cleared file: {path}")
-                        except Exception as e:
-                            print(f"Error clearing {path}: {e}")
+        return self.clean([self.tool_data_rule()], dry_run)
 
-if __name__ == "__main__":
-    # Create an instance of ProjectCleaner and perform cleanup
-    cleaner = ProjectCleaner()
+    def full_cleanup(self, dry_run: bool = False) -> CleanupPlan:
+        """Perform all cleanup operations in a single walk of the project."""
+        return self.clean(self.default_rules(), dry_run)
+
+    def clean(self, rules: Iterable[CleanupRule], dry_run: bool = False) -> CleanupPlan:
+        """Remove everything the given rules match, in one walk of the project.
+
+        Args:
+            rules (Iterable[CleanupRule]): Rules to apply.
+            dry_run (bool): Only measure and print what would be removed.
+                          Defaults to False.
+
+        Returns:
+            CleanupPlan: The matches, measured when this was a dry run.
+        """
+        return self._run(self.plan(rules, measure=dry_run), dry_run)
+
+    def _run(self, plan: CleanupPlan, dry_run: bool) -> CleanupPlan:
+        """Print a plan for a dry run, otherwise carry it out."""
+        if dry_run:
+            for line in plan.report():
+                print(line)
+        else:
+            self.execute(plan)
+        return plan
+
+    def retention_plan(self, policy: RetentionPolicy, log_dirs: List[str] = None,
+                       now: Optional[float] = None) -> CleanupPlan:
+        """Decide which log files a retention policy removes or compresses.
+
+        Args:
+            policy (RetentionPolicy): Limits to enforce.
+            log_dirs (List[str]): Log directory names. Defaults to 'logs' and 'log'.
+            now (Optional[float]): Reference time for ages. Defaults to the current time.
+
+        Returns:
+            CleanupPlan: Logs to remove in ``targets``, logs to compress in ``compress``.
+        """
+        if policy.compress and policy.compress not in COMPRESSORS:
+            raise ValueError(f"Unknown compression method: {policy.compress}. "
+                             f"Choose one of: {', '.join(COMPRESSORS)}")
+        now = time.time() if now is None else now
+        loggers: Dict[Tuple[str, str], List[WalkEntry]] = defaultdict(list)
+        for _, entry in self.iter_matches(CleanupMatcher([self.log_rule(log_dirs)])):
+            loggers[(os.path.dirname(entry.path), _logger_name(entry.name))].append(entry)
+
+        plan = CleanupPlan(measured=True, compression=policy.compress,
+                           compress_workers=policy.workers)
+        compress: Dict[str, CleanupTarget] = {}
+        # Kept logs that may still be evicted to meet the size budget
+        evictable: List[WalkEntry] = []
+        total = 0
+        for entries in loggers.values():
+            entries.sort(key=lambda entry: entry.stat.st_mtime, reverse=True)
+            for index, entry in enumerate(entries):
+                age_days = (now - entry.stat.st_mtime) / 86400
+                # The newest file of each logger may be open for writing
+                if index > 0 and (
+                    (policy.keep_last is not None and index >= policy.keep_last)
+                    or (policy.max_age_days is not None and age_days > policy.max_age_days)
+                ):
+                    plan.targets.append(CleanupTarget('logs', entry.path, False, 1, entry.size))
+                    continue
+                total += entry.size
+                if index == 0:
+                    continue
+                evictable.append(entry)
+                if (policy.compress and age_days > policy.compress_after_days
+                        and not entry.name.endswith(COMPRESSED_SUFFIXES)):
+                    compress[entry.path] = CleanupTarget('logs', entry.path, False, 1, entry.size)
+
+        if policy.max_total_size is not None:
+            # Sizes before compression are used, so the budget is met even if
+            # compression achieves nothing
+            for entry in sorted(evictable, key=lambda entry: entry.stat.st_mtime):
+                if total <= policy.max_total_size:
+                    break
+                total -= entry.size
+                compress.pop(entry.path, None)
+                plan.targets.append(CleanupTarget('logs', entry.path, False, 1, entry.size))
+        plan.compress = list(compress.values())
+        return plan
+
+    def plan(self, rules: Iterable[CleanupRule], measure: bool = False,
+             workers: int = DEFAULT_SCAN_WORKERS) -> CleanupPlan:
+        """Find everything the rules match without changing anything.
+
+        Args:
+            rules (Iterable[CleanupRule]): Rules to apply.
+            measure (bool): Also count the files and bytes below each match.
+                          Defaults to False.
+            workers (int): Directories listed concurrently while measuring.
+
+        Returns:
+            CleanupPlan: One target per matched directory or file.
+        """
+        plan = CleanupPlan()
+        # Sizes of matched files come from the walk itself
+        file_stats = {}
+        for rule, entry in self.iter_matches(CleanupMatcher(rules)):
+            plan.targets.append(CleanupTarget(rule.name, entry.path, entry.is_dir))
+            if not entry.is_dir:
+                file_stats[entry.path] = entry.stat
+        if measure:
+            self._measure(plan, file_stats, workers)
+        return plan
+
+    def _measure(self, plan: CleanupPlan, file_stats: Dict[str, os.stat_result],
+                 workers: int) -> None:
+        """Fill in the sizes of a plan with a parallel scandir/lstat pass."""
+        seen_inodes: Set[Tuple[int, int]] = set()
+
+        def add_linked(target: CleanupTarget, key: Tuple[int, int], size: int) -> None:
+            # Another name of an already counted inode frees nothing extra
+            target.files += 1
+            if key not in seen_inodes:
+                seen_inodes.add(key)
+                target.bytes += size
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            pending: Dict[Future, CleanupTarget] = {}
+            for target in plan.targets:
+                if target.is_dir:
+                    pending[executor.submit(_scan_directory, target.path)] = target
+                    continue
+                st = file_stats[target.path]
+                if st.st_nlink > 1:
+                    add_linked(target, (st.st_dev, st.st_ino), st.st_size)
+                else:
+                    target.files += 1
+                    target.bytes += st.st_size
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    target = pending.pop(future)
+                    files, size, linked, subdirs = future.result()
+                    target.files += files
+                    target.bytes += size
+                    for key, linked_size in linked:
+                        add_linked(target, key, linked_size)
+                    for subdir in subdirs:
+                        pending[executor.submit(_scan_directory, subdir)] = target
+        plan.measured = True
+
+    def execute(self, plan: CleanupPlan) -> None:
+        """Remove every target of a plan, e.g. one approved after a dry run.
+
+        With background_delete, retained logs are compressed on the purge pool
+        as well, so this returns once the targets are gone; wait_for_purge()
+        waits for the compression too.
+        """
+        for target in plan.targets:
+            try:
+                if target.is_dir and self.background_delete and self._move_to_trash(target.path):
+                    print(f"Cleared directory: {target.path} (deleting in background)")
+                elif target.is_dir:
+                    # Remove the directory and its contents
+                    shutil.rmtree(target.path)
+                    print(f"Cleared directory: {target.path}")
+                else:
+                    # Delete the file
+                    os.unlink(target.path)
+                    print(f"Cleared file: {target.path}")
+            except Exception as e:
+                print(f"Error clearing {target.path}: {e}")
+        if plan.compress and self.background_delete:
+            for target in plan.compress:
+                future = self._background_executor().submit(compress_log, target.path,
+                                                             plan.compression)
+                future.add_done_callback(lambda done, target=target:
+                                         _report_compression(target, done))
+                self._compressions.append(future)
+        elif plan.compress:
+            self._compress(plan)
+
+    def _compress(self, plan: CleanupPlan) -> None:
+        """Compress the plan's retained logs on a worker pool."""
+        with ThreadPoolExecutor(max_workers=max(1, plan.compress_workers)) as executor:
+            futures = {executor.submit(compress_log, target.path, plan.compression): target
+                       for target in plan.compress}
+            for future in as_completed(futures):
+                _report_compression(futures[future], future)
+
+    def iter_matches(self, matcher: CleanupMatcher) -> Iterator[Tuple[CleanupRule, WalkEntry]]:
+        """Walk the project once, yielding every directory or file to remove.
+
+        A directory that matches is yielded and not descended into, so nothing
+        inside it is visited or reported separately.
+        """
+        # Excluded directories are still entered when they are what is being cleared
+        excluded = [d for d in self.excluded_dirs if d not in matcher.names] + [TRASH_DIR]
+        # Directory path -> file rule applying to everything below it
+        scopes: Dict[str, CleanupRule] = {}
+
+        for entry in walk(self.project_root, excluded_dirs=excluded, include_dirs=True,
+                          should_descend=lambda e: e.name not in matcher.dir_rules):
+            parent = os.path.dirname(entry.path)
+            if entry.is_dir:
+                rule = matcher.dir_rules.get(entry.name)
+                if rule:
+                    yield rule, entry
+                    continue
+                scope = matcher.file_rules.get(entry.name) or scopes.get(parent)
+                if scope:
+                    scopes[entry.path] = scope
+            else:
+                scope = scopes.get(parent)
+                if scope and scope.matches_file(entry.name):
+                    yield scope, entry
+
+    def _move_to_trash(self, path: str) -> bool:
+        """Atomically rename a directory into the trash and schedule its deletion.
+
+        Returns:
+            bool: False if the directory is on another filesystem than the trash,
+                  in which case the caller must delete it in place.
+        """
+        os.makedirs(self.trash_dir, exist_ok=True)
+        # A unique prefix keeps same-named directories from colliding in the trash
+        destination = os.path.join(self.trash_dir, f"{uuid.uuid4().hex}-{os.path.basename(path)}")
+        try:
+            os.rename(path, destination)
+        except OSError as e:
+            if e.errno == errno.EXDEV:
+                return False
+            raise
+        self._schedule_purge(destination)
+        return True
+
+    def _background_executor(self) -> ThreadPoolExecutor:
+        """Return the purge pool, starting it on first use."""
+        if self._purge_executor is None:
+            self._purge_executor = ThreadPoolExecutor(max_workers=self.purge_workers,
+                                                      thread_name_prefix='purge')
+        return self._purge_executor
+
+    def _schedule_purge(self, path: str) -> None:
+        """Queue a trashed directory for deletion on the purge pool."""
+        self._purges[path] = self._background_executor().submit(self._purge, path)
+
+    @staticmethod
+    def _purge(path: str) -> None:
+        """Delete one trashed directory, reporting rather than raising errors."""
+        def report(function, failed_path, exc_info):
+            print(f"Error purging {failed_path}: {exc_info[1]}")
+        shutil.rmtree(path, onerror=report)
+
+    def resume_purge(self) -> int:
+        """Schedule deletion of directories left in the trash by an interrupted run.
+
+        Returns:
+            int: Number of directories scheduled.
+        """
+        try:
+            leftovers = os.listdir(self.trash_dir)
+        except FileNotFoundError:
+            return 0
+        count = 0
+        for name in leftovers:
+            path = os.path.join(self.trash_dir, name)
+            if path not in self._purges or self._purges[path].done():
+                self._schedule_purge(path)
+                count += 1
+        return count
+
+    def pending_purges(self) -> int:
+        """Number of trashed directories still being deleted."""
+        return sum(not future.done() for future in self._purges.values())
+
+    def pending_compressions(self) -> int:
+        """Number of retained logs still being compressed in the background."""
+        return sum(not future.done() for future in self._compressions)
+
+    def wait_for_purge(self, timeout: Optional[float] = None) -> bool:
+        """Wait for background deletions and log compressions to finish.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait at most. Defaults to no limit.
+
+        Returns:
+            bool: True if everything has finished (the trash is then removed).
+        """
+        _, not_done = wait([*self._purges.values(), *self._compressions], timeout=timeout)
+        if not_done:
+            return False
+        self._purges = {}
+        self._compressions = []
+        if self._purge_executor:
+            self._purge_executor.shutdown()
+            self._purge_executor = None
+        try:
+            os.rmdir(self.trash_dir)
+        except OSError:
+            pass
+        return True
+
+def main(argv: Optional[List[str]] = None):
+    """Clean a project tree: logs, caches, user data and tool data."""
+    parser = argparse.ArgumentParser(description="Remove logs, caches and temporary data "
+                                                 "from a project.")
+    parser.add_argument('directory', nargs='?',
+                        help="Project to clean (default: this project)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Report what would be removed without removing anything")
+    args = parser.parse_args(argv)
+
+    cleaner = ProjectCleaner(args.directory, background_delete=True)
+    if args.dry_run:
+        cleaner.full_cleanup(dry_run=True)
+        return
+    # Finish purges a previous run was interrupted in
+    cleaner.resume_purge()
     cleaner.full_cleanup()
+    if cleaner.pending_purges() or cleaner.pending_compressions():
+        print(f"Project is clean; finishing deletion of {cleaner.pending_purges()} directories "
+              f"and compression of {cleaner.pending_compressions()} logs...")
+    cleaner.wait_for_purge()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Duplicate Group Output
+----------------------
+Writes duplicate groups for batch runs as they are confirmed.
+Features:
+- NDJSON (one object per group), CSV (one row per file) or plain text
+- Each group is flushed at once, so a reader on a pipe sees results mid-scan
+- Records name the action applied to the redundant copies, if any
+"""
+
+import csv
+import json
+from pathlib import Path
+from typing import Iterable, Optional, TextIO, Union
+
+# Formats understood by GroupWriter
+GROUP_FORMATS = ('ndjson', 'csv', 'text')
+
+class GroupWriter:
+    """Streams duplicate groups to a text stream as NDJSON, CSV or plain text.
+
+    Each group is written and flushed as soon as it is passed in, so a consumer
+    reading from a pipe sees results while the scan is still running.
+
+    Example:
+        >>> writer = GroupWriter(sys.stdout, 'ndjson')
+        >>> writer.write('ab12...', [Path('a.txt'), Path('b.txt')], size=1024)
+    """
+
+    def __init__(self, stream: TextIO, fmt: str = 'ndjson'):
+        """Prepare a writer.
+
+        Args:
+            stream (TextIO): Destination stream; it is not closed by the writer.
+            fmt (str): One of GROUP_FORMATS. NDJSON writes one object per group,
+                CSV one row per file with a group number column. Defaults to 'ndjson'.
+
+        Raises:
+            ValueError: If the format is not supported.
+        """
+        if fmt not in GROUP_FORMATS:
+            raise ValueError(f"Unknown output format: {fmt}. "
+                             f"Choose one of: {', '.join(GROUP_FORMATS)}")
+        self.stream = stream
+        self.fmt = fmt
+        self.groups = 0
+        self._csv = csv.writer(stream) if fmt == 'csv' else None
+        if self._csv:
+            self._csv.writerow(['group', 'digest', 'size', 'path', 'action'])
+
+    def write(self, digest: str, paths: Iterable[Union[str, Path]],
+              size: Optional[int] = None, action: Optional[str] = None) -> None:
+        """Write one duplicate group and flush it.
+
+        Args:
+            digest (str): Hex digest shared by the files.
+            paths (Iterable[Union[str, Path]]): Files in the group; the first is
+                the one kept when an action is applied.
+            size (Optional[int]): Size of each file in bytes, if known.
+            action (Optional[str]): What was done to the redundant copies, if anything.
+        """
+        self.groups += 1
+        paths = [str(path) for path in paths]
+        if self.fmt == 'ndjson':
+            record = {'group': self.groups, 'digest': digest, 'size': size, 'files': paths}
+            if action:
+                record['action'] = action
+            self.stream.write(json.dumps(record) + '\n')
+        elif self.fmt == 'csv':
+            for path in paths:
+                self._csv.writerow([self.groups, digest, size, path, action or ''])
+        else:
+            self.stream.write(f"\nFiles with hash {digest}:\n")
+            self.stream.write(''.join(f"{path}\n" for path in paths))
+        self.stream.flush()
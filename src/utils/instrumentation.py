@@ -0,0 +1,244 @@
+"""
+Tool Run Instrumentation
+------------------------
+Measures tool runs so their cost can be compared over time.
+Features:
+- Wall and CPU time, peak RSS and files/bytes reported per phase
+- Optional cProfile or tracemalloc profiling, written to profiles/ in the log directory
+- One JSON line per run appended to tool_runs.jsonl in the log directory
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from src.utils.logger import DEFAULT_LOG_DIR
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows: CPU time comes from os.times and peak RSS is unavailable
+
+# Profilers a tool run can be wrapped in
+PROFILERS = ('cprofile', 'tracemalloc')
+
+# Kept with the tools' log files rather than relative to the working directory
+DEFAULT_ARTIFACTS_DIR = DEFAULT_LOG_DIR / 'profiles'
+DEFAULT_HISTORY_FILE = DEFAULT_LOG_DIR / 'tool_runs.jsonl'
+
+# Allocation sites kept in a tracemalloc report
+TRACEMALLOC_TOP = 25
+
+_active_runs: List["ToolRun"] = []
+_active_lock = threading.Lock()
+
+def record_io(phase: str, files: int = 0, nbytes: int = 0) -> None:
+    """Report files and bytes handled by a tool to the run measuring it, if any.
+
+    Tools report per phase; a run counts the files of its largest phase (the
+    same file is usually seen by several phases) and the bytes of all phases.
+    Each report takes a global lock, so hot loops should batch their counts,
+    as ProgressReporter does, rather than report every file.
+
+    Args:
+        phase (str): Name of the phase doing the work, e.g. 'hash'.
+        files (int): Files completed since the last report.
+        nbytes (int): Bytes read or written since the last report.
+    """
+    with _active_lock:
+        if not _active_runs:
+            return
+        counters = _active_runs[-1].stats.phases.setdefault(phase, [0, 0])
+        counters[0] += files
+        counters[1] += nbytes
+
+def _cpu_times() -> Tuple[float, float]:
+    """Return (user, system) CPU seconds used by this process so far."""
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return usage.ru_utime, usage.ru_stime
+    times = os.times()
+    return times.user, times.system
+
+def _peak_rss() -> Optional[int]:
+    """Return the peak resident set size of this process in bytes, if known."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+@dataclass
+class ToolRunStats:
+    """Measurements of one tool run."""
+    tool: str
+    started: str = ''
+    status: str = 'ok'
+    wall: float = 0.0
+    cpu_user: float = 0.0
+    cpu_system: float = 0.0
+    # Peak RSS of the whole process so far: the OS cannot reset it per run
+    peak_rss: Optional[int] = None
+    # Phase name -> [files, bytes] reported through record_io
+    phases: Dict[str, List[int]] = field(default_factory=dict)
+    profiler: Optional[str] = None
+    artifact: Optional[str] = None
+    # Peak traced Python memory, when run under tracemalloc
+    traced_peak: Optional[int] = None
+
+    @property
+    def files(self) -> int:
+        """Files handled, taken from the phase that saw the most."""
+        return max((counters[0] for counters in self.phases.values()), default=0)
+
+    @property
+    def bytes(self) -> int:
+        """Bytes read or written, summed over all phases."""
+        return sum(counters[1] for counters in self.phases.values())
+
+    def summary(self) -> str:
+        """Return a one-line summary of the run."""
+        cpu = self.cpu_user + self.cpu_system
+        line = (f"{self.tool}: {self.status}, wall {self.wall:.2f}s, cpu {cpu:.2f}s "
+                f"(user {self.cpu_user:.2f}s, sys {self.cpu_system:.2f}s)")
+        if self.peak_rss is not None:
+            line += f", peak RSS {self.peak_rss / 1024**2:.1f} MB"
+        if self.phases:
+            line += f", {self.files} files, {self.bytes / 1024**2:.1f} MB"
+        if self.traced_peak is not None:
+            line += f", traced peak {self.traced_peak / 1024**2:.1f} MB"
+        if self.artifact:
+            line += f", {self.profiler} -> {self.artifact}"
+        return line
+
+    def to_dict(self) -> dict:
+        """Return the stats as a JSON-serialisable dict, including the totals."""
+        record = asdict(self)
+        record['files'] = self.files
+        record['bytes'] = self.bytes
+        return record
+
+class ToolRun:
+    """Context manager measuring a tool run, optionally under a profiler.
+
+    On exit the stats are complete, the profiler artifact (if any) is written
+    and one JSON line is appended to the history file, so runs can be compared
+    over time.
+
+    Example:
+        >>> with ToolRun('remove_duplicates', profiler='cprofile') as run:
+        ...     module.main()
+        >>> print(run.stats.summary())
+    """
+
+    def __init__(
+        self,
+        tool: str,
+        profiler: Optional[str] = None,
+        artifacts_dir: Union[str, Path] = DEFAULT_ARTIFACTS_DIR,
+        history_file: Optional[Union[str, Path]] = DEFAULT_HISTORY_FILE
+    ):
+        """Prepare a run.
+
+        Args:
+            tool (str): Name of the tool, used in summaries and artifact names.
+            profiler (Optional[str]): One of PROFILERS, or None to only measure.
+            artifacts_dir (Union[str, Path]): Directory for .pstats / JSON
+                profiles. Defaults to profiles/ in the logger's DEFAULT_LOG_DIR.
+            history_file (Optional[Union[str, Path]]): JSON-lines file each run is
+                appended to. None disables the history. Defaults to
+                tool_runs.jsonl in the logger's DEFAULT_LOG_DIR.
+
+        Raises:
+            ValueError: If the profiler is not supported.
+        """
+        if profiler is not None and profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler: {profiler}. Choose one of: {', '.join(PROFILERS)}")
+        self.stats = ToolRunStats(tool, profiler=profiler)
+        self.artifacts_dir = Path(artifacts_dir)
+        self.history_file = Path(history_file) if history_file else None
+        self._profile = None
+        self._started_tracing = False
+
+    def __enter__(self) -> "ToolRun":
+        self.stats.started = datetime.now().isoformat(timespec='seconds')
+        with _active_lock:
+            _active_runs.append(self)
+        if self.stats.profiler == 'tracemalloc':
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            elif hasattr(tracemalloc, 'reset_peak'):  # Python 3.9+
+                tracemalloc.reset_peak()
+        self._cpu = _cpu_times()
+        self._wall = time.perf_counter()
+        if self.stats.profiler == 'cprofile':
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+        self.stats.wall = time.perf_counter() - self._wall
+        user, system = _cpu_times()
+        self.stats.cpu_user = user - self._cpu[0]
+        self.stats.cpu_system = system - self._cpu[1]
+        self.stats.peak_rss = _peak_rss()
+        if exc_type is not None and issubclass(exc_type, SystemExit):
+            # Tools end with sys.exit(); only a non-zero status is a failure
+            self.stats.status = 'ok' if exc.code in (0, None) else f'exit {exc.code}'
+        elif exc_type is not None:
+            self.stats.status = 'interrupted' if issubclass(exc_type, KeyboardInterrupt) else 'error'
+        with _active_lock:
+            _active_runs.remove(self)
+        try:
+            self._write_artifact()
+            self._append_history()
+        except OSError as e:
+            print(f"Warning: could not write run statistics: {e}")
+
+    def _artifact_path(self, suffix: str) -> Path:
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S.%f')
+        self.artifacts_dir.mkdir(parents=True, exist_ok=True)
+        return self.artifacts_dir / f"{self.stats.tool}-{stamp}{suffix}"
+
+    def _write_artifact(self) -> None:
+        """Write the profiler output: a .pstats file or a JSON allocation report."""
+        if self._profile is not None:
+            path = self._artifact_path('.pstats')
+            self._profile.dump_stats(str(path))
+            self.stats.artifact = str(path)
+        elif self.stats.profiler == 'tracemalloc':
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if self._started_tracing:
+                tracemalloc.stop()
+            self.stats.traced_peak = peak
+            top = snapshot.statistics('lineno')[:TRACEMALLOC_TOP]
+            path = self._artifact_path('.tracemalloc.json')
+            with open(path, 'w') as f:
+                json.dump({
+                    'tool': self.stats.tool,
+                    'current': current,
+                    'peak': peak,
+                    'top': [{'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                             'size': stat.size, 'count': stat.count} for stat in top],
+                }, f, indent=2)
+            self.stats.artifact = str(path)
+
+    def _append_history(self) -> None:
+        if not self.history_file:
+            return
+        self.history_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.history_file, 'a') as f:
+            f.write(json.dumps(self.stats.to_dict()) + '\n')
@@ -0,0 +1,120 @@
+"""
+Progress Reporting
+------------------
+Reports how far a long-running phase has got as plain log lines.
+Features:
+- Files/s, MB/s and an ETA when the total is known, logged at a fixed interval
+- Works the same under cron, in CI or with output redirected to a file
+- Hands batched file and byte counts to the tool run measuring the phase
+"""
+
+import logging
+import time
+from typing import Callable, Optional
+from src.utils.instrumentation import record_io
+
+# Seconds between handing accumulated counts to record_io
+IO_REPORT_INTERVAL = 1.0
+
+def _format_duration(seconds: float) -> str:
+    """Format a duration as H:MM:SS."""
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+class ProgressReporter:
+    """Periodic progress lines (files/s, MB/s, ETA) written through a logger.
+
+    Unlike a terminal progress bar this emits plain log lines at a fixed
+    interval, so it works equally well under cron, in CI, or piped to a file.
+
+    Example:
+        >>> progress = ProgressReporter("hash", logger, total_bytes=10 * 1024**3)
+        >>> progress.update(files=1, nbytes=4096)
+        >>> progress.finish()
+    """
+
+    def __init__(
+        self,
+        name: str,
+        logger: logging.Logger,
+        total_files: Optional[int] = None,
+        total_bytes: Optional[int] = None,
+        interval: float = 10.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """Start tracking a phase of work.
+
+        Args:
+            name (str): Phase name shown at the start of each line.
+            logger (logging.Logger): Logger the lines are written to.
+            total_files (Optional[int]): Expected number of files, if known.
+            total_bytes (Optional[int]): Expected number of bytes, if known. The
+                ETA is based on bytes when available, otherwise on files.
+            interval (float): Minimum seconds between lines. Defaults to 10.
+            clock (Callable[[], float]): Time source, for testing.
+        """
+        self.name = name
+        self.logger = logger
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.clock = clock
+        self.files = 0
+        self.bytes = 0
+        self.started = clock()
+        self._last_report = self.started
+        # Counts not yet passed to record_io, which takes a global lock
+        self._pending_files = 0
+        self._pending_bytes = 0
+        self._last_io = self.started
+
+    def update(self, files: int = 0, nbytes: int = 0) -> None:
+        """Record completed work and log a line if the interval has passed.
+
+        Args:
+            files (int): Files completed since the last update.
+            nbytes (int): Bytes processed since the last update.
+        """
+        self.files += files
+        self.bytes += nbytes
+        self._pending_files += files
+        self._pending_bytes += nbytes
+        now = self.clock()
+        if now - self._last_io >= min(self.interval, IO_REPORT_INTERVAL):
+            self._report_io(now)
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.logger.info(self.summary(now))
+
+    def _report_io(self, now: float) -> None:
+        """Pass the counts accumulated since the last call to record_io."""
+        self._last_io = now
+        if self._pending_files or self._pending_bytes:
+            record_io(self.name, self._pending_files, self._pending_bytes)
+            self._pending_files = self._pending_bytes = 0
+
+    def summary(self, now: Optional[float] = None) -> str:
+        """Return the current progress line.
+
+        Args:
+            now (Optional[float]): Current clock value. Defaults to reading the clock.
+        """
+        elapsed = max((now if now is not None else self.clock()) - self.started, 1e-9)
+        files_rate = self.files / elapsed
+        bytes_rate = self.bytes / elapsed
+        done = f"{self.files}/{self.total_files}" if self.total_files else str(self.files)
+        line = (f"{self.name}: {done} files, {self.bytes / 1024**2:.1f} MB, "
+                f"{files_rate:.1f} files/s, {bytes_rate / 1024**2:.1f} MB/s")
+        if self.total_bytes and bytes_rate > 0:
+            remaining = max(self.total_bytes - self.bytes, 0) / bytes_rate
+            line += f", ETA {_format_duration(remaining)}"
+        elif self.total_files and files_rate > 0:
+            remaining = max(self.total_files - self.files, 0) / files_rate
+            line += f", ETA {_format_duration(remaining)}"
+        return line
+
+    def finish(self) -> None:
+        """Log the final line for this phase, including elapsed time."""
+        now = self.clock()
+        self._report_io(now)
+        self.logger.info(f"{self.summary(now)} (done in {_format_duration(now - self.started)})")
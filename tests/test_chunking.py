@@ -0,0 +1,39 @@
+import os
+import random
+
+from src.core.chunking import chunk_digests
+from src.tools.remove_duplicates import BlockDedupAnalyzer
+
+SIZE = 512 * 1024
+
+def _random_bytes(size, seed=0):
+    return random.Random(seed).getrandbits(8 * size).to_bytes(size, 'little')
+
+def test_inserting_at_the_front_only_changes_the_first_chunks(temp_dir):
+    data = _random_bytes(SIZE)
+    original, shifted = temp_dir.join('original.bin'), temp_dir.join('shifted.bin')
+    original.write_binary(data)
+    shifted.write_binary(b'inserted header' * 7 + data)
+
+    before, _ = chunk_digests(str(original))
+    after, _ = chunk_digests(str(shifted))
+    assert len(before) > 10
+    # Boundaries resynchronise after the edit, so the rest of the chunks are unchanged
+    assert any(after[skip_after:] == before[skip_before:]
+               for skip_before in range(3) for skip_after in range(3))
+    assert sum(length for _, length in before) == SIZE
+
+def test_report_finds_the_bytes_two_files_share(temp_dir):
+    data = _random_bytes(SIZE)
+    temp_dir.join('a.img').write_binary(data)
+    temp_dir.join('b.img').write_binary(b'edit' + data)
+    temp_dir.join('c.img').write_binary(_random_bytes(SIZE, seed=1))
+
+    report = BlockDedupAnalyzer(str(temp_dir), min_file_size=0).analyze()
+    assert report.files == 3
+    assert report.total_bytes == 3 * SIZE + 4
+    # Most of b.img is already in a.img; c.img shares nothing
+    assert SIZE * 0.8 < report.saved_bytes <= SIZE
+    (pair, saved), = report.top_pairs()
+    assert sorted(os.path.basename(path) for path in pair) == ['a.img', 'b.img']
+    assert saved == report.saved_bytes
@@ -0,0 +1,172 @@
+import errno
+import gzip
+import os
+import threading
+
+from src.utils import cleaner as cleaner_module
+from src.utils.cleaner import (TRASH_DIR, ProjectCleaner, RetentionPolicy, _logger_name,
+                               compress_log, main)
+
+def test_compress_log_keeps_earlier_compressed_history(temp_dir):
+    older = temp_dir.join('app.log.1.gz')
+    with gzip.open(str(older), 'wb') as f:
+        f.write(b'older history\n')
+    log = temp_dir.join('app.log.1')
+    log.write('newer history\n')
+
+    compress_log(str(log))
+
+    assert not log.check()
+    with gzip.open(str(older), 'rb') as f:
+        assert f.read() == b'older history\n'
+    created = [name for name in os.listdir(str(temp_dir)) if name != 'app.log.1.gz']
+    assert len(created) == 1
+    with gzip.open(str(temp_dir.join(created[0])), 'rb') as f:
+        assert f.read() == b'newer history\n'
+    assert _logger_name(created[0]) == 'app'
+
+DAY = 86400
+
+def _rotated_logs(temp_dir, now):
+    """app.log and three rotated files, 0, 2, 3 and 10 days old."""
+    logs = temp_dir.mkdir('logs')
+    for name, age_days in (('app.log', 0), ('app.log.1', 2), ('app.log.2', 3), ('app.log.3', 10)):
+        path = logs.join(name)
+        path.write(f"{name}\n" * 100)
+        os.utime(str(path), (now - age_days * DAY, now - age_days * DAY))
+    return logs
+
+def test_retention_removes_old_logs_and_compresses_the_rest(temp_dir):
+    now = 1_700_000_000
+    logs = _rotated_logs(temp_dir, now)
+    cleaner = ProjectCleaner(str(temp_dir), excluded_dirs=[])
+
+    plan = cleaner.retention_plan(RetentionPolicy(keep_last=3), now=now)
+    assert [os.path.basename(target.path) for target in plan.targets] == ['app.log.3']
+    assert sorted(os.path.basename(target.path) for target in plan.compress) == \
+        ['app.log.1', 'app.log.2']
+
+    cleaner.execute(plan)
+    assert sorted(os.listdir(str(logs))) == ['app.log', 'app.log.1.gz', 'app.log.2.gz']
+    with gzip.open(str(logs.join('app.log.2.gz')), 'rb') as f:
+        assert f.read() == b"app.log.2\n" * 100
+    # The kept mtime keeps the retention order of compressed files
+    assert os.stat(str(logs.join('app.log.2.gz'))).st_mtime == now - 3 * DAY
+
+def test_retention_by_age_and_total_size(temp_dir):
+    now = 1_700_000_000
+    _rotated_logs(temp_dir, now)
+    cleaner = ProjectCleaner(str(temp_dir), excluded_dirs=[])
+
+    by_age = cleaner.retention_plan(RetentionPolicy(max_age_days=2.5, compress=None), now=now)
+    assert sorted(os.path.basename(target.path) for target in by_age.targets) == \
+        ['app.log.2', 'app.log.3']
+    assert by_age.compress == []
+
+    # 3,800 bytes in all; the oldest go first and the newest is always kept
+    by_size = cleaner.retention_plan(RetentionPolicy(max_total_size=2500, compress=None), now=now)
+    assert sorted(os.path.basename(target.path) for target in by_size.targets) == \
+        ['app.log.2', 'app.log.3']
+
+def test_background_cleaner_compresses_off_the_calling_thread(temp_dir, monkeypatch):
+    now = 1_700_000_000
+    logs = _rotated_logs(temp_dir, now)
+    release = threading.Event()
+    def held_compress_log(path, method='gzip'):
+        release.wait(30)
+        return compress_log(path, method)
+    monkeypatch.setattr(cleaner_module, 'compress_log', held_compress_log)
+
+    cleaner = ProjectCleaner(str(temp_dir), excluded_dirs=[], background_delete=True)
+    cleaner.execute(cleaner.retention_plan(RetentionPolicy(keep_last=3), now=now))
+    # Removal is done while both compressions are still held
+    assert not logs.join('app.log.3').check()
+    assert cleaner.pending_compressions() == 2
+    assert not cleaner.wait_for_purge(timeout=0)
+
+    release.set()
+    assert cleaner.wait_for_purge(timeout=30)
+    assert sorted(os.listdir(str(logs))) == ['app.log', 'app.log.1.gz', 'app.log.2.gz']
+
+def test_dry_run_retention_changes_nothing(temp_dir):
+    now = 1_700_000_000
+    logs = _rotated_logs(temp_dir, now)
+    ProjectCleaner(str(temp_dir), excluded_dirs=[]).clear_logs(
+        dry_run=True, retention=RetentionPolicy(keep_last=1))
+    assert sorted(os.listdir(str(logs))) == ['app.log', 'app.log.1', 'app.log.2', 'app.log.3']
+
+def _cache_tree(temp_dir):
+    """A project with a __pycache__ directory and a source file."""
+    project = temp_dir.mkdir('project')
+    project.join('app.py').write('print("app")\n')
+    cache = project.mkdir('__pycache__')
+    for index in range(3):
+        cache.join(f'module{index}.pyc').write('bytecode')
+    return project
+
+def test_background_delete_renames_into_the_trash_then_purges(temp_dir):
+    project = _cache_tree(temp_dir)
+    cleaner = ProjectCleaner(str(project), excluded_dirs=[], background_delete=True)
+    cleaner.clear_cache()
+    # The directory is gone from the tree at once, whether or not the purge has run
+    assert not project.join('__pycache__').check()
+    assert cleaner.wait_for_purge(timeout=30)
+    assert sorted(os.listdir(str(project))) == ['app.py']
+
+def test_resume_purge_deletes_what_an_interrupted_run_left(temp_dir):
+    project = _cache_tree(temp_dir)
+    leftover = project.mkdir(TRASH_DIR).mkdir('0123abcd-__pycache__')
+    leftover.join('stale.pyc').write('bytecode')
+    cleaner = ProjectCleaner(str(project), excluded_dirs=[], background_delete=True)
+    assert cleaner.resume_purge() == 1
+    assert cleaner.wait_for_purge(timeout=30)
+    assert not project.join(TRASH_DIR).check()
+    assert project.join('__pycache__').check(dir=1)
+
+def test_main_dry_run_leaves_the_tree_untouched(temp_dir):
+    project = _cache_tree(temp_dir)
+    project.mkdir('logs').join('app.log').write('line\n')
+    before = sorted(str(path) for path in project.visit())
+    main([str(project), '--dry-run'])
+    assert sorted(str(path) for path in project.visit()) == before
+
+def test_directory_on_another_device_is_deleted_in_place(temp_dir, monkeypatch):
+    project = _cache_tree(temp_dir)
+    def cross_device_rename(source, destination):
+        raise OSError(errno.EXDEV, os.strerror(errno.EXDEV), source)
+    monkeypatch.setattr(os, 'rename', cross_device_rename)
+    cleaner = ProjectCleaner(str(project), excluded_dirs=[], background_delete=True)
+    cleaner.clear_cache()
+    assert cleaner.pending_purges() == 0
+    assert cleaner.wait_for_purge(timeout=30)
+    assert sorted(os.listdir(str(project))) == ['app.py']
+
+def test_rules_match_whole_path_components_only(temp_dir):
+    project = temp_dir.mkdir('project')
+    for name in ('data', 'metadata', 'data_old', 'tmp'):
+        project.mkdir(name).join('file.bin').write('x')
+    project.mkdir('docs').join('notes.txt').write('kept: not in a log directory')
+    project.mkdir('catalogs').join('index.log').write('kept: "logs" is only a substring')
+    project.mkdir('logs').join('run.log').write('removed')
+
+    cleaner = ProjectCleaner(str(project), excluded_dirs=[])
+    plan = cleaner.plan(cleaner.default_rules())
+    assert sorted(os.path.relpath(target.path, str(project)) for target in plan.targets) == \
+        ['data', os.path.join('logs', 'run.log'), 'tmp']
+
+def test_matched_directories_are_not_descended_into(temp_dir, monkeypatch):
+    project = temp_dir.mkdir('project')
+    project.mkdir('src').mkdir('__pycache__').mkdir('nested').join('deep.pyc').write('x')
+    project.join('src', '__pycache__', 'module.pyc').write('x')
+
+    scanned = []
+    real_scandir = os.scandir
+    def recording_scandir(path):
+        scanned.append(os.fspath(path))
+        return real_scandir(path)
+    monkeypatch.setattr(os, 'scandir', recording_scandir)
+
+    cleaner = ProjectCleaner(str(project), excluded_dirs=[])
+    plan = cleaner.plan([cleaner.cache_rule()])
+    assert [target.path for target in plan.targets] == [str(project.join('src', '__pycache__'))]
+    assert not any('__pycache__' in path for path in scanned)
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+
+import click
+import pytest
+from click.testing import CliRunner
+
+from src import cli
+from src.cli import PipelineStep, plan_stages
+
+def test_steps_run_after_their_dependencies():
+    stages = plan_stages(['add-requirements', 'import-graph', 'project-cleaner',
+                          'remove-duplicates'])
+    assert stages == [['project-cleaner'], ['import-graph', 'remove-duplicates'],
+                      ['add-requirements']]
+
+def test_dependencies_outside_the_pipeline_are_ignored():
+    assert plan_stages(['import-graph', 'import-graph']) == [['import-graph']]
+
+def test_circular_dependencies_are_rejected(monkeypatch):
+    monkeypatch.setattr(cli, 'PIPELINE_STEPS', {
+        'first': PipelineStep('first', (), after=('second',)),
+        'second': PipelineStep('second', (), after=('first',)),
+    })
+    with pytest.raises(click.UsageError):
+        plan_stages(['first', 'second'])
+
+def test_commands_do_not_import_the_menu():
+    # The menu installs requirements on import, which subcommands must not trigger
+    probe = "import sys, src.cli; print('src.menu' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', probe], cwd=str(cli.PROJECT_ROOT),
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
+    assert 'remove-duplicates' in cli.TOOLS
+
+def test_dry_run_pipeline_leaves_requirements_alone(temp_dir, monkeypatch):
+    monkeypatch.setenv('HOME', str(temp_dir))
+    project = temp_dir.mkdir('project')
+    project.join('app.py').write("import pytest\n")
+    requirements = project.join('requirements.txt')
+    requirements.write("keepme==1.0\n")
+
+    result = CliRunner().invoke(cli.cli, ['pipeline', 'add-requirements', '-d', str(project),
+                                          '--dry-run'])
+    assert result.exit_code == 0, result.output
+    assert "Would write 1 requirements" in result.output
+    assert requirements.read() == "keepme==1.0\n"
@@ -0,0 +1,56 @@
+import os
+
+from src.core.hash_cache import HashCache
+from src.tools.remove_duplicates import DuplicateFinder
+
+def _settled(path, seconds=1_000_000):
+    """Write-time well outside the racy window, so digests are stored."""
+    os.utime(str(path), ns=(seconds * 1_000_000_000, seconds * 1_000_000_000))
+    return os.stat(str(path))
+
+def test_entry_is_invalidated_when_size_or_mtime_change(temp_dir):
+    path = temp_dir.join('file.bin')
+    path.write_binary(b'original')
+    st = _settled(path)
+    with HashCache(str(temp_dir.join('cache.sqlite3'))) as cache:
+        cache.put_digest(path, st, 'sha256', 'digest-1')
+        cache.put_sample(path, st, 'sha256', 4, 'sample-1')
+        assert cache.get_digest(st, 'sha256') == 'digest-1'
+        assert cache.get_sample(st, 'sha256', 4) == 'sample-1'
+        assert cache.get_sample(st, 'sha256', 8) is None
+
+        path.write_binary(b'modified')
+        changed = _settled(path, 2_000_000)
+        assert cache.get_digest(changed, 'sha256') is None
+
+        cache.put_digest(path, changed, 'sha256', 'digest-2')
+        # The sample of the old contents went with the old metadata
+        assert cache.get_sample(changed, 'sha256', 4) is None
+        assert cache.get_digest(changed, 'sha256') == 'digest-2'
+
+def test_recently_modified_files_are_not_cached(temp_dir):
+    path = temp_dir.join('fresh.bin')
+    path.write_binary(b'still being written')
+    st = os.stat(str(path))
+    with HashCache(str(temp_dir.join('cache.sqlite3'))) as cache:
+        cache.put_digest(path, st, 'sha256', 'digest')
+        assert cache.get_digest(st, 'sha256') is None
+
+def test_rescan_reads_only_changed_files(temp_dir):
+    data = temp_dir.mkdir('data')
+    for name in ('a.bin', 'b.bin', 'c.bin'):
+        data.join(name).write_binary(b'same contents')
+        _settled(data.join(name))
+    cache_path = str(temp_dir.join('cache.sqlite3'))
+
+    first = DuplicateFinder(str(data), cache_path=cache_path)
+    assert len(first.find_duplicates()) == 1
+    first.close()
+
+    data.join('c.bin').write_binary(b'other content')
+    _settled(data.join('c.bin'), 2_000_000)
+    second = DuplicateFinder(str(data), cache_path=cache_path)
+    duplicates = second.find_duplicates()
+    second.close()
+    assert [len(paths) for paths in duplicates.values()] == [2]
+    assert second.processor.bytes_read == len(b'other content')
@@ -0,0 +1,38 @@
+import pytest
+
+from src.core.import_graph import ImportGraph
+
+# Self import times in microseconds, as a saved import-time profile gives them
+TIMINGS = {'app.a': (1000, 0), 'app.b': (2000, 0), 'app.heavy': (50000, 0),
+           'app.main': (500, 0), 'app.light': (9000, 0)}
+
+@pytest.fixture
+def project(temp_dir):
+    """A package where a and b import each other and main defers one import."""
+    package = temp_dir.mkdir('app')
+    package.join('__init__.py').write('')
+    package.join('a.py').write('from app import b\n')
+    package.join('b.py').write('import app.a\n')
+    package.join('heavy.py').write('VALUE = 1\n')
+    package.join('light.py').write('VALUE = 2\n')
+    package.join('main.py').write('import app.heavy\nimport app.a\n\n'
+                                  'def later():\n    import app.light\n')
+    return temp_dir
+
+def _graph(project):
+    return ImportGraph.build(str(project), workers=1, profile_timings=TIMINGS)
+
+def test_two_module_cycle_is_reported(project):
+    graph = _graph(project)
+    assert graph.cycles() == [['app.a', 'app.b']]
+    assert [(edge.source, edge.target) for edge in graph.edges if edge.deferred] == \
+        [('app.main', 'app.light')]
+
+def test_deferral_ranking_orders_by_saved_cost(project):
+    graph = _graph(project)
+    assert graph.deferral_candidates() == [('app.main', 'app.heavy', 50.0),
+                                           ('app.main', 'app.a', 3.0),
+                                           ('app.a', 'app.b', 2.0),
+                                           ('app.b', 'app.a', 1.0)]
+    # The deferred import of app.light is not loaded with app.main
+    assert graph.heaviest_modules(1) == [('app.main', 53.5, 5)]
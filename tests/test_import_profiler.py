@@ -0,0 +1,42 @@
+from src.tools.import_profiler import (ImportNode, ImportProfile, diff_profiles, format_diff,
+                                       parse_importtime)
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     encodings.utf_8
+import time:       200 |        300 |   encodings
+import time:        50 |         50 |     json.decoder
+import time:        70 |         70 |     json.encoder
+import time:       400 |        520 |   json
+import time:        30 |        850 | app
+unrelated output
+import time:        10 |         10 | late
+"""
+
+def test_importtime_output_becomes_a_tree():
+    roots = parse_importtime(IMPORTTIME)
+    assert [root.name for root in roots] == ['app', 'late']
+    app = roots[0]
+    assert (app.self_us, app.cumulative_us) == (30, 850)
+    assert [child.name for child in app.children] == ['encodings', 'json']
+    assert [child.name for child in app.children[1].children] == ['json.decoder', 'json.encoder']
+    assert [node.name for _, node in app.walk()][:2] == ['app', 'encodings']
+
+def test_profile_diff_reports_new_removed_and_slower_imports():
+    old = ImportProfile(['app'], [ImportNode('app', 10, 5010, [
+        ImportNode('json', 2000, 2000), ImportNode('csv', 3000, 3000)])])
+    new = ImportProfile(['app'], [ImportNode('app', 10, 9510, [
+        ImportNode('json', 4500, 4500), ImportNode('numpy', 5000, 5000)])])
+
+    assert diff_profiles(old, new) == [('numpy', None, 5000), ('app', 5010, 9510),
+                                       ('csv', 3000, None), ('json', 2000, 4500)]
+    report = format_diff(old, new)
+    assert report.splitlines()[0] == "Total import time: 5.0 ms -> 9.5 ms (+4.5 ms)"
+    assert "  + numpy: new import, 5.0 ms" in report
+    assert "  - csv: no longer imported, was 3.0 ms" in report
+
+def test_profile_round_trips_through_json(temp_dir):
+    profile = ImportProfile(['app'], parse_importtime(IMPORTTIME), startup_us=1234, runs=3)
+    path = str(temp_dir.join('profile.json'))
+    profile.save(path)
+    assert ImportProfile.load(path) == profile
@@ -0,0 +1,18 @@
+import os
+
+from src.core.import_scanner import ImportCache, scan_imports
+
+def test_cache_does_not_share_relative_paths_between_projects(temp_dir, monkeypatch):
+    for project, module in (('one', 'json'), ('two', 'glob')):
+        source = temp_dir.mkdir(project).join('main.py')
+        source.write(f"import {module}\n")
+        os.utime(str(source), ns=(1_000_000_000, 1_000_000_000))
+
+    with ImportCache(str(temp_dir.join('imports.sqlite3'))) as cache:
+        modules = {}
+        for project in ('one', 'two'):
+            monkeypatch.chdir(str(temp_dir.join(project)))
+            records = scan_imports(['main.py'], cache, workers=1)['main.py']
+            modules[project] = [record.module for record in records]
+
+    assert modules == {'one': ['json'], 'two': ['glob']}
@@ -0,0 +1,47 @@
+import subprocess
+
+import pytest
+
+from src.core import install_requirements as installer
+from src.core.install_requirements import check_requirements, install_requirements, is_satisfied
+
+def test_is_satisfied_compares_installed_versions():
+    assert is_satisfied('pytest>=1.0')
+    assert not is_satisfied('pytest<1.0')
+    assert not is_satisfied('surely-not-an-installed-distribution')
+    # A marker that does not apply here counts as met
+    assert is_satisfied('surely-not-an-installed-distribution; python_version < "3"')
+    with pytest.raises(ValueError):
+        is_satisfied('not a requirement !!')
+
+def test_stamp_skips_the_check_until_the_requirements_change(temp_dir):
+    requirements = temp_dir.join('requirements.txt')
+    requirements.write('pytest>=1.0  # test runner\n')
+    stamp = str(temp_dir.join('requirements.stamp'))
+
+    first = check_requirements(str(requirements), stamp)
+    assert first.satisfied and not first.from_stamp
+    assert check_requirements(str(requirements), stamp).from_stamp
+
+    requirements.write('pytest>=1.0\nsurely-not-an-installed-distribution\n')
+    changed = check_requirements(str(requirements), stamp)
+    assert not changed.satisfied and not changed.from_stamp
+    assert changed.unmet == ['surely-not-an-installed-distribution']
+
+def test_satisfied_requirements_neither_print_nor_run_pip(temp_dir, monkeypatch, capsys):
+    requirements = temp_dir.join('requirements.txt')
+    requirements.write('pytest>=1.0\n')
+    monkeypatch.setattr(subprocess, 'run', lambda *args, **kwargs: pytest.fail("pip was run"))
+    assert install_requirements(str(requirements), stamp_path=str(temp_dir.join('stamp')))
+    assert capsys.readouterr().out == ''
+
+def test_unmet_requirements_run_pip(temp_dir, monkeypatch):
+    requirements = temp_dir.join('requirements.txt')
+    requirements.write('surely-not-an-installed-distribution\n')
+    commands = []
+    def fake_run(command, **kwargs):
+        commands.append(command)
+        return subprocess.CompletedProcess(command, 1)
+    monkeypatch.setattr(installer.subprocess, 'run', fake_run)
+    assert not install_requirements(str(requirements), stamp_path=None)
+    assert commands[0][1:] == ['-m', 'pip', 'install', '-r', str(requirements)]
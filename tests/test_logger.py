@@ -0,0 +1,50 @@
+import logging
+import os
+
+from src.utils.instrumentation import ToolRun
+from src.utils.logger import DEFAULT_LOG_DIR, _teardown, measure_overhead, setup_logger
+
+def test_rotation_counts_encoded_bytes(temp_dir):
+    logger = setup_logger("test_logger_bytes", "bytes.log", max_bytes=4096, backup_count=3,
+                          asynchronous=False, log_dir=str(temp_dir))
+    try:
+        for _ in range(40):
+            logger.info("é" * 100)
+    finally:
+        _teardown("test_logger_bytes")
+    assert temp_dir.join('bytes.log.1').check()
+    assert os.path.getsize(str(temp_dir.join('bytes.log'))) < 4096
+
+def test_measure_overhead_keeps_the_working_directory(temp_dir, monkeypatch):
+    monkeypatch.chdir(str(temp_dir))
+    results = measure_overhead(records=10)
+    assert set(results) == {'sync', 'async', 'async_drain'}
+    assert os.getcwd() == str(temp_dir)
+    assert temp_dir.listdir() == []
+
+def test_setup_logger_is_idempotent(temp_dir):
+    name = "test_logger_idempotent"
+    try:
+        logger = setup_logger(name, "app.log", asynchronous=False, log_dir=str(temp_dir))
+        handlers = list(logger.handlers)
+        assert len(handlers) == 2
+        assert setup_logger(name, "app.log", "DEBUG", asynchronous=False,
+                            log_dir=str(temp_dir)) is logger
+        assert logger.handlers == handlers
+        assert logger.level == logging.DEBUG
+
+        # Different options replace the handlers instead of adding more
+        setup_logger(name, "app.log", asynchronous=True, log_dir=str(temp_dir))
+        assert len(logger.handlers) == 1
+        logger.info("through the queue")
+    finally:
+        _teardown(name)
+    assert logger.handlers == []
+    assert "through the queue" in temp_dir.join('app.log').read()
+
+def test_run_history_and_profiles_default_to_the_log_directory(temp_dir, monkeypatch):
+    monkeypatch.chdir(str(temp_dir))
+    run = ToolRun('tool')
+    assert DEFAULT_LOG_DIR.is_absolute()
+    assert run.artifacts_dir == DEFAULT_LOG_DIR / 'profiles'
+    assert run.history_file == DEFAULT_LOG_DIR / 'tool_runs.jsonl'
@@ -0,0 +1,32 @@
+import logging
+
+from src.utils import progress as progress_module
+from src.utils.instrumentation import ToolRun
+from src.utils.progress import ProgressReporter
+
+def test_io_is_batched_until_the_interval_or_finish(monkeypatch):
+    calls = []
+    monkeypatch.setattr(progress_module, 'record_io',
+                        lambda phase, files, nbytes: calls.append((phase, files, nbytes)))
+    now = [0.0]
+    progress = ProgressReporter("hash", logging.getLogger("test_progress"), clock=lambda: now[0])
+    for _ in range(3):
+        progress.update(files=1, nbytes=100)
+    assert calls == []
+
+    now[0] = progress_module.IO_REPORT_INTERVAL
+    progress.update(files=1, nbytes=100)
+    assert calls == [("hash", 4, 400)]
+
+    progress.update(files=1, nbytes=50)
+    progress.finish()
+    assert calls == [("hash", 4, 400), ("hash", 1, 50)]
+
+def test_tool_run_counts_reported_io():
+    with ToolRun("test_tool", history_file=None) as run:
+        progress = ProgressReporter("hash", logging.getLogger("test_progress"))
+        for _ in range(10):
+            progress.update(files=1, nbytes=1024)
+        progress.finish()
+    assert (run.stats.files, run.stats.bytes) == (10, 10240)
+    assert run.stats.to_dict()['files'] == 10
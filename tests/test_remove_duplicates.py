@@ -0,0 +1,248 @@
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+
+from src.tools import remove_duplicates
+from src.tools.remove_duplicates import DuplicateFinder, distinct_roots
+
+@pytest.fixture(autouse=True)
+def private_cache(temp_dir, monkeypatch):
+    """Keep main()'s hash cache and checkpoint out of the home directory."""
+    monkeypatch.setattr(remove_duplicates, 'DEFAULT_CACHE_PATH', Path(temp_dir) / 'cache.sqlite3')
+    monkeypatch.setattr(remove_duplicates, 'DEFAULT_CHECKPOINT_PATH', Path(temp_dir) / 'scan.checkpoint')
+
+def test_repeated_and_nested_roots_are_dropped(temp_dir):
+    data = temp_dir.mkdir('data')
+    sub = data.mkdir('sub')
+    other = temp_dir.mkdir('other')
+    roots = distinct_roots([str(sub), str(data), str(other), str(data)])
+    assert roots == [Path(os.path.realpath(data)), Path(os.path.realpath(other))]
+
+def test_nested_root_never_reports_a_file_as_its_own_duplicate(temp_dir):
+    data = temp_dir.mkdir('data')
+    only = data.mkdir('sub').join('only.txt')
+    only.write('the only copy')
+    finder = DuplicateFinder(str(data), extra_roots=[str(data), str(data.join('sub'))])
+    assert finder.find_duplicates() == {}
+    finder.close()
+
+def test_batch_delete_with_nested_roots_keeps_the_only_copy(temp_dir):
+    data = temp_dir.mkdir('data')
+    only = data.mkdir('sub').join('only.txt')
+    only.write('the only copy')
+    output = temp_dir.join('groups.ndjson')
+    remove_duplicates.main([str(data), str(data.join('sub')), '--batch',
+                            '--action', 'delete', '--output', str(output)])
+    assert only.check(file=1)
+    assert output.read() == ''
+
+def test_distinct_files_are_not_duplicates(sample_files):
+    finder = DuplicateFinder(str(sample_files))
+    assert finder.find_duplicates() == {}
+    finder.close()
+
+def _write(directory, name, data):
+    path = directory.join(name)
+    path.write_binary(data)
+    return path
+
+@pytest.fixture
+def staged_tree(temp_dir):
+    """Two copies plus files that each stage of the scan should eliminate."""
+    data = temp_dir.mkdir('data')
+    _write(data, 'a.bin', b'x' * 100)
+    _write(data, 'b.bin', b'x' * 100)
+    _write(data, 'tail.bin', b'x' * 99 + b'y')
+    _write(data, 'middle.bin', b'x' * 50 + b'z' + b'x' * 49)
+    _write(data, 'unique.bin', b'short')
+    return data
+
+def _scan(directory, **options):
+    finder = DuplicateFinder(str(directory), sample_size=4, **options)
+    finder.find_duplicates()
+    return finder
+
+def test_each_stage_eliminates_what_it_can(staged_tree):
+    finder = _scan(staged_tree)
+    finder.close()
+    assert list(finder.duplicates.values()) == [[Path(staged_tree.join('a.bin')),
+                                                 Path(staged_tree.join('b.bin'))]]
+    stages = {stage.name: (stage.files_in, stage.files_eliminated) for stage in finder.stats}
+    assert stages == {'size': (5, 1), 'sample': (4, 1), 'full': (3, 1)}
+
+def test_bounded_memory_scan_finds_the_same_groups(staged_tree):
+    finder = _scan(staged_tree, memory_limit=1024 * 1024)
+    finder.close()
+    assert list(finder.duplicates.values()) == [[Path(staged_tree.join('a.bin')),
+                                                 Path(staged_tree.join('b.bin'))]]
+
+def test_delete_keeps_the_first_copy(staged_tree):
+    finder = _scan(staged_tree)
+    report = finder.remove_duplicates(mode='delete')
+    finder.close()
+    assert staged_tree.join('a.bin').check(file=1)
+    assert not staged_tree.join('b.bin').check()
+    assert (report.files_removed, report.bytes_reclaimed) == (1, 100)
+
+def test_dry_run_touches_nothing(staged_tree):
+    finder = _scan(staged_tree)
+    report = finder.remove_duplicates(mode='delete', dry_run=True)
+    finder.close()
+    assert report.dry_run
+    assert (report.files_removed, report.bytes_reclaimed) == (1, 100)
+    assert staged_tree.join('b.bin').check(file=1)
+
+def test_batch_run_has_no_size_limit_unless_one_is_given(staged_tree, temp_dir, caplog):
+    output = temp_dir.join('groups.ndjson')
+    remove_duplicates.main([str(staged_tree), '--batch', '--output', str(output)])
+    assert len(output.readlines()) == 1
+
+    # 0.00005 MB is 52 bytes: only unique.bin is small enough to scan
+    with caplog.at_level('INFO', logger='duplicate_finder'):
+        remove_duplicates.main([str(staged_tree), '--batch', '--output', str(output),
+                                '--max-file-size', '0.00005'])
+    assert output.read() == ''
+    assert 'Skipped 4 files larger than' in caplog.text
+
+def test_hardlink_keeps_every_path_on_one_inode(staged_tree):
+    finder = _scan(staged_tree)
+    finder.remove_duplicates(mode='hardlink')
+    finder.close()
+    first, second = staged_tree.join('a.bin'), staged_tree.join('b.bin')
+    assert os.path.samefile(str(first), str(second))
+    assert second.read_binary() == b'x' * 100
+
+def test_reflink_shares_data_but_not_the_inode(staged_tree):
+    first, second = Path(staged_tree.join('a.bin')), Path(staged_tree.join('b.bin'))
+    try:
+        remove_duplicates.replace_with_link(first, second, 'reflink')
+    except OSError as e:
+        # A failed link must leave the duplicate in place
+        assert second.read_bytes() == b'x' * 100
+        assert sorted(os.listdir(str(staged_tree))) == ['a.bin', 'b.bin', 'middle.bin',
+                                                        'tail.bin', 'unique.bin']
+        pytest.skip(f"Reflinks are not supported here: {e}")
+    assert second.read_bytes() == b'x' * 100
+    assert not os.path.samefile(first, second)
+
+def test_known_files_are_removed_but_never_the_corpus(temp_dir):
+    corpus = temp_dir.mkdir('corpus')
+    _write(corpus, 'photo.jpg', b'corpus data')
+    uploads = temp_dir.mkdir('uploads')
+    _write(uploads, 'copy.jpg', b'corpus data')
+    _write(uploads, 'new.jpg', b'fresh data!')
+
+    with remove_duplicates.ReferenceIndex(str(temp_dir.join('corpus.idx')), 'sha256') as index:
+        DuplicateFinder(str(corpus)).build_reference_index(index)
+        finder = DuplicateFinder(str(uploads))
+        known = finder.find_known_files(index)
+        assert known == {Path(uploads.join('copy.jpg')): str(corpus.join('photo.jpg'))}
+        finder.remove_known_files(mode='delete')
+
+    assert not uploads.join('copy.jpg').check()
+    assert uploads.join('new.jpg').check(file=1)
+    assert corpus.join('photo.jpg').check(file=1)
+
+def test_known_file_is_kept_when_the_corpus_copy_changed(temp_dir):
+    corpus = temp_dir.mkdir('corpus')
+    original = _write(corpus, 'photo.jpg', b'corpus data')
+    uploads = temp_dir.mkdir('uploads')
+    _write(uploads, 'copy.jpg', b'corpus data')
+
+    with remove_duplicates.ReferenceIndex(str(temp_dir.join('corpus.idx')), 'sha256') as index:
+        DuplicateFinder(str(corpus)).build_reference_index(index)
+        finder = DuplicateFinder(str(uploads))
+        finder.find_known_files(index)
+        original.write_binary(b'edited data')
+        finder.remove_known_files(mode='delete')
+
+    assert uploads.join('copy.jpg').check(file=1)
+
+def test_duplicate_directories_are_reported_once(temp_dir):
+    for name in ('release', 'release-copy'):
+        tree = temp_dir.mkdir(name)
+        _write(tree, 'app.py', b'print("hello")\n')
+        _write(tree.mkdir('lib'), 'util.py', b'VALUE = 1\n')
+    _write(temp_dir.mkdir('other'), 'app.py', b'print("bye")\n')
+
+    finder = DuplicateFinder(str(temp_dir))
+    groups = finder.find_duplicate_dirs()
+    assert list(groups.values()) == [[Path(temp_dir.join('release')),
+                                      Path(temp_dir.join('release-copy'))]]
+    finder.remove_duplicate_dirs(keep_first=True)
+    finder.close()
+    assert temp_dir.join('release').check(dir=1)
+    assert not temp_dir.join('release-copy').check()
+
+def test_interrupted_scan_resumes_from_its_checkpoint(temp_dir, monkeypatch):
+    data = temp_dir.mkdir('data')
+    for index in range(4):
+        directory = data.mkdir(f'dir{index}')
+        _write(directory, 'copy.bin', b'duplicate')
+        _write(directory, 'own.bin', f'unique {index}'.encode())
+    checkpoint = str(temp_dir.join('scan.checkpoint'))
+
+    real_walk = remove_duplicates.walk
+    def interrupted_walk(*args, **kwargs):
+        for count, entry in enumerate(real_walk(*args, **kwargs)):
+            if count == 3:
+                raise KeyboardInterrupt
+            yield entry
+    monkeypatch.setattr(remove_duplicates, 'walk', interrupted_walk)
+    finder = DuplicateFinder(str(data), checkpoint_path=checkpoint, checkpoint_interval=0)
+    with pytest.raises(KeyboardInterrupt):
+        finder.find_duplicates()
+    finder.close()
+    assert os.path.exists(checkpoint)
+
+    monkeypatch.setattr(remove_duplicates, 'walk', real_walk)
+    finder = DuplicateFinder(str(data), checkpoint_path=checkpoint)
+    with pytest.raises(ValueError):
+        finder.find_duplicates(exclude_dirs=['dir0'], resume=True)
+    duplicates = finder.find_duplicates(resume=True)
+    finder.close()
+    assert list(duplicates.values()) == [sorted(Path(data.join(f'dir{index}', 'copy.bin'))
+                                                for index in range(4))]
+    assert not os.path.exists(checkpoint)
+
+@pytest.fixture
+def many_groups(temp_dir):
+    """Several duplicate groups spread over directories, plus unique files."""
+    data = temp_dir.mkdir('data')
+    for group in range(6):
+        for copy in range(3):
+            _write(data.ensure(f'dir{copy}', dir=True), f'group{group}.bin',
+                   f'contents of group {group}'.encode() * (group + 1))
+        _write(data, f'unique{group}.bin', f'unique file {group}'.encode())
+    return data
+
+def test_groups_are_identical_for_any_worker_count(many_groups):
+    results = []
+    for options in ({'workers': 1}, {'workers': 8}, {'workers': 4, 'use_processes': True}):
+        finder = _scan(many_groups, **options)
+        finder.close()
+        results.append(list(finder.duplicates.items()))
+    assert len(results[0]) == 6
+    assert results[1] == results[0]
+    assert results[2] == results[0]
+
+@pytest.mark.parametrize('algorithm', remove_duplicates.SUPPORTED_ALGORITHMS)
+def test_sparse_file_digest_matches_the_full_contents(temp_dir, algorithm):
+    path = temp_dir.join('sparse.img')
+    chunk_size = 4096
+    with open(str(path), 'wb') as f:
+        f.write(b'head' * 250)
+        # The hole runs from inside the first buffer across several boundaries
+        f.seek(5 * chunk_size + 123)
+        f.write(b'tail' * 250)
+    contents = path.read_binary()
+
+    digest, bytes_read = remove_duplicates._read_file_digest(Path(path), chunk_size, algorithm)
+    assert digest == hashlib.new(algorithm, contents).hexdigest()
+    if os.stat(str(path)).st_blocks * 512 < len(contents) and remove_duplicates._SPARSE_SUPPORTED:
+        # The hole was hashed as zeros rather than read
+        assert bytes_read < len(contents)
+    else:
+        assert bytes_read == len(contents)
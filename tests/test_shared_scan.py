@@ -0,0 +1,41 @@
+import os
+
+from src.core.file_walker import walk
+from src.core.shared_scan import SCAN_ENV_VAR, iter_shared_scan, write_scan
+
+def _tree(temp_dir):
+    project = temp_dir.mkdir('project')
+    project.join('a.py').write('a')
+    project.mkdir('pkg').join('b.py').write('bb' * 100)
+    project.mkdir('.git').join('HEAD').write('ref')
+    return project
+
+def test_shared_scan_matches_a_walk(temp_dir, monkeypatch):
+    project = _tree(temp_dir)
+    scan_path = str(temp_dir.join('scan.jsonl'))
+    assert write_scan([str(project)], scan_path, ['.git']) == 2
+    monkeypatch.setenv(SCAN_ENV_VAR, scan_path)
+
+    shared = iter_shared_scan(str(project), ['.git'])
+    walked = walk(str(project), excluded_dirs=['.git'])
+    assert sorted((entry.path, entry.size) for entry in shared) == \
+        sorted((entry.path, entry.size) for entry in walked)
+
+    subtree = str(project.join('pkg'))
+    assert [entry.path for entry in iter_shared_scan(subtree, ['.git'])] == \
+        [os.path.join(subtree, 'b.py')]
+    assert list(iter_shared_scan(str(project), ['.git'], max_file_size=10)) == \
+        [entry for entry in iter_shared_scan(str(project), ['.git']) if entry.size <= 10]
+
+def test_shared_scan_is_not_used_when_it_does_not_cover_the_walk(temp_dir, monkeypatch):
+    project = _tree(temp_dir)
+    scan_path = str(temp_dir.join('scan.jsonl'))
+    write_scan([str(project.join('pkg'))], scan_path, ['.git'])
+    monkeypatch.setenv(SCAN_ENV_VAR, scan_path)
+
+    # Outside the scanned root, or pruning less than the scan did
+    assert iter_shared_scan(str(project), ['.git']) is None
+    assert iter_shared_scan(str(project.join('pkg')), []) is None
+
+    monkeypatch.delenv(SCAN_ENV_VAR)
+    assert iter_shared_scan(str(project.join('pkg')), ['.git']) is None
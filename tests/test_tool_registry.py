@@ -0,0 +1,44 @@
+import os
+
+from src.core.tool_registry import ToolRegistry
+
+def _tool(directory, docstring):
+    path = directory.join('tool.py')
+    path.write(f'"""{docstring}\n\nMore text.\n"""\nimport sys\nsys.exit("never executed")\n')
+    return path
+
+def test_manifest_is_reused_until_a_tool_changes(temp_dir, monkeypatch):
+    tools = temp_dir.mkdir('tools')
+    tool = _tool(tools, "First description")
+    manifest = temp_dir.join('manifest.json')
+    categories = {'Tools': {'Tool': 'tool.py'}}
+
+    registry = ToolRegistry(str(tools), categories, manifest_path=str(manifest))
+    assert [info.description for info in registry.tools()] == ['First description']
+    assert manifest.check(file=1)
+
+    # A fresh registry answers from the manifest without reading the tool
+    reads = []
+    from src.core import tool_registry
+    real_read = tool_registry.read_description
+    monkeypatch.setattr(tool_registry, 'read_description',
+                        lambda path: reads.append(path) or real_read(path))
+    assert ToolRegistry(str(tools), categories, str(manifest)).description('tool.py') == \
+        'First description'
+    assert reads == []
+
+    # Same size, new mtime: the entry is stale and the docstring is read again
+    _tool(tools, "Other description")
+    st = os.stat(str(tool))
+    os.utime(str(tool), ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    registry = ToolRegistry(str(tools), categories, str(manifest))
+    assert [info.description for info in registry.tools()] == ['Other description']
+    assert len(reads) == 1
+
+    # A new size is caught even if the mtime is restored
+    mtime_ns = os.stat(str(tool)).st_mtime_ns
+    _tool(tools, "A longer third description")
+    os.utime(str(tool), ns=(mtime_ns, mtime_ns))
+    assert ToolRegistry(str(tools), categories, str(manifest)).description('tool.py') == \
+        'A longer third description'
+    assert len(reads) == 2